@@ -0,0 +1,72 @@
+"""
+Scaling benchmark for the allocation engines in tapp.scheduler.
+
+Run from the project directory (next to manage.py):
+
+    python -m benchmarks.bench_allocation
+    python -m benchmarks.bench_allocation --sizes 10 100 1000 10000 --repeat 5
+
+For every size it builds the same weekly availability, checks that the
+"scan" and "heap" allocators produce identical timetables, and prints the
+best-of-N time for each.
+"""
+import argparse
+import random
+import time
+from datetime import time as dtime
+
+from tapp.scheduler import SlotTable, allocate, assign_sessions
+from tapp.specs import DAYS
+
+
+def build_inputs(n_units, seed=0, granularity=60):
+    """Dense week: 06:00-22:00 every day, split into 1-3 hour slots."""
+    rng = random.Random(seed)
+    slots = SlotTable(granularity)
+    for day in DAYS:
+        hour = 6
+        while hour < 22:
+            length = min(rng.randint(1, 3), 22 - hour)
+            slots.add(day, dtime(hour), dtime(hour + length))
+            hour += length
+
+    difficulties = {f"Unit {i}": rng.randint(1, 10) for i in range(n_units)}
+    return slots, allocate(difficulties, slots.total_blocks)
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--granularity", type=int, default=60, choices=[15, 30, 60])
+    args = parser.parse_args()
+
+    print(f"{'units':>8} {'scan (ms)':>12} {'heap (ms)':>12} {'speedup':>9}")
+    for n in args.sizes:
+        slots, allocations = build_inputs(n, granularity=args.granularity)
+        scan_time, scan_result = best_of(
+            args.repeat, lambda: assign_sessions(slots, allocations, "scan")
+        )
+        heap_time, heap_result = best_of(
+            args.repeat, lambda: assign_sessions(slots, allocations, "heap")
+        )
+        if scan_result != heap_result:
+            raise SystemExit(f"heap allocator diverged from scan at {n} units")
+        print(
+            f"{n:>8} {scan_time * 1000:>12.2f} {heap_time * 1000:>12.2f} "
+            f"{scan_time / heap_time:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
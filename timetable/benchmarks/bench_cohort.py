@@ -0,0 +1,55 @@
+"""
+Cohort scheduling benchmark for tapp.resources: many students, shared rooms.
+
+Run from the project directory (next to manage.py):
+
+    python -m benchmarks.bench_cohort
+    python -m benchmarks.bench_cohort --students 500 2000 5000 --rooms 50 --capacity 4
+
+Each student gets a synthetic input set (benchmarks.workload). Prints the
+total time, the booking rate and how many students found no room left, and
+checks that no room ever holds more students than its capacity.
+"""
+import argparse
+import time
+from collections import Counter
+
+from tapp.resources import ResourcePool, schedule_cohort
+
+from .workload import make_inputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--students", type=int, nargs="+", default=[500, 2000])
+    parser.add_argument("--rooms", type=int, default=50)
+    parser.add_argument("--capacity", type=int, default=4)
+    parser.add_argument("--units", type=int, default=8, help="Units per student")
+    parser.add_argument("--granularity", type=int, default=30, choices=[15, 30, 60])
+    args = parser.parse_args()
+
+    print(f"{'students':>9} {'time (s)':>9} {'bookings':>9} {'per second':>11} {'no room':>8}")
+    for n in args.students:
+        students = [(i, make_inputs(args.units, fragmentation=0.5, seed=i)) for i in range(n)]
+        pool = ResourcePool(
+            {f"Room {r}": args.capacity for r in range(args.rooms)}, args.granularity
+        )
+
+        started = time.perf_counter()
+        results = list(schedule_cohort(students, pool, args.granularity))
+        elapsed = time.perf_counter() - started
+
+        occupancy = Counter()
+        for _, _, bookings in results:
+            for b in bookings:
+                for cell in range(b.start // args.granularity, -(-b.end // args.granularity)):
+                    occupancy[b.resource, cell] += 1
+        assert max(occupancy.values(), default=0) <= args.capacity
+
+        total = sum(len(bookings) for _, _, bookings in results)
+        unplaced = sum(1 for _, schedule, _ in results if schedule is None)
+        print(f"{n:>9} {elapsed:>9.2f} {total:>9} {total / elapsed:>11.0f} {unplaced:>8}")
+
+
+if __name__ == "__main__":
+    main()
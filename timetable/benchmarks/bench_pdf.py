@@ -0,0 +1,69 @@
+"""
+Render-time and peak-memory benchmark for tapp.pdf.
+
+Run from the project directory (next to manage.py):
+
+    python -m benchmarks.bench_pdf
+    python -m benchmarks.bench_pdf --sessions 1000 5000 20000 --layouts list grid
+
+Peak memory is measured with tracemalloc while the PDF is rendered through
+iter_pdf() and the chunks are discarded, as a streaming response would.
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from tapp.pdf import LAYOUTS, iter_pdf
+from tapp.specs import DAYS
+
+
+def build_data(n_sessions, seed=0):
+    """Spread `n_sessions` 15-minute-or-longer sessions over the week."""
+    rng = random.Random(seed)
+    per_day = -(-n_sessions // len(DAYS))
+    data = {}
+    for day in DAYS:
+        sessions, minute = [], 6 * 60
+        for _ in range(min(per_day, n_sessions - sum(map(len, data.values())))):
+            length = rng.choice([15, 30, 45, 60])
+            end = minute + length
+            sessions.append({
+                "unit": f"Unit {rng.randrange(500)}",
+                "start": f"{(minute // 60) % 24:02d}:{minute % 60:02d}",
+                "end": f"{(end // 60) % 24:02d}:{end % 60:02d}",
+            })
+            minute = end if end < 23 * 60 else 6 * 60
+        data[day] = sessions
+    return data
+
+
+def measure(data, layout):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = sum(len(chunk) for chunk in iter_pdf(data, layout))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--layouts", nargs="+", choices=LAYOUTS, default=list(LAYOUTS))
+    args = parser.parse_args()
+
+    print(f"{'sessions':>9} {'layout':>7} {'time (ms)':>10} {'peak (KiB)':>11} {'pdf (KiB)':>10}")
+    for n in args.sessions:
+        data = build_data(n)
+        for layout in args.layouts:
+            elapsed, peak, size = measure(data, layout)
+            print(
+                f"{n:>9} {layout:>7} {elapsed * 1000:>10.1f} "
+                f"{peak / 1024:>11.0f} {size / 1024:>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
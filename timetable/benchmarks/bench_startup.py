@@ -0,0 +1,91 @@
+"""
+Cold-start benchmark for web workers: time and peak RSS to import
+timetable.wsgi and load the URLconf, i.e. everything a fresh worker does
+before it can answer its first request.
+
+Run from the project directory (next to manage.py), with the same
+environment (.env) the workers get:
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --settings timetable.settings timetable.settings_lean \\
+        --repeat 10 --top 15
+
+Each run is a new interpreter started with `python -X importtime`; the
+best wall time and peak RSS over --repeat runs are reported, with the
+--top top-level packages that took longest to import (own time of all
+their modules) and whether reportlab was loaded.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+CHILD = """
+import json, resource, sys, time
+started = time.perf_counter()
+import timetable.wsgi
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps({
+    "seconds": time.perf_counter() - started,
+    "maxrss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": len(sys.modules),
+    "reportlab": "reportlab" in sys.modules,
+}))
+"""
+
+
+def parse_importtime(stderr):
+    """
+    {top-level package: µs} from `-X importtime` output, adding up each
+    module's own (self) time so nested imports aren't counted twice.
+    """
+    packages = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        if self_us.strip().isdigit():
+            packages[name.strip().split(".")[0]] += int(self_us)
+    return packages
+
+
+def run_once(settings_module):
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings_module}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        env=env, capture_output=True, text=True,
+    )
+    if proc.returncode:
+        raise SystemExit(f"{settings_module}: worker failed to start\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["packages"] = parse_importtime(proc.stderr)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--settings", nargs="+", default=["timetable.settings"],
+                        help="Settings modules to compare")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10,
+                        help="Slowest top-level packages to list")
+    args = parser.parse_args()
+
+    for settings_module in args.settings:
+        runs = [run_once(settings_module) for _ in range(args.repeat)]
+        best = min(runs, key=lambda r: r["seconds"])
+        print(
+            f"\n{settings_module}: {best['seconds'] * 1000:.1f} ms, "
+            f"peak RSS {min(r['maxrss_kib'] for r in runs) / 1024:.1f} MiB, "
+            f"{best['modules']} modules, reportlab {'loaded' if best['reportlab'] else 'not loaded'}"
+        )
+        ranked = sorted(best["packages"].items(), key=lambda item: -item[1])[:args.top]
+        for name, micros in ranked:
+            print(f"  {name:<30} {micros / 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
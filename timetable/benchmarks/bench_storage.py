@@ -0,0 +1,54 @@
+"""
+Row-size and decode-time benchmark for Timetable.data storage formats.
+
+Run from the project directory (next to manage.py):
+
+    python -m benchmarks.bench_storage
+    python -m benchmarks.bench_storage --units 10 100 1000 --granularity 15
+
+Each timetable is generated by the scheduler from a dense week, then stored
+as JSON (as the JSONField does) and packed (tapp.packing). Decode times are
+best-of-N for the whole week and for a single day, which is all a per-day
+view has to decode from the packed form.
+"""
+import argparse
+import json
+
+from tapp.packing import PackedDays, pack
+from tapp.scheduler import assign_sessions, serialize
+
+from .bench_allocation import best_of, build_inputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--units", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--granularity", type=int, default=30, choices=[15, 30, 60])
+    args = parser.parse_args()
+
+    print(
+        f"{'units':>6} {'sessions':>9} {'json (B)':>9} {'packed (B)':>11} {'ratio':>6} "
+        f"{'json week (ms)':>15} {'packed week (ms)':>17} {'packed day (ms)':>16}"
+    )
+    for n in args.units:
+        slots, allocations = build_inputs(n, granularity=args.granularity)
+        data = serialize(assign_sessions(slots, allocations))
+        sessions = sum(map(len, data.values()))
+
+        encoded = json.dumps(data, separators=(",", ":")).encode()
+        blob = pack(data)
+        assert dict(PackedDays(blob)) == data
+
+        json_week, _ = best_of(args.repeat, lambda: json.loads(encoded))
+        packed_week, _ = best_of(args.repeat, lambda: dict(PackedDays(blob)))
+        packed_day, _ = best_of(args.repeat, lambda: PackedDays(blob)["wed"])
+        print(
+            f"{n:>6} {sessions:>9} {len(encoded):>9} {len(blob):>11} "
+            f"{len(encoded) / len(blob):>6.1f} {json_week * 1000:>15.3f} "
+            f"{packed_week * 1000:>17.3f} {packed_day * 1000:>16.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+End-to-end benchmark suite: generation, serialization, reminders and PDFs.
+
+Run from the project directory (next to manage.py):
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --units 10 100 1000 --fragmentation 0.2 0.8 \\
+        --difficulty uniform skewed --repeat 20 --output new.json --compare results.json
+
+Every scenario (unit count x difficulty distribution x fragmentation) is
+run through each phase `--repeat` times for latency percentiles and
+throughput, then once more under tracemalloc for peak memory. --compare
+prints the p50 change against an earlier results file and exits non-zero
+if any phase slowed down by more than --threshold.
+
+Phases: generate (scheduler), serialize (to Timetable.data), pack
+(Timetable.packed), reminders, ics and pdf. pdf is skipped when reportlab
+is not installed.
+"""
+import argparse
+import importlib.util
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timezone
+
+from tapp.ical import iter_ics, reminders
+from tapp.packing import pack
+from tapp.profiling import Histogram
+from tapp.scheduler import schedule_inputs, serialize
+
+from .workload import DISTRIBUTIONS, make_inputs
+
+if importlib.util.find_spec("reportlab"):
+    from tapp.pdf import iter_pdf
+else:  # reportlab is optional for benchmarking the rest
+    iter_pdf = None
+
+START = date(2026, 1, 5)
+
+
+def phases(inputs, granularity, engine, budget_ms):
+    """(name, fn) pairs; each fn runs its phase on the previous phase's output."""
+    state = {}
+
+    def generate():
+        state["schedule"], _ = schedule_inputs(
+            inputs, granularity, engine=engine, budget_ms=budget_ms
+        )
+
+    def serialize_():
+        state["data"] = serialize(state["schedule"])
+
+    steps = [
+        ("generate", generate),
+        ("serialize", serialize_),
+        ("pack", lambda: pack(state["data"])),
+        ("reminders", lambda: reminders(state["data"], START, days=7)),
+        ("ics", lambda: sum(map(len, iter_ics(state["data"], START)))),
+    ]
+    if iter_pdf is not None:
+        steps.append(("pdf", lambda: sum(map(len, iter_pdf(state["data"])))))
+    return steps
+
+
+def measure(name, fn, repeat):
+    histogram = Histogram(repeat)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        histogram.add((time.perf_counter() - t) * 1000)
+    total = time.perf_counter() - started
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "phase": name,
+        "latency_ms": histogram.summary(),
+        "per_second": round(repeat / total, 1) if total else None,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run(args):
+    results = []
+    for units in args.units:
+        for difficulty in args.difficulty:
+            for fragmentation in args.fragmentation:
+                inputs = make_inputs(units, difficulty, fragmentation, seed=args.seed)
+                scenario = {
+                    "units": units, "difficulty": difficulty, "fragmentation": fragmentation,
+                    "slots": len(inputs.slots),
+                }
+                for name, fn in phases(inputs, args.granularity, args.engine, args.budget_ms):
+                    result = {**scenario, **measure(name, fn, args.repeat)}
+                    results.append(result)
+                    latency = result["latency_ms"]
+                    print(
+                        f"{units:>6} {difficulty:>8} {fragmentation:>5} {name:>10} "
+                        f"{latency['p50']:>9.3f} {latency['p95']:>9.3f} {latency['p99']:>9.3f} "
+                        f"{result['per_second']:>10} {result['peak_kib']:>9}"
+                    )
+    return results
+
+
+def key(result):
+    return (result["units"], result["difficulty"], result["fragmentation"], result["phase"])
+
+
+def compare(results, baseline_path, threshold):
+    """Print p50 changes against `baseline_path`; returns the regressions."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {key(r): r for r in json.load(f)["results"]}
+    regressions = []
+    print(f"\nAgainst {baseline_path} (p50):")
+    for result in results:
+        before = baseline.get(key(result))
+        if before is None:
+            continue
+        old, new = before["latency_ms"]["p50"], result["latency_ms"]["p50"]
+        change = (new - old) / old if old else 0.0
+        flag = " REGRESSION" if change > threshold else ""
+        print(f"  {' '.join(map(str, key(result))):<40} {old:>9.3f} -> {new:>9.3f} ms "
+              f"({change:+.0%}){flag}")
+        if flag:
+            regressions.append(key(result))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--units", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--difficulty", nargs="+", choices=list(DISTRIBUTIONS), default=["uniform"])
+    parser.add_argument("--fragmentation", type=float, nargs="+", default=[0.2, 0.8])
+    parser.add_argument("--granularity", type=int, default=30, choices=[15, 30, 60])
+    parser.add_argument("--engine", choices=["greedy", "search"], default="greedy")
+    parser.add_argument("--budget-ms", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative p50 slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    if iter_pdf is None:
+        print("reportlab not installed: skipping the pdf phase.", file=sys.stderr)
+    print(f"{'units':>6} {'dist':>8} {'frag':>5} {'phase':>10} {'p50 (ms)':>9} {'p95':>9} "
+          f"{'p99':>9} {'per second':>10} {'peak KiB':>9}")
+    results = run(args)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "meta": {
+                    "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "args": vars(args),
+                },
+                "results": results,
+            }, f, indent=2)
+        print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Synthetic scheduler inputs at a configurable scale, shared by the benchmarks.
+
+    inputs = make_inputs(units=200, difficulty="skewed", fragmentation=0.6)
+
+- `difficulty`: how unit difficulties (1-10) are spread; see DISTRIBUTIONS.
+- `fragmentation`: 0.0 gives one long slot per day, 1.0 many short slots
+  with gaps, like a student fitting study around lectures.
+- `days`: which of the Availability.DAY_CHOICES days have availability.
+"""
+import random
+
+from tapp.specs import DAYS, DAY_INDEX, MINUTES_PER_DAY, Inputs, SlotSpec, UnitSpec
+
+DAY_START, DAY_END = 8 * 60, 22 * 60
+
+
+def _uniform(rng):
+    return rng.randint(1, 10)
+
+
+def _skewed(rng):
+    # Mostly easy units with a long tail of hard ones
+    return min(10, 1 + int(rng.expovariate(0.4)))
+
+
+def _bimodal(rng):
+    return rng.choice((rng.randint(1, 3), rng.randint(8, 10)))
+
+
+DISTRIBUTIONS = {"uniform": _uniform, "skewed": _skewed, "bimodal": _bimodal}
+
+
+def make_slots(rng, day, fragmentation):
+    """Availability for one day between 08:00 and 22:00, in 15-minute steps."""
+    pieces = 1 + round(fragmentation * 11)
+    base = DAY_INDEX[day] * MINUTES_PER_DAY
+    span = (DAY_END - DAY_START) // pieces
+    slots = []
+    for i in range(pieces):
+        start = DAY_START + i * span
+        gap = rng.randrange(0, int(span * fragmentation * 0.6) + 1, 15) if fragmentation else 0
+        length = max(15, (span - gap) // 15 * 15)
+        slots.append(SlotSpec(day, base + start + gap, base + min(start + gap + length, DAY_END)))
+    return slots
+
+
+def make_inputs(units=50, difficulty="uniform", fragmentation=0.5, days=DAYS, seed=0):
+    rng = random.Random(seed)
+    pick = DISTRIBUTIONS[difficulty]
+    return Inputs(
+        units=tuple(UnitSpec(f"Unit {i:05d}", pick(rng)) for i in range(units)),
+        slots=tuple(slot for day in days for slot in make_slots(rng, day, fragmentation)),
+        days=tuple(days),
+    )
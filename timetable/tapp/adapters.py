@@ -0,0 +1,69 @@
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import Unit, Availability, StudySession
+from .profiling import timed
+from .scheduler import to_week_minute
+from .specs import Inputs, SlotSpec, UnitSpec
+
+
+def load_inputs(owner):
+    """
+    Adapt one owner's Unit/Availability/AvailabilitySlot rows into an
+    Inputs snapshot for the scheduler, in exactly three queries whatever the
+    data size: units as plain value tuples, their study history summed up
+    per unit by one GROUP BY, and every day with its slots through one
+    LEFT JOIN, reading only the columns the scheduler needs.
+    """
+    with timed("scheduler.load"):
+        history = study_history(owner)
+        units = tuple(
+            UnitSpec(name, difficulty, *history.get(name, ()))
+            for name, difficulty in Unit.objects.filter(owner=owner, timetable=None).values_list(
+                "name", "difficulty"
+            )
+        )
+
+        # Days without slots still come back once (with NULL times), so
+        # they appear in the timetable like before
+        rows = (
+            Availability.objects.filter(owner=owner, timetable=None)
+            .order_by("id", "slots__id")
+            .values_list("day", "slots__start_time", "slots__end_time")
+        )
+        days, slots = [], []
+        for day, start_time, end_time in rows:
+            if day not in days:
+                days.append(day)
+            if start_time and end_time:
+                slots.append(
+                    SlotSpec(day, to_week_minute(day, start_time), to_week_minute(day, end_time))
+                )
+
+    return Inputs(units, tuple(slots), tuple(days))
+
+
+def study_history(owner, now=None):
+    """
+    {unit name: (days since last studied, sessions completed)} for `owner`,
+    aggregated in the database so the cost doesn't grow with the history.
+    """
+    now = now or timezone.now()
+    rows = (
+        StudySession.objects.filter(owner=owner)
+        .values("unit")
+        .annotate(last=Max("completed_at"), reviews=Count("id"))
+        .values_list("unit", "last", "reviews")
+    )
+    return {unit: ((now - last).days, reviews) for unit, last, reviews in rows}
+
+
+def request_inputs(request, owner):
+    """
+    load_inputs() once per request: every caller handling the same request
+    (emptiness checks, the generator, the job queue) shares one snapshot.
+    """
+    cached = getattr(request, "_timetable_inputs", None)
+    if cached is None or cached[0] != owner:
+        cached = request._timetable_inputs = (owner, load_inputs(owner))
+    return cached[1]
@@ -1,3 +1,84 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 
-# Register your models here.
+from .adapters import load_inputs
+from .models import (
+    Unit, Availability, AvailabilitySlot, Resource, ResourceBooking, StudySession, Timetable,
+)
+from .utils import generate_from_inputs, save_timetable
+
+
+@admin.register(Unit)
+class UnitAdmin(admin.ModelAdmin):
+    list_display = ("name", "difficulty", "owner", "timetable")
+    list_filter = ("difficulty",)
+    search_fields = ("name", "owner")
+
+
+class AvailabilitySlotInline(admin.TabularInline):
+    model = AvailabilitySlot
+    extra = 0
+
+
+@admin.register(Availability)
+class AvailabilityAdmin(admin.ModelAdmin):
+    list_display = ("day", "owner", "timetable", "capacity_display", "slot_count")
+    list_filter = ("day",)
+    search_fields = ("owner",)
+    inlines = [AvailabilitySlotInline]
+
+
+@admin.register(Timetable)
+class TimetableAdmin(admin.ModelAdmin):
+    list_display = ("id", "owner", "created_at", "starts_on", "week_count")
+    search_fields = ("owner", "input_hash")
+    readonly_fields = ("created_at", "input_hash")
+    exclude = ("packed",)
+    actions = ["regenerate"]
+
+    @admin.action(description="Generate a new timetable from the owners' current inputs")
+    def regenerate(self, request, queryset):
+        """
+        Stored timetables are never rewritten: archived inputs, term plan
+        weeks and resource bookings all refer to a row's days as they are.
+        Each owner in the selection gets a new timetable instead (or the
+        existing one generated from the same inputs).
+        """
+        plans = queryset.filter(starts_on__isnull=False).count()
+        if plans:
+            self.message_user(
+                request,
+                f"Skipped {plans} term plan(s); use `manage.py generate_horizon` for those.",
+                messages.WARNING,
+            )
+        generated = []
+        owners = queryset.filter(starts_on=None).values_list("owner", flat=True).distinct()
+        for owner in owners:
+            stats = {}
+            data = generate_from_inputs(load_inputs(owner), stats=stats)
+            if data is not None:
+                generated.append(save_timetable(owner, data, stats).id)
+        self.message_user(
+            request,
+            f"Generated {len(generated)} timetable(s): "
+            + (", ".join(f"#{pk}" for pk in generated) or "no owner has units and availability."),
+        )
+
+
+@admin.register(Resource)
+class ResourceAdmin(admin.ModelAdmin):
+    list_display = ("name", "capacity")
+    search_fields = ("name",)
+
+
+@admin.register(ResourceBooking)
+class ResourceBookingAdmin(admin.ModelAdmin):
+    list_display = ("resource", "unit", "start", "end", "timetable")
+    list_filter = ("resource",)
+    list_select_related = ("resource",)
+    raw_id_fields = ("timetable",)
+
+
+@admin.register(StudySession)
+class StudySessionAdmin(admin.ModelAdmin):
+    list_display = ("unit", "owner", "completed_at", "minutes")
+    search_fields = ("unit", "owner")
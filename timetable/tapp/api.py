@@ -0,0 +1,277 @@
+"""
+Read-only JSON API over the current owner's units, availability slots,
+timetables and reminders.
+
+- Lists are paginated by an opaque ?cursor= (keyset on the primary key, so
+  every page costs the same however deep the client goes) with ?limit=.
+- ?fields=a,b returns only those fields of each item.
+- ?day=mon restricts a timetable (or its reminders) to some days.
+- Every response carries an ETag; a matching If-None-Match gets an empty
+  304. A timetable's ETag comes from its stored bytes, so a poll is
+  answered before the timetable is decoded or encoded.
+
+Responses are encoded with orjson when it is installed.
+"""
+import base64
+import hashlib
+import json
+from datetime import date, timedelta
+
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_safe
+
+from .ical import reminders as build_reminders
+from .models import AvailabilitySlot, Timetable, Unit
+from .specs import DAYS
+from .utils import get_owner
+
+try:
+    import orjson
+except ImportError:  # optional: the standard library encoder is the fallback
+    orjson = None
+
+DEFAULT_LIMIT, MAX_LIMIT = 50, 500
+MAX_REMINDER_DAYS, MAX_REMINDER_OFFSET = 366, 7 * 24 * 60  # offset in minutes
+
+
+class BadRequest(ValueError):
+    pass
+
+
+# ---------------------- Encoding ----------------------
+def _encode(payload):
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":"), default=str).encode()
+
+
+def _etag(*parts):
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def _respond(request, etag, render):
+    """
+    An empty 304 if the client already holds `etag`, otherwise the JSON
+    body from render(). Either way it must be revalidated before reuse.
+    """
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(render(), content_type="application/json")
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _error(message, status=400):
+    return JsonResponse({"error": message}, status=status)
+
+
+# ---------------------- Query parameters ----------------------
+def _fields(request, allowed):
+    """The ?fields= projection, in the order given (default: all of `allowed`)."""
+    value = request.GET.get("fields")
+    if not value:
+        return list(allowed)
+    fields = [f.strip() for f in value.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown or not fields:
+        raise BadRequest(
+            f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(allowed)}."
+        )
+    return fields
+
+
+def _days(request):
+    """The ?day= filter (repeatable or comma-separated), or None for every day."""
+    days = [d for value in request.GET.getlist("day") for d in value.split(",") if d]
+    unknown = [d for d in days if d not in DAYS]
+    if unknown:
+        raise BadRequest(f"Unknown day(s): {', '.join(unknown)}.")
+    return days or None
+
+
+def _encode_cursor(pk):
+    return base64.urlsafe_b64encode(str(pk).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor):
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise BadRequest("Invalid cursor.") from None
+
+
+def _page(request, queryset, columns, serialize, newest_first=False):
+    """
+    One page of `queryset` as {"results": [...], "next": cursor or None}.
+    Rows are read as value tuples of `columns` (the primary key first) and
+    turned into dicts by serialize(row).
+    """
+    try:
+        limit = max(1, min(int(request.GET.get("limit", DEFAULT_LIMIT)), MAX_LIMIT))
+    except ValueError:
+        raise BadRequest("limit must be a number.") from None
+    cursor = request.GET.get("cursor")
+    if cursor:
+        after = _decode_cursor(cursor)
+        queryset = queryset.filter(**{"pk__lt" if newest_first else "pk__gt": after})
+    rows = list(
+        queryset.order_by("-pk" if newest_first else "pk").values_list(*columns)[:limit + 1]
+    )
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "results": [serialize(row) for row in rows],
+        "next": _encode_cursor(rows[-1][0]) if more else None,
+    }
+
+
+def _list(request, queryset, columns, serializers, newest_first=False):
+    """
+    A paginated list endpoint: `serializers` maps each public field to a
+    function of the row. The ETag is a hash of the encoded page, so a 304
+    saves the client the body, if not the server the query.
+    """
+    try:
+        fields = _fields(request, serializers)
+        page = _page(
+            request, queryset, columns,
+            lambda row: {f: serializers[f](row) for f in fields}, newest_first,
+        )
+    except BadRequest as exc:
+        return _error(str(exc))
+    body = _encode(page)
+    return _respond(request, _etag(hashlib.blake2b(body).hexdigest()), lambda: body)
+
+
+def _hhmm(value):
+    return value.strftime("%H:%M") if value else None
+
+
+# ---------------------- Endpoints ----------------------
+@require_safe
+def units(request):
+    return _list(
+        request,
+        Unit.objects.filter(owner=get_owner(request), timetable=None),
+        ("id", "name", "difficulty"),
+        {
+            "id": lambda row: row[0],
+            "name": lambda row: row[1],
+            "difficulty": lambda row: row[2],
+        },
+    )
+
+
+@require_safe
+def slots(request):
+    queryset = AvailabilitySlot.objects.filter(
+        availability__owner=get_owner(request), availability__timetable=None
+    )
+    try:
+        days = _days(request)
+    except BadRequest as exc:
+        return _error(str(exc))
+    if days:
+        queryset = queryset.filter(availability__day__in=days)
+    return _list(
+        request,
+        queryset,
+        ("id", "availability__day", "start_time", "end_time"),
+        {
+            "id": lambda row: row[0],
+            "day": lambda row: row[1],
+            "start": lambda row: _hhmm(row[2]),
+            "end": lambda row: _hhmm(row[3]),
+        },
+    )
+
+
+@require_safe
+def timetables(request):
+    return _list(
+        request,
+        Timetable.objects.filter(owner=get_owner(request)),
+        ("id", "created_at", "starts_on", "week_count"),
+        {
+            "id": lambda row: row[0],
+            "created_at": lambda row: row[1].isoformat(),
+            "starts_on": lambda row: row[2] and row[2].isoformat(),
+            "week_count": lambda row: row[3],
+        },
+        newest_first=True,
+    )
+
+
+def _timetable(request, timetable_id):
+    return (
+        Timetable.objects.filter(id=timetable_id, owner=get_owner(request))
+        .only("id", "created_at", "data", "packed")
+        .first()
+    )
+
+
+@require_safe
+def timetable_detail(request, timetable_id):
+    """
+    One timetable as {"id", "created_at", "days": {day: sessions}}; ?day=
+    keeps only those days (decoding only them when stored packed).
+    """
+    timetable = _timetable(request, timetable_id)
+    if timetable is None:
+        return _error("Timetable not found.", status=404)
+    try:
+        fields = _fields(request, ("id", "created_at", "days"))
+        days = _days(request)
+    except BadRequest as exc:
+        return _error(str(exc))
+
+    def build():
+        stored = timetable.days
+        values = {
+            "id": lambda: timetable.id,
+            "created_at": lambda: timetable.created_at.isoformat(),
+            "days": lambda: {
+                day: stored[day] for day in (days or stored) if day in stored
+            },
+        }
+        return {field: values[field]() for field in fields}
+
+    etag = _etag(timetable.id, timetable.days_hash(), fields, days)
+    return _respond(request, etag, lambda: _encode(build()))
+
+
+@require_safe
+def timetable_reminders(request, timetable_id):
+    """
+    Reminders for the sessions in the ?days= (default 7) days from ?start=
+    (default today), ?offset= minutes (default 15, at most a week) before each; see
+    ical.reminders(). Filtered by ?day= like the timetable itself.
+    """
+    timetable = _timetable(request, timetable_id)
+    if timetable is None:
+        return _error("Timetable not found.", status=404)
+    try:
+        start = request.GET.get("start")
+        start = date.fromisoformat(start) if start else timezone.localdate()
+        days = max(1, min(int(request.GET.get("days", 7)), MAX_REMINDER_DAYS))
+        offset = max(0, min(int(request.GET.get("offset", 15)), MAX_REMINDER_OFFSET))
+        # Reminders fall up to a week either side of the window; keep that within date's range
+        if not date.min + timedelta(weeks=1) <= start <= date.max - timedelta(days=days + 7):
+            raise BadRequest("start is out of range.")
+        only = _days(request)
+    except BadRequest as exc:
+        return _error(str(exc))
+    except ValueError:
+        return _error("start must be YYYY-MM-DD; days and offset must be numbers.")
+
+    def build():
+        stored = timetable.days
+        data = {day: stored[day] for day in (only or stored) if day in stored}
+        return {"results": build_reminders(data, start, days, offset)}
+
+    etag = _etag(timetable.id, timetable.days_hash(), start, days, offset, only)
+    return _respond(request, etag, lambda: _encode(build()))
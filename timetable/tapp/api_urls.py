@@ -0,0 +1,12 @@
+from django.urls import path
+from . import api
+
+# Mounted at api/ by tapp/urls.py, and on its own by timetable/urls_lean.py
+urlpatterns = [
+    path("units/", api.units, name="api_units"),
+    path("slots/", api.slots, name="api_slots"),
+    path("timetables/", api.timetables, name="api_timetables"),
+    path("timetables/<int:timetable_id>/", api.timetable_detail, name="api_timetable"),
+    path("timetables/<int:timetable_id>/reminders/", api.timetable_reminders,
+         name="api_timetable_reminders"),
+]
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class TappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tapp'
+
+    def ready(self):
+        from django.conf import settings
+
+        from . import profiling, signals  # noqa: F401 (connects the receivers)
+
+        profiling.configure(settings.TIMETABLE_PROFILING, settings.TIMETABLE_PROFILING_WINDOW)
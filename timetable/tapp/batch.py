@@ -0,0 +1,123 @@
+"""
+Input sets for batch generation (manage.py generate_timetables and
+generate_cohort): readers for JSONL and CSV files and the per-set worker.
+
+Pure like the scheduler: no Django imports, so generate_one() can run in
+worker processes started with any multiprocessing start method (spawn and
+forkserver import this module without setting Django up).
+"""
+import csv
+import json
+from itertools import groupby
+
+from .scheduler import SlotTable, build_schedule, fingerprint, from_hhmm, serialize, unit_weights
+from .specs import DAY_INDEX, MINUTES_PER_DAY, Inputs, SlotSpec, UnitSpec
+
+
+# ---------------------- Input readers ----------------------
+def read_jsonl(path):
+    """
+    One input set per line:
+    {"id": "cohort-1/alice", "owner": "...",
+     "units": [{"name": "Math", "difficulty": 7}, ...],
+     "availability": [{"day": "mon", "start": "09:00", "end": "12:00"}, ...]}
+    An availability entry without start and end keeps a day with no slots.
+    A line that isn't a JSON object is passed on as an "invalid" record.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                record = {"invalid": f"not JSON ({exc})"}
+            if not isinstance(record, dict):
+                record = {"invalid": "not a JSON object"}
+            record.setdefault("id", str(line_no))
+            yield record
+
+
+def read_csv(path):
+    """
+    Columns: set_id,type,name,difficulty,day,start,end where type is "unit"
+    (name, difficulty) or "slot" (day, start, end). Rows of one set must be
+    contiguous, so sets are grouped while streaming.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        for set_id, rows in groupby(csv.DictReader(f), key=lambda r: r["set_id"]):
+            record = {"id": set_id, "units": [], "availability": []}
+            for row in rows:
+                if row["type"] == "unit":
+                    record["units"].append(
+                        {"name": row["name"], "difficulty": row["difficulty"] or 5}
+                    )
+                elif row["type"] == "slot":
+                    record["availability"].append(
+                        {"day": row["day"], "start": row["start"], "end": row["end"]}
+                    )
+            yield record
+
+
+def record_inputs(record):
+    """
+    The scheduler Inputs of one input set read by read_jsonl/read_csv.
+    Raises ValueError naming the set when it is malformed.
+    """
+    try:
+        if "invalid" in record:
+            raise ValueError(record["invalid"])
+        units, days, slots = [], {}, []
+        for u in record.get("units", []):
+            if not isinstance(u, dict):
+                raise ValueError(f"unit {u!r} is not an object")
+            units.append(UnitSpec(u["name"], int(u.get("difficulty", 5))))
+        for s in record.get("availability", []):
+            if not isinstance(s, dict):
+                raise ValueError(f"availability {s!r} is not an object")
+            day = s["day"]
+            if day not in DAY_INDEX:
+                continue
+            days[day] = None
+            if s.get("start") or s.get("end"):
+                slots.append(SlotSpec(day, _week_minute(day, s["start"]), _week_minute(day, s["end"])))
+    except (AttributeError, KeyError, TypeError, ValueError) as exc:
+        reason = f"missing {exc}" if isinstance(exc, KeyError) else str(exc)
+        raise ValueError(f"Input set {record.get('id')!r}: {reason}") from None
+    return Inputs(units=tuple(units), slots=tuple(slots), days=tuple(days))
+
+
+def _week_minute(day, hhmm):
+    """from_hhmm(), accepting only HH:MM from 00:00 to 24:00."""
+    hours, _, minutes = str(hhmm).partition(":")
+    if not (
+        hours.isdigit() and minutes.isdigit() and int(minutes) < 60
+        and int(hours) * 60 + int(minutes) <= MINUTES_PER_DAY
+    ):
+        raise ValueError(f"invalid time {hhmm!r} on {day} (expected HH:MM)")
+    return from_hhmm(day, hhmm)
+
+
+# ---------------------- Worker ----------------------
+def generate_one(record, granularity, engine, budget_ms):
+    """
+    Pure, ORM-free generation for one input set; runs in worker processes.
+    Returns (owner, data, input_hash, error); data is None if there is
+    nothing to schedule, or if the set is malformed, which `error` explains.
+    """
+    owner = record.get("owner") or f"batch:{record['id']}"
+    try:
+        inputs = record_inputs(record)
+    except ValueError as exc:
+        return owner, None, None, str(exc)
+    difficulties = unit_weights(inputs.units)
+    slots = SlotTable.from_inputs(inputs, granularity)
+
+    params = {"engine": engine}
+    if engine == "search":
+        params["budget_ms"] = budget_ms
+    input_hash = fingerprint(difficulties, slots, **params)
+
+    schedule, _ = build_schedule(difficulties, slots, engine=engine, budget_ms=budget_ms)
+    return owner, serialize(schedule) if schedule is not None else None, input_hash, None
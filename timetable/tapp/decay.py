@@ -0,0 +1,40 @@
+"""
+Forgetting-curve weights for units with a study history.
+
+A unit last studied `days` days ago after `reviews` completed sessions is
+remembered with probability exp(-days / stability), and every review
+multiplies its stability by GROWTH. The scheduler scales a unit's
+difficulty by a factor between RECENT and FORGOTTEN as that retention
+falls, so units about to be forgotten get more of the week and units just
+revised get less. Units without history keep their plain difficulty.
+
+The factors are computed once, at import, for every (reviews, days) pair
+up to MAX_REVIEWS and MAX_DAYS, so weighting a unit is a table lookup.
+More reviews count as MAX_REVIEWS; by MAX_DAYS every unit is forgotten.
+"""
+import math
+
+STABILITY_DAYS = 1.5  # how long a first session is remembered
+GROWTH = 2.0
+RECENT, FORGOTTEN = 0.5, 1.5
+MAX_REVIEWS = 6
+MAX_DAYS = 365
+
+
+def _factor(days, reviews):
+    retention = math.exp(-days / (STABILITY_DAYS * GROWTH ** (reviews - 1)))
+    return round(FORGOTTEN - (FORGOTTEN - RECENT) * retention, 3)
+
+
+# DECAY[reviews][days]; row 0 is unused (no history means no decay)
+DECAY = tuple(
+    tuple(_factor(days, max(reviews, 1)) for days in range(MAX_DAYS + 1))
+    for reviews in range(MAX_REVIEWS + 1)
+)
+
+
+def decay_factor(days, reviews):
+    """Difficulty multiplier for a unit last studied `days` ago, `reviews` times."""
+    if not reviews:
+        return 1.0
+    return DECAY[min(reviews, MAX_REVIEWS)][max(0, min(days, MAX_DAYS))]
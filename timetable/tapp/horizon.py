@@ -0,0 +1,187 @@
+"""
+Term plans: one timetable over many weeks.
+
+The scheduler runs once, for a base week. Every week of the term starts as
+a copy of that base and is only changed when an exception touches it: a
+date off or part of a date blocked for an exam cuts the sessions in the
+blocked time (the rest of the week stays exactly as it was), and a unit's
+difficulty shifting from some date on repairs the week with
+scheduler.reschedule. A week's result is an overlay holding just the days
+that differ from the base, so a 15-week term with a holiday and an exam
+week has two small overlays, and weeks with the same exceptions share one
+computation.
+
+Pure like the scheduler: no Django imports. See utils.save_horizon for
+the database side and models.Timetable.iter_weeks for reading plans back.
+"""
+from collections import ChainMap
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+
+from .intervals import IntervalIndex
+from .scheduler import SlotTable, build_schedule, unit_weights
+from .specs import DAY_INDEX, DAYS, MINUTES_PER_DAY, Session
+
+
+class Blackout(NamedTuple):
+    """No study on `date` from `start` to `end` (minutes since midnight)."""
+    date: date
+    start: int = 0
+    end: int = MINUTES_PER_DAY
+
+
+class Reweight(NamedTuple):
+    """From the week of `date` on, `unit` has difficulty `difficulty`."""
+    date: date
+    unit: str
+    difficulty: int
+
+
+class Week(NamedTuple):
+    index: int
+    monday: date
+    overlay: dict  # {day: [Session, ...]} for the days differing from the base
+
+
+def monday_of(day):
+    return day - timedelta(days=day.weekday())
+
+
+def week_count(start, end):
+    """Number of Monday-to-Sunday weeks the dates start..end touch."""
+    return (monday_of(end) - monday_of(start)).days // 7 + 1
+
+
+def week_days(base, overlay):
+    """A week as {day: sessions}: the overlay's days, the base's elsewhere."""
+    return ChainMap(overlay, base) if overlay else base
+
+
+def _minutes(hhmm):
+    hours, _, minutes = hhmm.partition(":")
+    value = int(hours) * 60 + int(minutes)
+    if not 0 <= value <= MINUTES_PER_DAY:
+        raise ValueError(f"Invalid time {hhmm!r}")
+    return value
+
+
+def read_exceptions(records):
+    """
+    Blackouts and Reweights from dicts such as {"date": "2026-04-06"} (the
+    whole day off), {"date": "2026-05-12", "start": "09:00", "end": "12:00"}
+    or {"date": "2026-05-01", "unit": "Maths", "difficulty": 9}.
+    Raises ValueError naming the first bad record.
+    """
+    exceptions = []
+    for n, record in enumerate(records, 1):
+        try:
+            day = datetime.strptime(record["date"], "%Y-%m-%d").date()
+            if "unit" in record:
+                difficulty = int(record["difficulty"])
+                if not 1 <= difficulty <= 10:
+                    raise ValueError("difficulty must be between 1 and 10")
+                exceptions.append(Reweight(day, record["unit"], difficulty))
+            else:
+                start = _minutes(record.get("start", "00:00"))
+                end = _minutes(record.get("end", "24:00"))
+                if start >= end:
+                    raise ValueError("end must be after start")
+                exceptions.append(Blackout(day, start, end))
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"Exception {n}: {exc}") from None
+    return exceptions
+
+
+def iter_weeks(inputs, base, start, end, exceptions=(), granularity=60, **options):
+    """
+    Yield a Week for every week from `start` to `end` (dates), one at a
+    time, so a whole term never has to be held in memory. `base` is the
+    schedule generated from `inputs` ({day: [Session, ...]}); days of the
+    first and last weeks outside the range count as blacked out.
+    `options` go to scheduler.build_schedule() when a week is repaired.
+    """
+    difficulties = unit_weights(inputs.units)
+    unknown = {e.unit for e in exceptions if isinstance(e, Reweight)} - difficulties.keys()
+    if unknown:
+        raise ValueError(f"Unknown unit(s): {', '.join(sorted(unknown))}")
+
+    first = monday_of(start)
+    blackouts, reweights = {}, {}  # week index -> week-minute ranges / Reweights
+    outside = [first + timedelta(days=i) for i in range(start.weekday())]
+    outside += [end + timedelta(days=i) for i in range(1, 7 - end.weekday())]
+    inside = [e for e in exceptions if start <= e.date <= end]
+    for exception in [*map(Blackout, outside), *inside]:
+        week = (monday_of(exception.date) - first).days // 7
+        if isinstance(exception, Reweight):
+            reweights.setdefault(week, []).append(exception)
+        else:
+            offset = exception.date.weekday() * MINUTES_PER_DAY
+            blackouts.setdefault(week, []).append(
+                (offset + exception.start, offset + exception.end)
+            )
+
+    base_difficulties = difficulties
+    base_key = ((), tuple(difficulties.items()))
+    computed = {base_key: {}}
+    for week in range(week_count(start, end)):
+        for reweight in reweights.get(week, ()):
+            difficulties = {**difficulties, reweight.unit: reweight.difficulty}
+        key = (tuple(IntervalIndex(blackouts.get(week, ()))), tuple(difficulties.items()))
+        if key not in computed:
+            computed[key] = _overlay(
+                inputs, base, key[0], difficulties, base_difficulties, granularity, options
+            )
+        yield Week(week, first + timedelta(weeks=week), computed[key])
+
+
+def _overlay(inputs, base, blocked, difficulties, base_difficulties, granularity, options):
+    """Repair `base` for one week's exceptions; returns the days that changed."""
+    blocked = IntervalIndex(blocked)
+    if difficulties == base_difficulties:
+        return _cut(base, blocked, granularity)
+    slots = SlotTable(granularity)
+    for day in inputs.days:
+        slots.add_day(day)
+    for spec in inputs.slots:
+        for a, b in blocked.free(spec.start, spec.end):
+            slots.add_range(spec.day, a, b)
+
+    blocked_days = {
+        DAYS[d] for a, b in blocked
+        for d in range(a // MINUTES_PER_DAY, (b - 1) // MINUTES_PER_DAY + 1)
+    }
+    changes = [
+        {"op": "slot_removed", "day": day} for day in sorted(blocked_days, key=DAY_INDEX.get)
+    ] + [
+        {"op": "unit_changed", "unit": unit}
+        for unit, difficulty in difficulties.items()
+        if base_difficulties[unit] != difficulty
+    ]
+    schedule, _ = build_schedule(difficulties, slots, previous=base, changes=changes, **options)
+    schedule = schedule or {}
+    return {
+        day: schedule.get(day, [])
+        for day in sorted(base.keys() | schedule.keys(), key=DAY_INDEX.get)
+        if schedule.get(day, []) != base.get(day, [])
+    }
+
+
+def _cut(base, blocked, granularity):
+    """
+    `base` without the blocked time: sessions are shortened to the whole
+    blocks left outside it, and nothing moves into other days, so a week
+    with only time taken away differs from the base on the blocked days.
+    """
+    overlay = {}
+    for day, sessions in base.items():
+        kept = []
+        for unit, start, end in sessions:
+            for a, b in blocked.free(start, end):
+                # Stay on the session's block grid
+                a = start + -(-(a - start) // granularity) * granularity
+                b = start + (b - start) // granularity * granularity
+                if a < b:
+                    kept.append(Session(unit, a, b))
+        if kept != list(sessions):
+            overlay[day] = kept
+    return overlay
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta, timezone
+
+from .scheduler import deserialize
+from .specs import MINUTES_PER_DAY
+
+PRODID = "-//Study Timetable//EN"
+LINE_LIMIT = 75  # octets per content line, RFC 5545 section 3.1
+
+
+def _escape(text):
+    return (
+        text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+    )
+
+
+def _fold(line):
+    """Split a content line into 75-octet pieces joined by CRLF + space."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= LINE_LIMIT:
+        return line + "\r\n"
+    parts, start, limit = [], 0, LINE_LIMIT
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1  # never split a multi-byte character
+        parts.append(encoded[start:end].decode("utf-8"))
+        start, limit = end, LINE_LIMIT - 1  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _stamp(value):
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def first_occurrence(week_minute, start_date):
+    """The first datetime on or after `start_date` at `week_minute` of the week."""
+    day, minute = divmod(week_minute, MINUTES_PER_DAY)
+    days_ahead = (day - start_date.weekday()) % 7
+    midnight = datetime.combine(start_date + timedelta(days=days_ahead), datetime.min.time())
+    return midnight + timedelta(minutes=minute)
+
+
+def reminders(data, start_date, days=7, reminder_offset=15):
+    """
+    Reminders for every session of timetable `data` occurring in the `days`
+    days from `start_date`, `reminder_offset` minutes before each session.
+    Sessions are parsed once into week-minute offsets, then each week in the
+    range is a single addition per session.
+    """
+    monday = datetime.combine(start_date - timedelta(days=start_date.weekday()), datetime.min.time())
+    window_start = datetime.combine(start_date, datetime.min.time())
+    window_end = window_start + timedelta(days=days)
+
+    offsets = sorted(
+        (session.start, session.unit, day)
+        for day, sessions in deserialize(data).items()
+        for session in sessions
+    )
+
+    result = []
+    week = monday
+    while week < window_end:
+        for start_minute, unit, day in offsets:
+            session_start = week + timedelta(minutes=start_minute)
+            if window_start <= session_start < window_end:
+                reminder_time = session_start - timedelta(minutes=reminder_offset)
+                result.append(
+                    {
+                        "unit": unit,
+                        "day": day,
+                        "reminder_time": reminder_time.strftime("%Y-%m-%d %H:%M"),
+                    }
+                )
+        week += timedelta(weeks=1)
+    return result
+
+
+def iter_ics(data, start_date, until=None, reminder_offset=15, uid_prefix="timetable"):
+    """
+    Yield an iCalendar document for timetable `data` line by line. Each
+    session becomes one weekly recurring VEVENT (RRULE) starting on its first
+    weekday on or after `start_date`, repeating until `until` (a date,
+    inclusive) or indefinitely. Times are floating local times.
+    """
+    created = _stamp(datetime.now(timezone.utc)) + "Z"
+    rule = "RRULE:FREQ=WEEKLY"
+    if until is not None:
+        rule += f";UNTIL={until.strftime('%Y%m%d')}T235959"
+
+    yield _fold("BEGIN:VCALENDAR")
+    yield _fold("VERSION:2.0")
+    yield _fold(f"PRODID:{PRODID}")
+    yield _fold("CALSCALE:GREGORIAN")
+    for day, sessions in deserialize(data).items():
+        for n, (unit, start, end) in enumerate(sessions):
+            first = first_occurrence(start, start_date)
+            yield _fold("BEGIN:VEVENT")
+            yield _fold(f"UID:{uid_prefix}-{day}-{n}@timetable")
+            yield _fold(f"DTSTAMP:{created}")
+            yield _fold(f"DTSTART:{_stamp(first)}")
+            yield _fold(f"DTEND:{_stamp(first + timedelta(minutes=end - start))}")
+            yield _fold(rule)
+            yield _fold(f"SUMMARY:{_escape(unit)}")
+            if reminder_offset:
+                yield _fold("BEGIN:VALARM")
+                yield _fold("ACTION:DISPLAY")
+                yield _fold(f"DESCRIPTION:{_escape(unit)}")
+                yield _fold(f"TRIGGER:-PT{int(reminder_offset)}M")
+                yield _fold("END:VALARM")
+            yield _fold("END:VEVENT")
+    yield _fold("END:VCALENDAR")
@@ -0,0 +1,217 @@
+"""
+Bulk import and export of an owner's units and availability slots.
+
+Both formats carry the same records as `generate_timetables` input sets:
+
+    JSON  {"units": [{"name": "Math", "difficulty": 7}, ...],
+           "availability": [{"day": "mon", "start": "09:00", "end": "12:00"}, ...]}
+    CSV   type,name,difficulty,day,start,end with type "unit" or "slot"
+"""
+import csv
+import io
+import json
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import Availability, AvailabilitySlot, Unit, slot_minutes
+from .specs import DAY_INDEX
+
+CSV_FIELDS = ["type", "name", "difficulty", "day", "start", "end"]
+NAME_MAX_LENGTH = Unit._meta.get_field("name").max_length
+
+
+class ImportErrors(ValueError):
+    """Raised with every problem found in an import, so all can be fixed at once."""
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} invalid row(s)")
+        self.errors = errors
+
+
+# ---------------------- Reading ----------------------
+def read_records(data, fmt):
+    """Parse CSV or JSON bytes (UTF-8) into {"units": [...], "availability": [...]}."""
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError as exc:
+        raise ImportErrors([f"File is not UTF-8 text: {exc.reason} at byte {exc.start}."])
+    if fmt == "json":
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise ImportErrors([f"Invalid JSON: {exc}"])
+        if not isinstance(data, dict):
+            raise ImportErrors(["Expected an object with 'units' and 'availability' lists."])
+        records = {key: data.get(key) or [] for key in ("units", "availability")}
+        errors = [
+            f"'{key}' must be a list of objects." for key, value in records.items()
+            if not isinstance(value, list)
+        ]
+        if errors:
+            raise ImportErrors(errors)
+        return records
+
+    records = {"units": [], "availability": []}
+    for row in csv.DictReader(io.StringIO(text)):
+        if row.get("type") == "unit":
+            records["units"].append({"name": row.get("name"), "difficulty": row.get("difficulty")})
+        elif row.get("type") == "slot":
+            records["availability"].append(
+                {"day": row.get("day"), "start": row.get("start"), "end": row.get("end")}
+            )
+    return records
+
+
+def _parse_time(value):
+    return datetime.strptime((value or "").strip(), "%H:%M").time()
+
+
+def validate(records, existing_slots=()):
+    """
+    Check every record in one pass and return (units, slots) as
+    [(name, difficulty)] and [(day, start, end)] with parsed times.
+    Slots may not overlap each other or `existing_slots` on the same day.
+    Raises ImportErrors listing every invalid row.
+    """
+    errors, units, slots = [], [], []
+
+    for n, unit in enumerate(records["units"], 1):
+        if not isinstance(unit, dict):
+            errors.append(f"Unit {n}: expected an object with a name and a difficulty.")
+            continue
+        name = str(unit.get("name") or "").strip()
+        difficulty = unit.get("difficulty")
+        try:
+            difficulty = 5 if difficulty is None or difficulty == "" else int(difficulty)
+        except (TypeError, ValueError):
+            difficulty = 0
+        if not name or len(name) > NAME_MAX_LENGTH:
+            errors.append(f"Unit {n}: name is required (at most {NAME_MAX_LENGTH} characters).")
+        elif not 1 <= difficulty <= 10:
+            errors.append(f"Unit {n} ({name}): difficulty must be between 1 and 10.")
+        else:
+            units.append((name, difficulty))
+
+    for n, slot in enumerate(records["availability"], 1):
+        if not isinstance(slot, dict):
+            errors.append(f"Slot {n}: expected an object with a day, start and end.")
+            continue
+        day = str(slot.get("day") or "").strip().lower()
+        try:
+            start, end = _parse_time(slot.get("start")), _parse_time(slot.get("end"))
+        except ValueError:
+            errors.append(f"Slot {n}: times must be HH:MM (24-hour).")
+            continue
+        if day not in DAY_INDEX:
+            errors.append(f"Slot {n}: unknown day '{day}'.")
+        elif start >= end:
+            errors.append(f"Slot {n}: end time must be later than start time.")
+        else:
+            slots.append((day, start, end, n))
+
+    errors.extend(find_overlaps(slots, existing_slots))
+    if errors:
+        raise ImportErrors(errors)
+    return units, [(day, start, end) for day, start, end, _ in slots]
+
+
+def find_overlaps(slots, existing_slots=()):
+    """
+    Sorted sweep over (day, start, end, row) tuples: after sorting, a slot
+    overlaps exactly when it starts before the latest end seen so far on
+    its day. Existing slots are (day, start, end) and carry no row number.
+    """
+    errors = []
+    merged = sorted(
+        list(slots) + [(day, start, end, None) for day, start, end in existing_slots],
+        key=lambda slot: (DAY_INDEX[slot[0]], slot[1], slot[2]),
+    )
+    current_day, latest_end, latest_row = None, None, None
+    for day, start, end, n in merged:
+        if day == current_day and start < latest_end and (n or latest_row):
+            if n and latest_row:
+                errors.append(f"Slot {n}: overlaps slot {latest_row} on {day}.")
+            else:
+                errors.append(f"Slot {n or latest_row}: overlaps an existing slot on {day}.")
+        if day != current_day or end > latest_end:
+            current_day, latest_end, latest_row = day, end, n
+    return errors
+
+
+# ---------------------- Writing ----------------------
+@transaction.atomic
+def import_records(owner, records):
+    """
+    Validate and store `records` for `owner`: one query for the existing
+    slots, then one bulk INSERT each for units, missing days and slots, and
+    one UPDATE per touched day for its capacity (bulk_create sends no
+    signals, see tapp/signals.py). Returns (units_created, slots_created, days_touched).
+    """
+    existing = AvailabilitySlot.objects.filter(
+        availability__owner=owner, availability__timetable=None,
+        start_time__isnull=False, end_time__isnull=False,
+    ).values_list("availability__day", "start_time", "end_time")
+    units, slots = validate(records, existing)
+
+    Unit.objects.bulk_create(
+        [Unit(owner=owner, name=name, difficulty=difficulty) for name, difficulty in units]
+    )
+
+    days = {day for day, _, _ in slots}
+    by_day = {a.day: a for a in Availability.objects.filter(owner=owner, timetable=None, day__in=days)}
+    missing = [Availability(owner=owner, day=day) for day in days if day not in by_day]
+    for availability in Availability.objects.bulk_create(missing):
+        by_day[availability.day] = availability
+
+    AvailabilitySlot.objects.bulk_create(
+        [
+            AvailabilitySlot(availability=by_day[day], start_time=start, end_time=end)
+            for day, start, end in slots
+        ],
+        batch_size=1000,
+    )
+    added = {}
+    for day, start, end in slots:
+        minutes, count = added.get(day, (0, 0))
+        added[day] = (minutes + slot_minutes(start, end), count + 1)
+    for day, (minutes, count) in added.items():
+        Availability.objects.filter(pk=by_day[day].pk).update(
+            capacity_minutes=F("capacity_minutes") + minutes,
+            slot_count=F("slot_count") + count,
+        )
+    return len(units), len(slots), sorted(days, key=DAY_INDEX.get)
+
+
+def export_records(owner):
+    """The owner's units and slots in the import format."""
+    units = (
+        Unit.objects.filter(owner=owner, timetable=None)
+        .order_by("name").values_list("name", "difficulty")
+    )
+    slots = AvailabilitySlot.objects.filter(
+        availability__owner=owner, availability__timetable=None
+    ).values_list(
+        "availability__day", "start_time", "end_time"
+    )
+    return {
+        "units": [{"name": name, "difficulty": difficulty} for name, difficulty in units],
+        "availability": sorted(
+            (
+                {"day": day, "start": start.strftime("%H:%M"), "end": end.strftime("%H:%M")}
+                for day, start, end in slots
+                if start and end
+            ),
+            key=lambda slot: (DAY_INDEX[slot["day"]], slot["start"]),
+        ),
+    }
+
+
+def write_csv(records, out):
+    writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    for unit in records["units"]:
+        writer.writerow({"type": "unit", **unit})
+    for slot in records["availability"]:
+        writer.writerow({"type": "slot", **slot})
@@ -0,0 +1,70 @@
+from bisect import bisect_left, bisect_right
+
+
+class IntervalIndex:
+    """
+    Disjoint [start, end) intervals kept sorted in two parallel lists.
+
+    Adding an interval merges it with every interval it overlaps or touches,
+    so the index never holds duplicates and its total length is the real
+    covered time. Lookups are binary searches on the bounds. Works with any
+    ordered values: week minutes, minutes of a day or datetime.time.
+    """
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, intervals=()):
+        self.starts = []
+        self.ends = []
+        for start, end in intervals:
+            self.add(start, end)
+
+    def __iter__(self):
+        return zip(self.starts, self.ends)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __repr__(self):
+        return f"IntervalIndex({list(self)!r})"
+
+    def _span(self, start, end):
+        """Index range of the intervals overlapping or touching [start, end)."""
+        return bisect_left(self.ends, start), bisect_right(self.starts, end)
+
+    def add(self, start, end):
+        """Insert [start, end) and return the merged interval that now holds it."""
+        if not start < end:
+            raise ValueError("An interval must end after it starts.")
+        lo, hi = self._span(start, end)
+        if lo < hi:
+            start = min(start, self.starts[lo])
+            end = max(end, self.ends[hi - 1])
+        self.starts[lo:hi] = [start]
+        self.ends[lo:hi] = [end]
+        return start, end
+
+    def overlapping(self, start, end):
+        """The stored intervals sharing time with [start, end) (touching is not overlap)."""
+        lo, hi = bisect_right(self.ends, start), bisect_left(self.starts, end)
+        return list(zip(self.starts[lo:hi], self.ends[lo:hi]))
+
+    def covers(self, start, end):
+        """True if [start, end) lies inside one stored interval."""
+        i = bisect_right(self.starts, start) - 1
+        return i >= 0 and end <= self.ends[i]
+
+    def busy(self, start, end):
+        """The stored time inside [start, end), clipped to the range."""
+        return [(max(s, start), min(e, end)) for s, e in self.overlapping(start, end)]
+
+    def free(self, start, end):
+        """The gaps inside [start, end) not covered by any stored interval."""
+        gaps, cursor = [], start
+        for s, e in self.busy(start, end):
+            if cursor < s:
+                gaps.append((cursor, s))
+            cursor = e
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
@@ -0,0 +1,177 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .adapters import load_inputs
+from .models import GenerationJob, Timetable
+from .scheduler import SlotTable, fingerprint, unit_weights
+from .specs import Inputs
+from .utils import generate_from_inputs, nothing_to_schedule, save_timetable
+
+logger = logging.getLogger(__name__)
+
+RUNNERS = ("thread", "worker", "sync")
+ACTIVE = (GenerationJob.QUEUED, GenerationJob.RUNNING)
+ABANDONED = "Stopped without finishing (its runner went away). Please generate again."
+
+_executor = None
+
+
+def _thread_pool():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.TIMETABLE_JOB_THREADS, thread_name_prefix="timetable-job"
+        )
+    return _executor
+
+
+# ---------------------- Enqueue ----------------------
+def enqueue_generation(owner, engine="greedy", budget_ms=200, previous=None, changes=None,
+                       inputs=None):
+    """
+    Queue a generation for `owner` and hand it to the configured runner.
+    The inputs are snapshotted now (or passed in as `inputs`, see
+    adapters.request_inputs), so later edits do not leak into the job.
+    Returns (job, created); an identical job still queued or running for the
+    same owner is returned instead of queueing a duplicate, unless it has
+    made no progress for TIMETABLE_JOB_TIMEOUT seconds: that one is marked
+    failed and a new job queued.
+    """
+    if inputs is None:
+        inputs = load_inputs(owner)
+    granularity = settings.TIMETABLE_GRANULARITY_MINUTES
+    params = {"engine": engine}
+    if engine == "search":
+        params["budget_ms"] = budget_ms
+    input_hash = fingerprint(
+        unit_weights(inputs.units), SlotTable.from_inputs(inputs, granularity), **params
+    )
+
+    with transaction.atomic():
+        active = GenerationJob.objects.select_for_update().filter(
+            owner=owner, input_hash=input_hash, status__in=ACTIVE
+        )
+        abandon_stale_jobs(active)
+        job = active.first()
+        if job is not None:
+            return job, False
+
+        job = GenerationJob.objects.create(
+            owner=owner,
+            input_hash=input_hash,
+            params={
+                "inputs": inputs.to_json(),
+                "granularity": granularity,
+                "engine": engine,
+                "budget_ms": budget_ms,
+                "previous_id": previous.id if previous else None,
+                "changes": changes if previous else None,
+            },
+        )
+
+        if settings.TIMETABLE_JOB_RUNNER == "thread":
+            transaction.on_commit(lambda: _thread_pool().submit(_run_in_thread, job.id))
+
+    # "worker" jobs are picked up by `manage.py run_generation_worker`
+    if settings.TIMETABLE_JOB_RUNNER == "sync":
+        run_job(job.id)
+        job.refresh_from_db()
+    return job, True
+
+
+def stale_jobs(queryset):
+    """
+    The queued or running jobs in `queryset` with no progress for
+    TIMETABLE_JOB_TIMEOUT seconds. Jobs handed to a thread pool are lost
+    when their process restarts, and a killed worker leaves its job
+    running, so neither would ever finish.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.TIMETABLE_JOB_TIMEOUT)
+    return queryset.filter(status__in=ACTIVE, updated_at__lt=cutoff)
+
+
+def abandon_stale_jobs(queryset=None):
+    """Mark stale jobs (see stale_jobs) failed; returns how many there were."""
+    queryset = GenerationJob.objects.all() if queryset is None else queryset
+    return stale_jobs(queryset).update(
+        status=GenerationJob.FAILED, error=ABANDONED, updated_at=timezone.now()
+    )
+
+
+# ---------------------- Run ----------------------
+def _run_in_thread(job_id):
+    try:
+        run_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def run_job(job_id):
+    """
+    Claim a queued job and run it. Returns False if another runner already
+    claimed it. Failures are recorded on the job rather than raised.
+    """
+    claimed = GenerationJob.objects.filter(id=job_id, status=GenerationJob.QUEUED).update(
+        status=GenerationJob.RUNNING, progress=5, updated_at=timezone.now()
+    )
+    if not claimed:
+        return False
+
+    job = GenerationJob.objects.get(id=job_id)
+    params = job.params
+
+    def progress(percent):
+        GenerationJob.objects.filter(id=job_id).update(
+            progress=percent, updated_at=timezone.now()
+        )
+
+    try:
+        previous = None
+        if params.get("previous_id"):
+            previous = Timetable.objects.filter(id=params["previous_id"], owner=job.owner).first()
+
+        stats = {}
+        data = generate_from_inputs(
+            Inputs.from_json(params["inputs"]),
+            engine=params["engine"],
+            budget_ms=params["budget_ms"],
+            granularity=params["granularity"],
+            stats=stats,
+            previous=previous.days if previous else None,
+            changes=params["changes"] if previous else None,
+            progress=progress,
+        )
+        if data is None:
+            GenerationJob.objects.filter(id=job_id).update(
+                status=GenerationJob.FAILED, error=nothing_to_schedule(params["granularity"]),
+                updated_at=timezone.now(),
+            )
+            return True
+        timetable = save_timetable(job.owner, data, stats)
+    except Exception as exc:
+        logger.exception("timetable job %s failed", job_id)
+        GenerationJob.objects.filter(id=job_id).update(
+            status=GenerationJob.FAILED, error=str(exc), updated_at=timezone.now()
+        )
+        return True
+
+    GenerationJob.objects.filter(id=job_id).update(
+        status=GenerationJob.DONE, progress=100, timetable=timetable,
+        updated_at=timezone.now(),
+    )
+    return True
+
+
+def next_queued_job():
+    """Id of the oldest queued job, or None."""
+    return (
+        GenerationJob.objects.filter(status=GenerationJob.QUEUED)
+        .order_by("created_at")
+        .values_list("id", flat=True)
+        .first()
+    )
@@ -0,0 +1,70 @@
+import json
+import os
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tapp.horizon import read_exceptions
+from tapp.utils import save_horizon
+
+
+def _date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a term plan for one owner: their weekly timetable repeated "
+        "from --start to --end, adjusted for holidays, exams and difficulty changes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--owner", required=True,
+                            help='Owner key, e.g. "user:42" (see tapp.utils.get_owner)')
+        parser.add_argument("--start", type=_date, required=True, help="First day, YYYY-MM-DD")
+        parser.add_argument("--end", type=_date, required=True, help="Last day, YYYY-MM-DD")
+        parser.add_argument(
+            "--exceptions",
+            help='JSON file with a list like [{"date": "2026-04-06"}, '
+                 '{"date": "2026-05-12", "start": "09:00", "end": "12:00"}, '
+                 '{"date": "2026-05-01", "unit": "Maths", "difficulty": 9}]',
+        )
+        parser.add_argument("--engine", choices=["greedy", "search"], default="greedy")
+        parser.add_argument("--budget-ms", type=int, default=settings.TIMETABLE_SEARCH_BUDGET_MS)
+        parser.add_argument("--granularity", type=int, choices=[15, 30, 60],
+                            default=settings.TIMETABLE_GRANULARITY_MINUTES)
+
+    def handle(self, *args, **options):
+        start, end = options["start"], options["end"]
+        if start > end:
+            raise CommandError("--end must not be before --start.")
+
+        exceptions = []
+        path = options["exceptions"]
+        if path:
+            if not os.path.exists(path):
+                raise CommandError(f"Exceptions file not found: {path}")
+            try:
+                with open(path, encoding="utf-8") as f:
+                    exceptions = read_exceptions(json.load(f))
+            except ValueError as exc:
+                raise CommandError(f"Invalid exceptions: {exc}")
+
+        started = time.perf_counter()
+        try:
+            timetable = save_horizon(
+                options["owner"], start, end, exceptions, engine=options["engine"],
+                budget_ms=options["budget_ms"], granularity=options["granularity"],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        if timetable is None:
+            raise CommandError("Nothing to schedule: add units and availability first.")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored timetable {timetable.id}: {timetable.week_count} weeks from "
+            f"{timetable.starts_on}, {timetable.weeks.count()} differing from the base week, "
+            f"in {(time.perf_counter() - started) * 1000:.0f} ms."
+        ))
@@ -0,0 +1,102 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from tapp.batch import generate_one, read_csv, read_jsonl
+from tapp.models import Timetable
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = "Generate timetables for many input sets (JSONL or CSV) across worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="Path to a .jsonl or .csv file of input sets")
+        parser.add_argument("--format", choices=["jsonl", "csv"],
+                            help="Input format (default: from the file extension)")
+        parser.add_argument("--chunk-size", type=int, default=500,
+                            help="Input sets per batch insert and checkpoint")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Worker processes")
+        parser.add_argument("--checkpoint",
+                            help="Checkpoint file (default: <input>.checkpoint)")
+        parser.add_argument("--resume", action="store_true",
+                            help="Skip input sets already recorded in the checkpoint")
+        parser.add_argument("--engine", choices=["greedy", "search"], default="greedy")
+        parser.add_argument("--budget-ms", type=int, default=settings.TIMETABLE_SEARCH_BUDGET_MS)
+        parser.add_argument("--granularity", type=int, choices=[15, 30, 60],
+                            default=settings.TIMETABLE_GRANULARITY_MINUTES)
+
+    def handle(self, *args, **options):
+        path = options["input"]
+        if not os.path.exists(path):
+            raise CommandError(f"Input file not found: {path}")
+        fmt = options["format"] or ("csv" if path.endswith(".csv") else "jsonl")
+        records = read_csv(path) if fmt == "csv" else read_jsonl(path)
+
+        checkpoint = options["checkpoint"] or f"{path}.checkpoint"
+        done = 0
+        if options["resume"] and os.path.exists(checkpoint):
+            with open(checkpoint, encoding="utf-8") as f:
+                done = int(f.read().strip() or 0)
+            records = islice(records, done, None)
+            self.stdout.write(f"Resuming after {done} input sets.")
+
+        worker = partial(
+            generate_one,
+            granularity=options["granularity"],
+            engine=options["engine"],
+            budget_ms=options["budget_ms"],
+        )
+        chunk_size = options["chunk_size"]
+        map_chunk = max(1, chunk_size // (options["workers"] * 4))
+
+        created = skipped = invalid = 0
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=options["workers"]) as executor:
+            for chunk in chunked(records, chunk_size):
+                chunk_started = time.perf_counter()
+                rows = []
+                results = executor.map(worker, chunk, chunksize=map_chunk)
+                for owner, data, input_hash, error in results:
+                    if error:
+                        # Counted as processed, so a resume doesn't retry it
+                        self.stderr.write(f"Skipped {error}")
+                        invalid += 1
+                        continue
+                    if data is None:
+                        skipped += 1
+                        continue
+                    timetable = Timetable(owner=owner, input_hash=input_hash)
+                    timetable.set_days(data)
+                    rows.append(timetable)
+
+                # The checkpoint is written inside the transaction: if it cannot be
+                # saved the chunk's rows roll back, so a resume never duplicates them
+                with transaction.atomic():
+                    Timetable.objects.bulk_create(rows, batch_size=chunk_size)
+                    done += len(chunk)
+                    with open(checkpoint, "w", encoding="utf-8") as f:
+                        f.write(str(done))
+                created += len(rows)
+
+                rate = len(chunk) / (time.perf_counter() - chunk_started)
+                self.stdout.write(f"{done} input sets processed ({rate:.1f} timetables/s)")
+
+        elapsed = time.perf_counter() - started
+        total = created + skipped + invalid
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {created} timetables, skipped {skipped} empty and {invalid} invalid "
+            f"input sets in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.1f} timetables/s)."
+        ))
@@ -0,0 +1,38 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tapp.importer import ImportErrors, import_records, read_records
+
+
+class Command(BaseCommand):
+    help = "Import units and availability slots for one owner from a CSV or JSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="Path to a .csv or .json file")
+        parser.add_argument("--owner", required=True,
+                            help='Owner key, e.g. "user:42" (see tapp.utils.get_owner)')
+        parser.add_argument("--format", choices=["json", "csv"],
+                            help="Input format (default: from the file extension)")
+
+    def handle(self, *args, **options):
+        path = options["input"]
+        if not os.path.exists(path):
+            raise CommandError(f"Input file not found: {path}")
+        fmt = options["format"] or ("csv" if path.endswith(".csv") else "json")
+        with open(path, "rb") as f:
+            data = f.read()
+
+        started = time.perf_counter()
+        try:
+            units, slots, _ = import_records(options["owner"], read_records(data, fmt))
+        except ImportErrors as exc:
+            for error in exc.errors:
+                self.stderr.write(error)
+            raise CommandError(f"Nothing imported: {exc}.")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {units} units and {slots} slots "
+            f"in {(time.perf_counter() - started) * 1000:.0f} ms."
+        ))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tapp.models import Timetable
+from tapp.packing import pack
+
+
+class Command(BaseCommand):
+    help = "Convert stored timetables between the JSON and packed formats."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--unpack", action="store_true",
+                            help="Convert packed rows back to JSON instead")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if options["unpack"]:
+            rows = Timetable.objects.filter(packed__isnull=False).only("id", "packed")
+        else:
+            rows = Timetable.objects.filter(packed__isnull=True, data__isnull=False).only("id", "data")
+
+        converted = 0
+        batch = []
+        for timetable in rows.iterator(chunk_size=batch_size):
+            if options["unpack"]:
+                timetable.data, timetable.packed = dict(timetable.days), None
+            else:
+                timetable.packed, timetable.data = pack(timetable.data), None
+            batch.append(timetable)
+            if len(batch) == batch_size:
+                converted += self._save(batch)
+                batch = []
+        if batch:
+            converted += self._save(batch)
+
+        fmt = "JSON" if options["unpack"] else "packed"
+        self.stdout.write(self.style.SUCCESS(f"Converted {converted} timetables to {fmt}."))
+
+    def _save(self, batch):
+        with transaction.atomic():
+            Timetable.objects.bulk_update(batch, ["data", "packed"])
+        return len(batch)
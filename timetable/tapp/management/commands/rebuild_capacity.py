@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tapp.models import Availability, AvailabilitySlot, slot_minutes
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute each day's capacity_minutes and slot_count from its slots "
+        "(after loading fixtures, raw SQL, or to repair drift)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--owner", help='Only this owner, e.g. "user:3"')
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        days = Availability.objects.all()
+        slots = AvailabilitySlot.objects.all()
+        if options["owner"] is not None:
+            days = days.filter(owner=options["owner"])
+            slots = slots.filter(availability__owner=options["owner"])
+
+        totals = {}
+        rows = slots.values_list("availability_id", "start_time", "end_time")
+        for availability_id, start, end in rows.iterator(chunk_size=options["batch_size"]):
+            minutes, count = totals.get(availability_id, (0, 0))
+            totals[availability_id] = (minutes + slot_minutes(start, end), count + 1)
+
+        checked, stale = 0, []
+        days = days.only("id", "capacity_minutes", "slot_count")
+        for availability in days.iterator(chunk_size=options["batch_size"]):
+            checked += 1
+            minutes, count = totals.get(availability.id, (0, 0))
+            if (availability.capacity_minutes, availability.slot_count) != (minutes, count):
+                availability.capacity_minutes, availability.slot_count = minutes, count
+                stale.append(availability)
+
+        with transaction.atomic():
+            Availability.objects.bulk_update(
+                stale, ["capacity_minutes", "slot_count"], batch_size=options["batch_size"]
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {checked} days, corrected {len(stale)}."
+        ))
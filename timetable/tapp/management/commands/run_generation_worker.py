@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tapp.jobs import next_queued_job, run_job
+
+
+class Command(BaseCommand):
+    help = "Run queued timetable generation jobs (for TIMETABLE_JOB_RUNNER=worker)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--poll-interval", type=float, default=1.0,
+                            help="Seconds to wait when the queue is empty")
+        parser.add_argument("--once", action="store_true",
+                            help="Exit once the queue is empty")
+
+    def handle(self, *args, **options):
+        self.stdout.write("Waiting for timetable jobs...")
+        while True:
+            job_id = next_queued_job()
+            if job_id is None:
+                if options["once"]:
+                    return
+                time.sleep(options["poll_interval"])
+                continue
+
+            started = time.perf_counter()
+            if run_job(job_id):
+                self.stdout.write(
+                    f"Job {job_id} finished in {(time.perf_counter() - started) * 1000:.0f} ms"
+                )
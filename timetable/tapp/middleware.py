@@ -0,0 +1,54 @@
+import time
+
+from django.db import connection
+
+from . import profiling
+
+
+class QueryCounter:
+    """connection.execute_wrapper hook counting queries and their time."""
+
+    def __init__(self):
+        self.count = 0
+        self.ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.ms += (time.perf_counter() - started) * 1000
+
+
+class ProfilingMiddleware:
+    """
+    Per-view latency, DB query count and DB time, recorded as
+    view.<url name>.{ms,queries,db_ms} (see tapp.profiling) and sent back in
+    a Server-Timing header. Added to MIDDLEWARE when TIMETABLE_PROFILING
+    is on; it passes requests straight through otherwise.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not profiling.enabled():
+            return self.get_response(request)
+
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        elapsed = (time.perf_counter() - started) * 1000
+
+        match = request.resolver_match
+        name = f"view.{match.view_name if match else 'unresolved'}"
+        fields = {"path": request.path, "method": request.method, "status": response.status_code}
+        profiling.record(f"{name}.ms", elapsed, **fields)
+        profiling.record(f"{name}.queries", counter.count, **fields)
+        profiling.record(f"{name}.db_ms", counter.ms, **fields)
+        response["Server-Timing"] = (
+            f"app;dur={elapsed:.1f}, db;dur={counter.ms:.1f};desc=\"{counter.count} queries\""
+        )
+        return response
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.3 on 2026-10-18 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tapp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='availability',
+            name='owner',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='timetable',
+            name='owner',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='unit',
+            name='owner',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='availability',
+            index=models.Index(fields=['owner', 'day'], name='avail_owner_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='availability',
+            index=models.Index(fields=['owner', 'timetable'], name='avail_owner_timetable_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timetable',
+            index=models.Index(fields=['owner', 'created_at'], name='timetable_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='unit',
+            index=models.Index(fields=['owner', 'timetable'], name='unit_owner_timetable_idx'),
+        ),
+    ]
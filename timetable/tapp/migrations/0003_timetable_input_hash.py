@@ -0,0 +1,22 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tapp', '0002_owner_scope'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timetable',
+            name='input_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='timetable',
+            index=models.Index(fields=['owner', 'input_hash'], name='timetable_owner_hash_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tapp', '0003_timetable_input_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenerationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('owner', models.CharField(blank=True, default='', max_length=64)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=8)),
+                ('progress', models.PositiveSmallIntegerField(default=0)),
+                ('input_hash', models.CharField(blank=True, default='', max_length=64)),
+                ('params', models.JSONField(default=dict)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('timetable', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='tapp.timetable')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner', 'input_hash', 'status'], name='job_owner_hash_status_idx'), models.Index(fields=['status', 'created_at'], name='job_status_created_idx')],
+            },
+        ),
+    ]
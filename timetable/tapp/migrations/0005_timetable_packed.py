@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tapp', '0004_generationjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timetable',
+            name='packed',
+            field=models.BinaryField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:00
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tapp', '0005_timetable_packed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Resource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('capacity', models.PositiveSmallIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(255)])),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ResourceBooking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unit', models.CharField(max_length=255)),
+                ('start', models.PositiveIntegerField()),
+                ('end', models.PositiveIntegerField()),
+                ('resource', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='tapp.resource')),
+                ('timetable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='tapp.timetable')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['resource', 'start'], name='booking_resource_start_idx')],
+            },
+        ),
+    ]
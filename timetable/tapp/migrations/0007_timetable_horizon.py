@@ -0,0 +1,37 @@
+# Generated by Django 5.2.3 on 2026-10-18 16:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tapp', '0006_resource_resourcebooking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timetable',
+            name='starts_on',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='timetable',
+            name='week_count',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.CreateModel(
+            name='TimetableWeek',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.JSONField(blank=True, null=True)),
+                ('packed', models.BinaryField(blank=True, editable=False, null=True)),
+                ('week', models.PositiveSmallIntegerField()),
+                ('timetable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weeks', to='tapp.timetable')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('timetable', 'week'), name='timetable_week_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tapp', '0007_timetable_horizon'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudySession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('owner', models.CharField(blank=True, default='', max_length=64)),
+                ('unit', models.CharField(max_length=255)),
+                ('completed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('minutes', models.PositiveSmallIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner', 'unit', 'completed_at'], name='study_owner_unit_done_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.3 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+def backfill_capacity(apps, schema_editor):
+    Availability = apps.get_model('tapp', 'Availability')
+    AvailabilitySlot = apps.get_model('tapp', 'AvailabilitySlot')
+    totals = {}
+    slots = AvailabilitySlot.objects.values_list('availability_id', 'start_time', 'end_time')
+    for availability_id, start, end in slots.iterator():
+        minutes, count = totals.get(availability_id, (0, 0))
+        if start and end and start < end:
+            minutes += (end.hour - start.hour) * 60 + end.minute - start.minute
+        totals[availability_id] = (minutes, count + 1)
+    for availability_id, (minutes, count) in totals.items():
+        Availability.objects.filter(pk=availability_id).update(
+            capacity_minutes=minutes, slot_count=count
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tapp', '0008_studysession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='availability',
+            name='capacity_minutes',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='availability',
+            name='slot_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_capacity, migrations.RunPython.noop),
+    ]
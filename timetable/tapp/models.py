@@ -1,15 +1,101 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.utils import timezone
 
+from .horizon import week_days
+from .packing import PackedDays, pack
+from .scheduler import content_hash
+
+
+class StoredDays(models.Model):
+    """A {day: sessions} dict stored as JSON or packed (see TIMETABLE_STORAGE)."""
 
-class Timetable(models.Model):
-    created_at = models.DateTimeField(auto_now_add=True)
     data = models.JSONField(blank=True, null=True)  # Store generated timetable as JSON
+    packed = models.BinaryField(blank=True, null=True, editable=False)  # see tapp/packing.py
+
+    class Meta:
+        abstract = True
+
+    @property
+    def days(self):
+        """
+        The timetable as {day: sessions}, whichever format the row is stored
+        in. Packed rows decode a day only when it is read.
+        """
+        if self.packed is not None:
+            return PackedDays(self.packed)
+        return self.data or {}
+
+    def set_days(self, data):
+        """Store `data` in the format chosen by TIMETABLE_STORAGE."""
+        if settings.TIMETABLE_STORAGE == "packed":
+            self.packed, self.data = pack(data), None
+        else:
+            self.packed, self.data = None, data
+
+    def days_hash(self):
+        """Key for caching renderings of this timetable's content."""
+        if self.packed is not None:
+            return hashlib.sha256(bytes(self.packed)).hexdigest()
+        return content_hash(self.data)
+
+
+class Timetable(StoredDays):
+    owner = models.CharField(max_length=64, blank=True, default="")  # see utils.get_owner
+    created_at = models.DateTimeField(auto_now_add=True)
+    input_hash = models.CharField(max_length=64, blank=True, default="")  # scheduler.fingerprint
+    # Term plans (tapp/horizon.py): `days` is the base week, repeated from
+    # starts_on for week_count weeks except where a TimetableWeek overrides it
+    starts_on = models.DateField(blank=True, null=True)
+    week_count = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["owner", "created_at"], name="timetable_owner_created_idx"),
+            models.Index(fields=["owner", "input_hash"], name="timetable_owner_hash_idx"),
+        ]
 
     def __str__(self):
         return f"Timetable {self.id} - {self.created_at.strftime('%Y-%m-%d %H:%M')}"
 
+    def iter_weeks(self):
+        """
+        (monday, days) for each week of a term plan, in order. Overlays are
+        streamed from the database, and a week without one is the base week
+        itself, so the term is never loaded as a whole.
+        """
+        base = self.days
+        overlays = self.weeks.order_by("week").iterator()
+        overlay = next(overlays, None)
+        for week in range(self.week_count):
+            days = base
+            if overlay is not None and overlay.week == week:
+                days = week_days(base, overlay.days)
+                overlay = next(overlays, None)
+            yield self.starts_on + timedelta(weeks=week), days
+
+
+class TimetableWeek(StoredDays):
+    """The days of one week of a term plan that differ from its base week."""
+
+    timetable = models.ForeignKey(Timetable, related_name="weeks", on_delete=models.CASCADE)
+    week = models.PositiveSmallIntegerField()  # 0 is the week of starts_on
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["timetable", "week"], name="timetable_week_unique"),
+        ]
+
+    def __str__(self):
+        return f"Timetable {self.timetable_id}, week {self.week + 1}"
+
 
 class Unit(models.Model):
+    owner = models.CharField(max_length=64, blank=True, default="")
     timetable = models.ForeignKey(
         Timetable, related_name="units", on_delete=models.CASCADE,
         null=True, blank=True   # Allow units without a timetable initially
@@ -17,11 +103,17 @@ class Unit(models.Model):
     name = models.CharField(max_length=255)
     difficulty = models.PositiveSmallIntegerField(default=5)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["owner", "timetable"], name="unit_owner_timetable_idx"),
+        ]
+
     def __str__(self):
         return f"{self.name} (D={self.difficulty})"
 
 
 class Availability(models.Model):
+    owner = models.CharField(max_length=64, blank=True, default="")
     timetable = models.ForeignKey(
         Timetable, related_name="availability", on_delete=models.CASCADE,
         null=True, blank=True   # Allow availability records before timetable is finalized
@@ -37,10 +129,36 @@ class Availability(models.Model):
         ("sun", "Sunday"),
     ]
     day = models.CharField(max_length=3, choices=DAY_CHOICES)
+    # Totals of the day's slots, kept up to date on every slot write (see
+    # tapp/signals.py); `manage.py rebuild_capacity` recomputes them
+    capacity_minutes = models.PositiveIntegerField(default=0, editable=False)
+    slot_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["owner", "day"], name="avail_owner_day_idx"),
+            models.Index(fields=["owner", "timetable"], name="avail_owner_timetable_idx"),
+        ]
 
     def __str__(self):
         return self.get_day_display()
 
+    @property
+    def capacity_display(self):
+        return format_minutes(self.capacity_minutes)
+
+
+def format_minutes(total):
+    hours, minutes = divmod(total, 60)
+    return f"{hours}h {minutes:02d}m"
+
+
+def slot_minutes(start_time, end_time):
+    """Length of a slot in minutes; 0 when a bound is missing or it's empty."""
+    if not (start_time and end_time) or start_time >= end_time:
+        return 0
+    return (end_time.hour - start_time.hour) * 60 + end_time.minute - start_time.minute
+
 
 class AvailabilitySlot(models.Model):
     availability = models.ForeignKey(
@@ -54,3 +172,100 @@ class AvailabilitySlot(models.Model):
             f"{self.availability.get_day_display()} "
             f"{self.start_time or '...'} - {self.end_time or '...'}"
         )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        slot = super().from_db(db, field_names, values)
+        # What the day's totals currently count for this row, so a save
+        # adds only the difference
+        if "start_time" in slot.__dict__ and "end_time" in slot.__dict__:
+            slot.counted_minutes = slot.minutes
+        return slot
+
+    @property
+    def minutes(self):
+        return slot_minutes(self.start_time, self.end_time)
+
+
+class GenerationJob(models.Model):
+    """A queued timetable generation; see tapp/jobs.py."""
+
+    QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    owner = models.CharField(max_length=64, blank=True, default="")
+    status = models.CharField(max_length=8, choices=STATUS_CHOICES, default=QUEUED)
+    progress = models.PositiveSmallIntegerField(default=0)  # percent
+    input_hash = models.CharField(max_length=64, blank=True, default="")
+    params = models.JSONField(default=dict)  # input snapshot and engine options
+    timetable = models.ForeignKey(
+        Timetable, related_name="jobs", on_delete=models.SET_NULL, null=True, blank=True
+    )
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["owner", "input_hash", "status"], name="job_owner_hash_status_idx"),
+            models.Index(fields=["status", "created_at"], name="job_status_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"Job {self.id} ({self.status}, {self.progress}%)"
+
+
+class Resource(models.Model):
+    """A room (or anything else) shared by many students' timetables."""
+
+    name = models.CharField(max_length=100, unique=True)
+    capacity = models.PositiveSmallIntegerField(  # students at once
+        default=1, validators=[MinValueValidator(1), MaxValueValidator(255)]
+    )
+
+    def __str__(self):
+        return f"{self.name} ({self.capacity})"
+
+
+class ResourceBooking(models.Model):
+    """A stretch of one timetable session held in a resource; see tapp/resources.py."""
+
+    resource = models.ForeignKey(Resource, related_name="bookings", on_delete=models.CASCADE)
+    timetable = models.ForeignKey(Timetable, related_name="bookings", on_delete=models.CASCADE)
+    unit = models.CharField(max_length=255)
+    start = models.PositiveIntegerField()  # minutes since Monday 00:00
+    end = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["resource", "start"], name="booking_resource_start_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.resource.name}: {self.unit} @ {self.start}-{self.end}"
+
+
+class StudySession(models.Model):
+    """
+    A completed study session. Units are weighted by how long ago and how
+    often they were studied (tapp/decay.py). Kept by unit name so the
+    history outlives resets of the units themselves.
+    """
+
+    owner = models.CharField(max_length=64, blank=True, default="")
+    unit = models.CharField(max_length=255)
+    completed_at = models.DateTimeField(default=timezone.now)
+    minutes = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["owner", "unit", "completed_at"], name="study_owner_unit_done_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.unit} @ {self.completed_at:%Y-%m-%d %H:%M}"
@@ -0,0 +1,209 @@
+import math
+import random
+import time
+
+from .specs import Session
+
+
+# --- Objective weights (lower score is better) ---
+BALANCE_WEIGHT = 10     # per hour away from a unit's exact difficulty share
+HARD_PAIR_WEIGHT = 3    # two different hard units back to back
+SPACING_WEIGHT = 2      # same unit split into several sessions on one day
+LONG_BLOCK_WEIGHT = 1   # per hour a session runs past MAX_BLOCK_HOURS
+
+HARD_DIFFICULTY = 7
+MAX_BLOCK_HOURS = 2
+
+
+class LocalSearch:
+    """
+    Anytime local search over slot blocks, seeded with the greedy schedule.
+
+    Every `granularity`-minute block of availability is a cell holding a
+    unit name or None. Moves either swap two cells or reassign one cell,
+    and are accepted with simulated-annealing odds. The score splits into a per-day part (hard
+    pairs, spacing, long blocks) and a global balance part, so a move only
+    rescores the days it touches and the balance of the units it moves.
+    """
+
+    def __init__(self, slots, difficulties, schedule, seed=None):
+        self.difficulties = difficulties
+        self.rng = random.Random(seed)
+        self.units = list(difficulties)
+        self.choices = self.units + [None]  # what a reassign move can put in a cell
+
+        # Weights are per hour; convert to per block
+        self.granularity = slots.granularity
+        self.block_hours = slots.granularity / 60
+        self.max_block_cells = max(1, MAX_BLOCK_HOURS * 60 // slots.granularity)
+
+        total_difficulty = sum(difficulties.values())
+        self.cells = []       # (day, start week-minute)
+        self.day_runs = {}    # day -> [[cell indices of slot 0], [slot 1], ...]
+        for day, indices in slots.day_slots.items():
+            runs = []
+            for i in indices:
+                run = []
+                for b in range(slots.blocks(i)):
+                    run.append(len(self.cells))
+                    self.cells.append((day, slots.starts[i] + b * self.granularity))
+                runs.append(run)
+            self.day_runs[day] = runs
+
+        total_cells = len(self.cells)
+        self.targets = {
+            u: (d / total_difficulty) * total_cells if total_difficulty else 0
+            for u, d in difficulties.items()
+        }
+
+        # --- Seed from the greedy result ---
+        lookup = {minute: i for i, (_, minute) in enumerate(self.cells)}
+        self.grid = [None] * total_cells
+        for sessions in (schedule or {}).values():
+            for unit, start, end in sessions:
+                for minute in range(start, end, self.granularity):
+                    i = lookup.get(minute)
+                    if i is not None:
+                        self.grid[i] = unit
+
+        self.assigned = {u: 0 for u in self.units}
+        for unit in self.grid:
+            if unit is not None:
+                self.assigned[unit] += 1
+        # Sum of every unit's distance from its target, kept up to date by _apply()
+        self.imbalance = sum(abs(self.assigned[u] - self.targets[u]) for u in self.units)
+
+        self.day_scores = {day: self._score_day(day) for day in self.day_runs}
+        self.score = sum(self.day_scores.values()) + self._score_balance()
+
+    # --- Objective ---
+    def _is_hard(self, unit):
+        return unit is not None and self.difficulties[unit] >= HARD_DIFFICULTY
+
+    def _score_day(self, day):
+        score = 0
+        sessions_per_unit = {}
+        for run in self.day_runs[day]:
+            prev, block = None, 0
+            for i in run:
+                unit = self.grid[i]
+                if unit is not None and unit == prev:
+                    block += 1
+                else:
+                    if unit is not None:
+                        sessions_per_unit[unit] = sessions_per_unit.get(unit, 0) + 1
+                    if self._is_hard(unit) and self._is_hard(prev):
+                        score += HARD_PAIR_WEIGHT
+                    block = 1
+                if block > self.max_block_cells:
+                    score += LONG_BLOCK_WEIGHT * self.block_hours
+                prev = unit
+        for count in sessions_per_unit.values():
+            score += SPACING_WEIGHT * (count - 1)
+        return score
+
+    def _score_balance(self):
+        return BALANCE_WEIGHT * self.block_hours * self.imbalance
+
+    # --- Moves ---
+    def _apply(self, changes):
+        """Set cells and return the changes that would undo it."""
+        undo = [(i, self.grid[i]) for i, _ in changes]
+        moved = {}  # unit -> net change in assigned cells; a swap nets to zero
+        for i, unit in changes:
+            old = self.grid[i]
+            if old is not None:
+                moved[old] = moved.get(old, 0) - 1
+            if unit is not None:
+                moved[unit] = moved.get(unit, 0) + 1
+            self.grid[i] = unit
+        for unit, change in moved.items():
+            if change:
+                count, target = self.assigned[unit], self.targets[unit]
+                self.imbalance += abs(count + change - target) - abs(count - target)
+                self.assigned[unit] = count + change
+        return undo
+
+    def _rescore(self, days):
+        new_day_scores = {day: self._score_day(day) for day in days}
+        day_total = sum(self.day_scores.values()) + sum(
+            new_day_scores[d] - self.day_scores[d] for d in days
+        )
+        return new_day_scores, day_total + self._score_balance()
+
+    def _propose(self):
+        a = self.rng.randrange(len(self.cells))
+        if self.rng.random() < 0.5:
+            b = self.rng.randrange(len(self.cells))
+            return [(a, self.grid[b]), (b, self.grid[a])]
+        return [(a, self.rng.choice(self.choices))]
+
+    def run(self, budget_ms, max_iterations=None):
+        """Search until the wall-clock budget runs out and return the best found."""
+        best_grid, best_score = list(self.grid), self.score
+        iterations = 0
+        started = time.perf_counter()
+        deadline = started + budget_ms / 1000
+
+        if self.cells and self.units:
+            while max_iterations is None or iterations < max_iterations:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                iterations += 1
+
+                changes = self._propose()
+                days = {self.cells[i][0] for i, _ in changes}
+                undo = self._apply(changes)
+                new_day_scores, new_score = self._rescore(days)
+
+                # Temperature cools linearly over the budget
+                temperature = max(1e-3, 2.0 * (deadline - now) / (deadline - started))
+                delta = new_score - self.score
+                if delta <= 0 or self.rng.random() < math.exp(-delta / temperature):
+                    self.day_scores.update(new_day_scores)
+                    self.score = new_score
+                    if new_score < best_score:
+                        best_grid, best_score = list(self.grid), new_score
+                else:
+                    self._apply(undo)
+
+        self.grid = best_grid
+        return {
+            "score": round(best_score, 2),
+            "iterations": iterations,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    # --- Output ---
+    def to_schedule(self):
+        schedule = {day: [] for day in self.day_runs}
+        for day, runs in self.day_runs.items():
+            sessions = schedule[day]
+            for run in runs:
+                prev = None
+                for i in run:
+                    unit, minute = self.grid[i], self.cells[i][1]
+                    end = minute + self.granularity
+                    if unit is not None and unit == prev:
+                        sessions[-1] = sessions[-1]._replace(end=end)
+                    elif unit is not None:
+                        sessions.append(Session(unit, minute, end))
+                    prev = unit
+        return schedule
+
+
+def optimize_schedule(slots, difficulties, schedule, budget_ms=200,
+                      seed=None, max_iterations=None):
+    """
+    Improve a greedy schedule (see scheduler.assign_sessions) within
+    `budget_ms` milliseconds.
+    Returns (schedule, stats) where stats has the objective `score`
+    of the best solution, the `initial_score` of the greedy seed,
+    the number of `iterations` and `elapsed_ms`.
+    """
+    search = LocalSearch(slots, difficulties, schedule, seed=seed)
+    initial_score = round(search.score, 2)
+    stats = search.run(budget_ms, max_iterations=max_iterations)
+    stats["initial_score"] = initial_score
+    return search.to_schedule(), stats
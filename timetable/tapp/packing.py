@@ -0,0 +1,109 @@
+"""
+Compact binary encoding of Timetable.data.
+
+Layout (little-endian):
+
+    header      "TTP1", day count (B), unit names length in bytes (I)
+    unit names  UTF-8, NUL-separated
+    day table   per day: day index (B), first session (H), session count (H)
+    sessions    uint16 triples (unit index, start minute, end minute)
+
+Unit names are stored once instead of once per session, and the day table
+lets a reader decode a single day without touching the others.
+"""
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+
+from .specs import DAY_INDEX, DAYS
+
+MAGIC = b"TTP1"
+_HEADER = struct.Struct("<4sBI")
+_DAY_ENTRY = struct.Struct("<BHH")
+_SWAP = sys.byteorder != "little"
+
+
+def _minutes(hhmm):
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+# Every "HH:MM" label of a day, so decoding is a tuple lookup per time
+_HHMM = tuple(f"{m // 60:02d}:{m % 60:02d}" for m in range(24 * 60 + 1))
+
+
+def pack(data):
+    """Encode Timetable.data ({day: [{"unit", "start", "end"}]}) as bytes."""
+    names, index = [], {}
+    table, cells = [], array("H")
+    for day, sessions in data.items():
+        table.append((DAY_INDEX[day], len(cells) // 3, len(sessions)))
+        for session in sessions:
+            unit = session["unit"]
+            if unit not in index:
+                index[unit] = len(names)
+                names.append(unit)
+            cells.extend((index[unit], _minutes(session["start"]), _minutes(session["end"])))
+
+    encoded = "\0".join(names).encode("utf-8")
+    parts = [_HEADER.pack(MAGIC, len(table), len(encoded)), encoded]
+    parts.extend(_DAY_ENTRY.pack(*entry) for entry in table)
+    if _SWAP:
+        cells.byteswap()
+    parts.append(cells.tobytes())
+    return b"".join(parts)
+
+
+class PackedDays(Mapping):
+    """
+    Read-only {day: sessions} view over a packed blob. The header is parsed
+    on first use; each day's sessions are decoded when that day is read.
+    """
+
+    def __init__(self, blob):
+        self._blob = bytes(blob)  # BinaryField may hand back a memoryview
+        self._names = None
+        self._days = None
+        self._decoded = {}
+
+    def _parse_header(self):
+        magic, day_count, names_length = _HEADER.unpack_from(self._blob, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a packed timetable.")
+        offset = _HEADER.size + names_length
+        names = self._blob[_HEADER.size:offset].decode("utf-8").split("\0")
+        days = {}
+        for _ in range(day_count):
+            day, first, count = _DAY_ENTRY.unpack_from(self._blob, offset)
+            days[DAYS[day]] = (first, count)
+            offset += _DAY_ENTRY.size
+        self._names, self._days, self._cells_offset = names, days, offset
+
+    def _index(self):
+        if self._days is None:
+            self._parse_header()
+        return self._days
+
+    def __getitem__(self, day):
+        if day not in self._decoded:
+            first, count = self._index()[day]
+            start = self._cells_offset + first * 6
+            cells = array("H", self._blob[start:start + count * 6])
+            if _SWAP:
+                cells.byteswap()
+            names = self._names
+            self._decoded[day] = [
+                {"unit": names[unit], "start": _HHMM[start], "end": _HHMM[end]}
+                for unit, start, end in zip(cells[0::3], cells[1::3], cells[2::3])
+            ]
+        return self._decoded[day]
+
+    def __iter__(self):
+        return iter(self._index())
+
+    def __len__(self):
+        return len(self._index())
+
+    def __contains__(self, day):
+        return day in self._index()
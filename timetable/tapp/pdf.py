@@ -0,0 +1,35 @@
+"""
+PDF rendering of timetables.
+
+reportlab is heavy to import, so it lives in tapp/pdf_backend.py and is
+only loaded when the first PDF is rendered: workers that never serve a
+PDF (or an API-only worker, see timetable/settings_lean.py) don't pay
+for it at startup.
+"""
+import tempfile
+
+LAYOUTS = ("list", "grid")
+CHUNK_SIZE = 64 * 1024
+SPOOL_LIMIT = 1024 * 1024  # rendered PDFs larger than this spill to disk
+
+
+def render_pdf(data, out, layout="list"):
+    """Render timetable `data` (Timetable.data) as a PDF into file-like `out`."""
+    from .pdf_backend import render_pdf
+
+    render_pdf(data, out, layout)
+
+
+def iter_pdf(data, layout="list", chunk_size=CHUNK_SIZE):
+    """
+    Render into a spooled temp file and yield it in chunks, so large PDFs are
+    sent from disk rather than held in memory while the response streams.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_LIMIT) as out:
+        render_pdf(data, out, layout)
+        out.seek(0)
+        while True:
+            chunk = out.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
@@ -0,0 +1,138 @@
+"""
+The reportlab side of tapp/pdf.py, imported on the first render only.
+"""
+from functools import lru_cache
+
+from reportlab.lib.pagesizes import landscape, letter
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+from .profiling import timed
+
+DAY_NAMES = {
+    "mon": "Monday", "tue": "Tuesday", "wed": "Wednesday", "thu": "Thursday",
+    "fri": "Friday", "sat": "Saturday", "sun": "Sunday",
+}
+
+
+@lru_cache(maxsize=4096)
+def _fit(text, font, size, width):
+    """Truncate `text` to `width` points; widths are cached per label."""
+    if stringWidth(text, font, size) <= width:
+        return text
+    while text and stringWidth(text + "…", font, size) > width:
+        text = text[:-1]
+    return text + "…" if text else ""
+
+
+def _minutes(hhmm):
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+# ---------------------- Layouts ----------------------
+def _draw_list(p, data):
+    """One line per session, grouped by day, continued over as many pages as needed."""
+    width, height = letter
+
+    p.setFont("Helvetica-Bold", 16)
+    p.drawString(200, height - 50, "Your Timetable")
+    y = height - 100
+
+    # Text objects keep the current font between lines, so the font is set
+    # once per run of lines instead of once per line.
+    for day, sessions in data.items():
+        text = p.beginText(100, y)
+        text.setFont("Helvetica-Bold", 13)
+        text.textLine(DAY_NAMES.get(day, day))
+        y -= 20
+        text.setTextOrigin(120, y)
+        text.setFont("Helvetica", 11)
+        text.setLeading(15)
+
+        for session in sessions:
+            text.textLine(f"{session['unit']} ({session['start']} - {session['end']})")
+            y -= 15
+
+            if y < 50:  # new page if space runs out
+                p.drawText(text)
+                p.showPage()
+                y = height - 50
+                text = p.beginText(120, y)
+                text.setFont("Helvetica", 11)
+                text.setLeading(15)
+
+        p.drawText(text)
+        y -= 10  # space between days
+        if y < 70:
+            p.showPage()
+            y = height - 50
+
+    p.showPage()
+
+
+def _draw_grid(p, data):
+    """Week grid: one column per day, time running down the page."""
+    width, height = landscape(letter)
+    days = list(data) or ["mon"]
+    margin, header, gutter = 36, 40, 40
+
+    starts = [_minutes(s["start"]) for sessions in data.values() for s in sessions]
+    ends = [_minutes(s["end"]) for sessions in data.values() for s in sessions]
+    first = (min(starts) // 60) * 60 if starts else 8 * 60
+    last = -(-max(ends) // 60) * 60 if ends else 18 * 60
+    last = max(last, first + 60)
+
+    top = height - margin - header
+    bottom = margin
+    per_minute = (top - bottom) / (last - first)
+    column = (width - 2 * margin - gutter) / len(days)
+
+    p.setFont("Helvetica-Bold", 16)
+    p.drawString(margin, height - margin - 16, "Your Week")
+
+    # Hour lines and labels
+    p.setStrokeGray(0.85)
+    p.setFont("Helvetica", 8)
+    for minute in range(first, last + 1, 60):
+        y = top - (minute - first) * per_minute
+        p.line(margin + gutter, y, width - margin, y)
+        p.drawRightString(margin + gutter - 4, y - 3, f"{minute // 60:02d}:00")
+
+    # Day headers
+    p.setFont("Helvetica-Bold", 11)
+    for i, day in enumerate(days):
+        x = margin + gutter + i * column
+        p.drawCentredString(x + column / 2, top + 6, DAY_NAMES.get(day, day))
+        p.line(x, top, x, bottom)
+
+    # Sessions
+    p.setStrokeGray(0.4)
+    p.setFont("Helvetica", 8)
+    for i, day in enumerate(days):
+        x = margin + gutter + i * column
+        for session in data.get(day, []):
+            y_top = top - (_minutes(session["start"]) - first) * per_minute
+            y_bottom = top - (_minutes(session["end"]) - first) * per_minute
+            p.setFillColorRGB(0.98, 0.63, 0.32)
+            p.rect(x + 2, y_bottom, column - 4, y_top - y_bottom, fill=1, stroke=1)
+            if y_top - y_bottom >= 10:
+                p.setFillGray(0)
+                label = _fit(session["unit"], "Helvetica", 8, column - 8)
+                p.drawString(x + 4, y_top - 9, label)
+
+    p.showPage()
+
+
+# ---------------------- Rendering ----------------------
+@timed("pdf.render")
+def render_pdf(data, out, layout="list"):
+    """Render timetable `data` (Timetable.data) as a PDF into file-like `out`."""
+    pagesize = landscape(letter) if layout == "grid" else letter
+    p = canvas.Canvas(out, pagesize=pagesize)
+    if layout == "grid":
+        _draw_grid(p, data or {})
+    else:
+        _draw_list(p, data or {})
+    p.save()
+
@@ -0,0 +1,112 @@
+"""
+Opt-in timing for views, scheduler phases and PDF rendering.
+
+    with timed("scheduler.assign"):
+        ...
+
+    @timed("pdf.render")
+    def render_pdf(...):
+        ...
+
+Samples go to a rolling histogram per metric (see snapshot(), served at
+/debug/metrics/) and to the "tapp.profiling" logger as structured records.
+Nothing is measured unless enabled with configure(), which the app does at
+startup when settings.TIMETABLE_PROFILING is on. This module has no Django
+imports, so the pure scheduler can be instrumented too.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import ContextDecorator
+
+logger = logging.getLogger(__name__)
+
+_enabled = False
+_window = 1000
+_histograms = {}
+_lock = threading.Lock()
+
+
+def configure(enabled, window=1000):
+    """Turn profiling on or off; `window` is the number of samples kept per metric."""
+    global _enabled, _window
+    _enabled, _window = enabled, window
+
+
+def enabled():
+    return _enabled
+
+
+class Histogram:
+    """The last `window` samples of one metric, summarized on demand."""
+
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {"count": self.count}
+
+        def pct(p):
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 3)
+
+        return {
+            "count": self.count,
+            "window": len(ordered),
+            "mean": round(sum(ordered) / len(ordered), 3),
+            "p50": pct(0.50),
+            "p95": pct(0.95),
+            "p99": pct(0.99),
+            "max": round(ordered[-1], 3),
+        }
+
+
+def record(name, value, **fields):
+    """Add one sample of `name` and log it with any extra `fields`."""
+    if not _enabled:
+        return
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram(_window)
+        histogram.add(value)
+    logger.info("%s %.3f", name, value, extra={"metric": name, "value": value, **fields})
+
+
+def snapshot():
+    """{metric: summary} for every metric recorded so far."""
+    with _lock:
+        return {name: h.summary() for name, h in sorted(_histograms.items())}
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+class timed(ContextDecorator):
+    """Record the wall time of a block or function call, in ms, as `name`."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def _recreate_cm(self):
+        # A fresh timer per decorated call, so threads and recursion don't
+        # share a start time
+        return type(self)(self.name)
+
+    def __enter__(self):
+        self.started = time.perf_counter() if _enabled else None
+        return self
+
+    def __exit__(self, *exc):
+        if self.started is not None:
+            record(self.name, (time.perf_counter() - self.started) * 1000)
+        return False
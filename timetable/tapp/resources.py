@@ -0,0 +1,134 @@
+"""
+Shared resources (rooms) for scheduling many students' timetables at once.
+
+The week is cut into cells of `granularity` minutes. Each resource keeps its
+occupancy per cell in a bytearray, and `full` holds one bitmask per cell
+with bit r set while resource r is at capacity. Finding a resource with
+room over a session is then a few integer operations per cell, whatever
+the number of students already booked or resources in the pool.
+"""
+from typing import NamedTuple
+
+from .scheduler import SlotTable, build_schedule, unit_weights
+from .specs import MINUTES_PER_DAY
+
+WEEK_MINUTES = 7 * MINUTES_PER_DAY
+
+
+class Booking(NamedTuple):
+    resource: str
+    unit: str
+    start: int  # minutes since Monday 00:00
+    end: int
+
+
+class ResourceFull(Exception):
+    """No resource has room for (part of) a session."""
+
+
+class ResourcePool:
+    def __init__(self, capacities, granularity=30):
+        """`capacities`: {resource name: how many students it holds at once}."""
+        if not capacities:
+            raise ValueError("A resource pool needs at least one resource.")
+        if any(not 1 <= c <= 255 for c in capacities.values()):
+            raise ValueError("Resource capacity must be between 1 and 255.")
+        self.granularity = granularity
+        self.names = list(capacities)
+        self.capacity = bytes(capacities.values())
+        cells = WEEK_MINUTES // granularity
+        self.load = [bytearray(cells) for _ in self.names]
+        self.full = [0] * cells
+        self.all_full = (1 << len(self.names)) - 1
+        self._index = {name: r for r, name in enumerate(self.names)}
+
+    def _cells(self, start, end):
+        return range(start // self.granularity, -(-end // self.granularity))
+
+    def _take(self, r, cells):
+        load, capacity, bit = self.load[r], self.capacity[r], 1 << r
+        for c in cells:
+            load[c] += 1
+            if load[c] >= capacity:
+                self.full[c] |= bit
+
+    def reserve(self, resource, start, end):
+        """Record an existing booking (e.g. loaded from the database)."""
+        self._take(self._index[resource], self._cells(start, end))
+
+    def open_ranges(self, start, end):
+        """
+        Whole cells within [start, end) during which at least one resource
+        has room. Partial cells at the edges are left out, so sessions built
+        from these ranges never share a cell.
+        """
+        g = self.granularity
+        ranges, run_start = [], None
+        for c in range(-(-start // g), end // g):
+            if self.full[c] != self.all_full:
+                if run_start is None:
+                    run_start = c * g
+            elif run_start is not None:
+                ranges.append((run_start, c * g))
+                run_start = None
+        if run_start is not None:
+            ranges.append((run_start, end // g * g))
+        return ranges
+
+    def restrict(self, slots):
+        """A copy of SlotTable `slots` keeping only the time some resource is free."""
+        if slots.granularity != self.granularity:
+            raise ValueError("The slots and the pool must use the same granularity.")
+        restricted = SlotTable(slots.granularity)
+        for day, indices in slots.day_slots.items():
+            restricted.add_day(day)
+            for i in indices:
+                for start, end in self.open_ranges(slots.starts[i], slots.ends[i]):
+                    restricted.add_range(day, start, end)
+        return restricted
+
+    def book(self, unit, start, end):
+        """
+        Seat one session, staying in the same resource as long as it has
+        room and moving to the lowest-numbered free one otherwise. Returns
+        the Bookings; raises ResourceFull if some cell has no room at all.
+        """
+        g = self.granularity
+        cells = self._cells(start, end)
+        runs, current = [], None
+        for c in cells:
+            mask = self.full[c]
+            if current is None or mask >> current & 1:
+                free = ~mask & self.all_full
+                if not free:
+                    raise ResourceFull(f"No resource free at week minute {c * g}")
+                current = (free & -free).bit_length() - 1
+                runs.append([current, c, c + 1])
+            else:
+                runs[-1][2] = c + 1
+
+        bookings = []
+        for r, first, last in runs:
+            self._take(r, range(first, last))
+            bookings.append(
+                Booking(self.names[r], unit, max(start, first * g), min(end, last * g))
+            )
+        return bookings
+
+
+def schedule_cohort(students, pool, granularity=30, **options):
+    """
+    Schedule each (key, Inputs) of `students` in turn against the shared
+    `pool`, so later students only get time that still has a free resource.
+    Yields (key, schedule, bookings); schedule is None when there is
+    nothing to schedule. `options` go to scheduler.build_schedule().
+    """
+    for key, inputs in students:
+        slots = pool.restrict(SlotTable.from_inputs(inputs, granularity))
+        schedule, _ = build_schedule(unit_weights(inputs.units), slots, **options)
+        bookings = []
+        if schedule is not None:
+            for sessions in schedule.values():
+                for unit, start, end in sessions:
+                    bookings.extend(pool.book(unit, start, end))
+        yield key, schedule, bookings
@@ -0,0 +1,434 @@
+import hashlib
+import heapq
+import json
+from array import array
+
+from .decay import decay_factor
+from .intervals import IntervalIndex
+from .optimizer import optimize_schedule
+from .profiling import timed
+from .specs import DAY_INDEX, MINUTES_PER_DAY, Session
+
+GRANULARITIES = (15, 30, 60)
+
+
+# ---------------------- Time arithmetic ----------------------
+def to_week_minute(day, t):
+    """Minutes since Monday 00:00 for a day key and a datetime.time."""
+    return DAY_INDEX[day] * MINUTES_PER_DAY + t.hour * 60 + t.minute
+
+
+def to_hhmm(week_minute):
+    """Format a week minute as "HH:MM" wall-clock time."""
+    minute = week_minute % MINUTES_PER_DAY
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def from_hhmm(day, hhmm):
+    """Parse "HH:MM" on `day` back into a week minute."""
+    hours, minutes = hhmm.split(":")
+    return DAY_INDEX[day] * MINUTES_PER_DAY + int(hours) * 60 + int(minutes)
+
+
+class SlotTable:
+    """
+    Weekly availability as integer [start, end) week-minute intervals.
+
+    Slots are added to a per-day IntervalIndex, so overlapping, duplicate
+    and touching slots merge and no wall-clock time is counted twice. The
+    merged bounds are then laid out in two compact arrays; `day_slots`
+    keeps, per day from Monday to Sunday, the indices of that day's slots
+    ordered by start time, so the same availability always schedules the
+    same way. Capacity is counted in blocks of `granularity` minutes, so a
+    90-minute slot is three 30-minute blocks instead of one truncated hour.
+    """
+
+    def __init__(self, granularity=60):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of {GRANULARITIES}")
+        self.granularity = granularity
+        self.intervals = {}
+        self._layout = None
+
+    @classmethod
+    def from_inputs(cls, inputs, granularity=60):
+        slots = cls(granularity)
+        for day in inputs.days:
+            slots.add_day(day)
+        for spec in inputs.slots:
+            slots.add_range(spec.day, spec.start, spec.end)
+        return slots
+
+    def add_day(self, day):
+        if day not in self.intervals:
+            self.intervals[day] = IntervalIndex()
+            self.intervals = dict(
+                sorted(self.intervals.items(), key=lambda item: DAY_INDEX[item[0]])
+            )
+            self._layout = None
+
+    def add(self, day, start_time, end_time):
+        """Add a slot; returns False if its merged slot holds no whole block."""
+        self.add_day(day)
+        if not start_time or not end_time:
+            return False
+        return self.add_range(day, to_week_minute(day, start_time), to_week_minute(day, end_time))
+
+    def add_range(self, day, start, end):
+        """Add a slot given as week minutes; see add()."""
+        self.add_day(day)
+        if end <= start:
+            return False
+        start, end = self.intervals[day].add(start, end)
+        self._layout = None
+        return (end - start) // self.granularity > 0
+
+    def _lay_out(self):
+        # Slots too short for a whole block are left out, as if never added
+        starts, ends, day_slots = array("i"), array("i"), {}
+        for day, index in self.intervals.items():
+            day_slots[day] = []
+            for start, end in index:
+                if (end - start) // self.granularity > 0:
+                    day_slots[day].append(len(starts))
+                    starts.append(start)
+                    ends.append(end)
+        self._layout = starts, ends, day_slots
+        return self._layout
+
+    @property
+    def starts(self):
+        return (self._layout or self._lay_out())[0]
+
+    @property
+    def ends(self):
+        return (self._layout or self._lay_out())[1]
+
+    @property
+    def day_slots(self):
+        return (self._layout or self._lay_out())[2]
+
+    def blocks(self, i):
+        return (self.ends[i] - self.starts[i]) // self.granularity
+
+    @property
+    def total_blocks(self):
+        return sum(self.blocks(i) for i in range(len(self.starts)))
+
+
+def fingerprint(difficulties, slots, **params):
+    """
+    Content hash of a scheduling input: sorted (name, difficulty) pairs, the
+    days and sorted slot intervals, the granularity and any extra `params`
+    (engine, budget). Equal inputs always hash equal, whatever the row order.
+    """
+    canonical = {
+        "units": sorted(difficulties.items()),
+        "days": list(slots.day_slots),
+        "slots": sorted(zip(slots.starts, slots.ends)),
+        "granularity": slots.granularity,
+        "params": params,
+    }
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def content_hash(data):
+    """Hash of a generated Timetable.data, for caching its renderings."""
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+# ---------------------- Allocation ----------------------
+def allocate(difficulties, total_blocks):
+    """Weekly blocks per unit, proportional to difficulty (at least one each)."""
+    total_difficulty = sum(difficulties.values())
+    return {
+        name: max(1, int((difficulty / total_difficulty) * total_blocks))
+        for name, difficulty in difficulties.items()
+    }
+
+
+class ScanAllocator:
+    """
+    Reference allocator: picks the unit with the most remaining blocks by
+    scanning every unit on each pick. O(units) per pick.
+    """
+
+    def __init__(self, allocations):
+        self.remaining = dict(allocations)
+
+    def pick(self):
+        if not any(v > 0 for v in self.remaining.values()):
+            return None
+        unit = max(self.remaining, key=lambda k: self.remaining[k])
+        if self.remaining[unit] <= 0:
+            return None
+        return unit
+
+    def consume(self, unit, blocks):
+        self.remaining[unit] -= blocks
+
+
+class HeapAllocator:
+    """
+    Priority queue of remaining blocks. Entries are (-remaining, order, unit);
+    `order` is the unit's position in the allocations dict, so ties resolve
+    exactly like max() over the dict. Entries whose blocks no longer match
+    `remaining` are stale and skipped on pop (lazy invalidation).
+    """
+
+    def __init__(self, allocations):
+        self.remaining = dict(allocations)
+        self.order = {unit: i for i, unit in enumerate(self.remaining)}
+        self.heap = [
+            (-blocks, self.order[unit], unit)
+            for unit, blocks in self.remaining.items()
+            if blocks > 0
+        ]
+        heapq.heapify(self.heap)
+
+    def pick(self):
+        while self.heap:
+            neg_blocks, _, unit = self.heap[0]
+            if -neg_blocks == self.remaining[unit]:
+                return unit
+            heapq.heappop(self.heap)  # stale entry
+        return None
+
+    def consume(self, unit, blocks):
+        self.set(unit, self.remaining[unit] - blocks)
+
+    def set(self, unit, blocks):
+        """Change a unit's remaining blocks; the old heap entry goes stale."""
+        if unit not in self.order:
+            self.order[unit] = len(self.order)
+        self.remaining[unit] = blocks
+        if blocks > 0:
+            heapq.heappush(self.heap, (-blocks, self.order[unit], unit))
+
+
+ALLOCATORS = {
+    "scan": ScanAllocator,
+    "heap": HeapAllocator,
+}
+
+
+# ---------------------- Assignment ----------------------
+def _fill(picker, sessions, start, available, granularity):
+    """Fill `available` blocks from `start`, appending to `sessions`."""
+    while available > 0:
+        unit = picker.pick()
+        if unit is None:
+            return False
+
+        # Allocate the smaller of remaining blocks and slot capacity
+        blocks = min(picker.remaining[unit], available)
+        end = start + blocks * granularity
+        sessions.append(Session(unit, start, end))
+
+        picker.consume(unit, blocks)
+        available -= blocks
+        start = end
+    return True
+
+
+def assign_sessions(slots, allocations, allocator="heap"):
+    """
+    Fill slots day by day, slot by slot, always giving the next stretch of
+    time to the unit with the most blocks left.
+
+    slots:       a SlotTable
+    allocations: {"Math": 4, "History": 2}  (weekly blocks per unit)
+
+    Returns {"mon": [Session(unit, start, end), ...]} with week-minute
+    bounds; use serialize() to turn it into Timetable.data.
+    """
+    picker = ALLOCATORS[allocator](allocations)
+    schedule = {day: [] for day in slots.day_slots}
+
+    for day, indices in slots.day_slots.items():
+        for i in indices:
+            _fill(picker, schedule[day], slots.starts[i], slots.blocks(i), slots.granularity)
+
+    return schedule
+
+
+# ---------------------- Incremental repair ----------------------
+SLOT_CHANGES = ("slot_added", "slot_removed")
+UNIT_CHANGES = ("unit_added", "unit_removed", "unit_changed")
+
+
+def _gaps(slots, day, sessions):
+    """Free [start, end) stretches of `day`'s slots not covered by `sessions`."""
+    sessions = sorted(sessions, key=lambda s: s[1])
+    for i in slots.day_slots.get(day, ()):
+        cursor, slot_end = slots.starts[i], slots.ends[i]
+        for _, start, end in sessions:
+            if end <= cursor or start >= slot_end:
+                continue
+            if start > cursor:
+                yield cursor, start
+            cursor = max(cursor, end)
+        if cursor < slot_end:
+            yield cursor, slot_end
+
+
+def _inside(slots, day, start, end):
+    return any(
+        slots.starts[i] <= start and end <= slots.ends[i]
+        for i in slots.day_slots.get(day, ())
+    )
+
+
+def reschedule(previous, slots, difficulties, changes=(), allocator="heap"):
+    """
+    Repair a previous schedule after small input edits instead of starting
+    from scratch, so the rest of the week stays where the user left it.
+
+    previous: schedule from assign_sessions()/deserialize()
+    changes:  [{"op": "slot_added", "day": "mon"}, {"op": "unit_removed",
+              "unit": "Math"}, ...]; see SLOT_CHANGES and UNIT_CHANGES
+
+    Sessions of removed units and sessions no longer inside a slot on a
+    changed day are dropped; units above their new share lose blocks from
+    their latest sessions; the freed time and new slots are then filled
+    with the units below their share. Only days that lost or gained time are
+    rewritten, and unused capacity elsewhere is only topped up.
+    """
+    granularity = slots.granularity
+    targets = allocate(difficulties, slots.total_blocks)
+    changed_days = {c["day"] for c in changes if c["op"] in SLOT_CHANGES}
+
+    # --- Keep what is still valid ---
+    schedule = {}
+    dirty = set()
+    for day in slots.day_slots:
+        sessions = previous.get(day, [])
+        kept = [
+            s for s in sessions
+            if s[0] in targets
+            and (day not in changed_days or _inside(slots, day, s[1], s[2]))
+        ]
+        if day in changed_days or len(kept) != len(sessions):
+            dirty.add(day)
+        schedule[day] = kept
+
+    # --- Trim units above their new share, latest sessions first ---
+    used = dict.fromkeys(targets, 0)
+    for sessions in schedule.values():
+        for unit, start, end in sessions:
+            used[unit] += (end - start) // granularity
+    for day in reversed(list(schedule)):
+        sessions = schedule[day]
+        for k in range(len(sessions) - 1, -1, -1):
+            unit, start, end = sessions[k]
+            surplus = used[unit] - targets[unit]
+            if surplus <= 0:
+                continue
+            blocks = (end - start) // granularity
+            cut = min(surplus, blocks)
+            used[unit] -= cut
+            if cut == blocks:
+                del sessions[k]
+            else:
+                sessions[k] = Session(unit, start, end - cut * granularity)
+            dirty.add(day)
+
+    # --- Fill freed time: changed days first, then any spare capacity ---
+    picker = ALLOCATORS[allocator]({u: targets[u] - used[u] for u in targets})
+    ordered = [d for d in schedule if d in dirty] + [d for d in schedule if d not in dirty]
+    for day in ordered:
+        if picker.pick() is None:
+            break
+        added = []
+        for start, end in list(_gaps(slots, day, schedule[day])):
+            _fill(picker, added, start, (end - start) // granularity, granularity)
+        if added:
+            dirty.add(day)
+            schedule[day].extend(added)
+
+    # --- Tidy rewritten days: time order, adjacent sessions of a unit merged ---
+    for day in dirty:
+        merged = []
+        for unit, start, end in sorted(schedule[day], key=lambda s: s[1]):
+            if merged and merged[-1].unit == unit and merged[-1].end == start:
+                merged[-1] = merged[-1]._replace(end=end)
+            else:
+                merged.append(Session(unit, start, end))
+        schedule[day] = merged
+
+    return schedule
+
+
+# ---------------------- Entry points ----------------------
+def unit_weights(units):
+    """{name: weight} from UnitSpecs, in name order so equal inputs always
+    schedule (and fingerprint) the same way, whatever order they came in.
+    The weight is the difficulty, scaled by decay.decay_factor() for units
+    with a study history."""
+    return dict(sorted((u.name, _weight(u)) for u in units))
+
+
+def _weight(unit):
+    if not unit.reviews:
+        return unit.difficulty
+    return round(unit.difficulty * decay_factor(unit.days_since, unit.reviews), 3)
+
+
+def schedule_inputs(inputs, granularity=60, **options):
+    """
+    Schedule an Inputs snapshot: the pure function behind both the web
+    views and the batch command. Returns (sessions, search_stats) where
+    sessions is {day: [Session, ...]}; options go to build_schedule().
+    """
+    slots = SlotTable.from_inputs(inputs, granularity)
+    return build_schedule(unit_weights(inputs.units), slots, **options)
+
+
+def build_schedule(difficulties, slots, allocator="heap", engine="greedy", budget_ms=200,
+                   previous=None, changes=None):
+    """
+    ORM-free core of utils.generate_timetable: {name: difficulty} and a
+    SlotTable in, (schedule, search_stats) out. search_stats is None unless
+    engine="search". Returns (None, None) when there is nothing to schedule.
+    With a `previous` schedule and `changes`, the greedy engine repairs it
+    (see reschedule) instead of starting over.
+    """
+    if not difficulties or sum(difficulties.values()) == 0 or slots.total_blocks == 0:
+        return None, None
+
+    if previous is not None and changes is not None and engine == "greedy":
+        with timed("scheduler.reschedule"):
+            return reschedule(previous, slots, difficulties, changes, allocator=allocator), None
+
+    with timed("scheduler.allocate"):
+        allocations = allocate(difficulties, slots.total_blocks)
+    with timed("scheduler.assign"):
+        schedule = assign_sessions(slots, allocations, allocator=allocator)
+    if engine == "search":
+        with timed("scheduler.search"):
+            return optimize_schedule(slots, difficulties, schedule, budget_ms=budget_ms)
+    return schedule, None
+
+
+def serialize(schedule):
+    """Turn Session records into the JSON stored on Timetable.data."""
+    return {
+        day: [
+            {"unit": unit, "start": to_hhmm(start), "end": to_hhmm(end)}
+            for unit, start, end in sessions
+        ]
+        for day, sessions in schedule.items()
+    }
+
+
+def deserialize(data):
+    """Inverse of serialize(): Timetable.data back into Session records."""
+    return {
+        day: [
+            Session(s["unit"], from_hhmm(day, s["start"]), from_hhmm(day, s["end"]))
+            for s in sessions
+        ]
+        for day, sessions in (data or {}).items()
+    }
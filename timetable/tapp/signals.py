@@ -0,0 +1,34 @@
+"""
+Keep Availability.capacity_minutes and slot_count in step with the day's
+slots. Each write is a single UPDATE with F() expressions, so concurrent
+requests adding slots to the same day can't lose each other's changes.
+Bulk inserts skip signals; importer.import_records updates the totals
+itself, and reset_inputs deletes the days along with their slots.
+"""
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Availability, AvailabilitySlot
+
+
+def _add(availability_id, minutes, count):
+    if minutes or count:
+        Availability.objects.filter(pk=availability_id).update(
+            capacity_minutes=F("capacity_minutes") + minutes,
+            slot_count=F("slot_count") + count,
+        )
+
+
+@receiver(post_save, sender=AvailabilitySlot)
+def count_saved_slot(sender, instance, created, raw=False, **kwargs):
+    if raw:  # loading fixtures: run rebuild_capacity afterwards
+        return
+    minutes = instance.minutes
+    _add(instance.availability_id, minutes - getattr(instance, "counted_minutes", 0), int(created))
+    instance.counted_minutes = minutes
+
+
+@receiver(post_delete, sender=AvailabilitySlot)
+def uncount_deleted_slot(sender, instance, **kwargs):
+    _add(instance.availability_id, -getattr(instance, "counted_minutes", instance.minutes), -1)
@@ -0,0 +1,54 @@
+from typing import NamedTuple
+
+DAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+DAY_INDEX = {day: i for i, day in enumerate(DAYS)}
+MINUTES_PER_DAY = 24 * 60
+
+
+# Plain typed records passed in and out of the scheduler. They are tuples
+# underneath (no per-instance __dict__), so they are small, fast to pickle
+# across worker processes and need no database to build.
+
+class UnitSpec(NamedTuple):
+    name: str
+    difficulty: int
+    days_since: int = 0  # since last studied; see decay.py
+    reviews: int = 0  # completed study sessions, 0 when there is no history
+
+
+class SlotSpec(NamedTuple):
+    day: str
+    start: int  # minutes since Monday 00:00
+    end: int
+
+
+class Session(NamedTuple):
+    unit: str
+    start: int  # minutes since Monday 00:00
+    end: int
+
+    @property
+    def day(self):
+        return DAYS[self.start // MINUTES_PER_DAY]
+
+
+class Inputs(NamedTuple):
+    """Everything one generation needs; `days` includes days with no slots."""
+    units: tuple
+    slots: tuple
+    days: tuple = ()
+
+    def to_json(self):
+        return {
+            "units": [list(u) for u in self.units],
+            "slots": [list(s) for s in self.slots],
+            "days": list(self.days),
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(
+            units=tuple(UnitSpec(*u) for u in data["units"]),
+            slots=tuple(SlotSpec(*s) for s in data["slots"]),
+            days=tuple(data["days"]),
+        )
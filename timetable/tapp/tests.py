@@ -1,3 +1,1262 @@
-from django.test import TestCase
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from datetime import date, time, timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.conf import settings
+from django.test import TestCase, modify_settings, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from timetable import settings_lean
+
+from . import profiling
+from .adapters import load_inputs
+from .ical import iter_ics
+from .decay import DECAY, decay_factor
+from .horizon import Blackout, Reweight, iter_weeks
+from .intervals import IntervalIndex
+from .jobs import ABANDONED, run_job
+from .models import (
+    Unit, Availability, AvailabilitySlot, Timetable, GenerationJob, Resource, ResourceBooking,
+    StudySession,
+)
+from .optimizer import LocalSearch, optimize_schedule
+from .packing import PackedDays, pack
+from .resources import ResourcePool, schedule_cohort
+from .specs import DAYS, Inputs, Session, SlotSpec, UnitSpec
+from .scheduler import SlotTable, allocate, assign_sessions, schedule_inputs, unit_weights
+from .utils import (
+    cache_stats, generate_reminders, nothing_to_schedule, reset_inputs,
+    result_table_key, save_horizon, timetable_cache,
+)
+
+
+def add_inputs(owner, units=3, days=("mon", "tue")):
+    """Create `units` units and a 09:00-12:00 slot on each day for `owner`."""
+    for i in range(units):
+        Unit.objects.create(owner=owner, name=f"Unit {i}", difficulty=1 + i % 10)
+    for day in days:
+        availability = Availability.objects.create(owner=owner, day=day)
+        AvailabilitySlot.objects.create(
+            availability=availability, start_time=time(9), end_time=time(12)
+        )
+
+
+def random_week(seed, granularity=60, units=12):
+    """A SlotTable of random, partly overlapping slots and random difficulties."""
+    rng = random.Random(seed)
+    slots = SlotTable(granularity)
+    for day_index, day in enumerate(DAYS):
+        for _ in range(rng.randint(0, 4)):
+            start = day_index * 1440 + rng.randrange(6 * 60, 20 * 60, 5)
+            slots.add_range(day, start, start + rng.randrange(10, 4 * 60, 5))
+    difficulties = {f"Unit {n}": rng.randint(1, 10) for n in range(rng.randint(1, units))}
+    return slots, difficulties
+
+
+@override_settings(TIMETABLE_JOB_RUNNER="sync")
+class OwnerScopeTests(TestCase):
+    """
+    Every view only touches the current owner's rows, so its query count
+    must not change when other owners add data.
+    """
+
+    def setUp(self):
+        timetable_cache().clear()
+        self.client.get(reverse("unit_list"))  # creates the session owner
+        self.owner = self.client.session["owner"]
+
+    def count_queries(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as ctx:
+            getattr(self.client, method)(url, data or {})
+        return len(ctx)
+
+    def add_noise(self):
+        for n in range(20):
+            add_inputs(f"session:other-{n}", units=10, days=("mon", "wed", "fri"))
+            Timetable.objects.create(owner=f"session:other-{n}", data={})
+
+    def assert_same_queries(self, method, url_fn, data=None, before=None):
+        """Run a view before and after adding other owners' data."""
+        if before:
+            before()
+        baseline = self.count_queries(method, url_fn(), data)
+        self.add_noise()
+        if before:
+            before()
+        self.assertEqual(self.count_queries(method, url_fn(), data), baseline)
+
+    def test_unit_list(self):
+        add_inputs(self.owner)
+        self.assert_same_queries("get", lambda: reverse("unit_list"))
+        response = self.client.get(reverse("unit_list"))
+        self.assertEqual(len(response.context["units"]), 3)
+
+    def test_unit_list_post(self):
+        self.assert_same_queries(
+            "post", lambda: reverse("unit_list"), {"name": "Maths", "difficulty": 5}
+        )
+        self.assertEqual(Unit.objects.filter(owner=self.owner).count(), 2)
+
+    def test_delete_unit(self):
+        def url():
+            unit = Unit.objects.create(owner=self.owner, name="Temp")
+            return reverse("delete_unit", args=[unit.id])
+        self.assert_same_queries("get", url)
+
+    def test_delete_unit_of_other_owner_is_404(self):
+        unit = Unit.objects.create(owner="session:someone-else", name="Theirs")
+        response = self.client.get(reverse("delete_unit", args=[unit.id]))
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(Unit.objects.filter(id=unit.id).exists())
+
+    def test_availability_list(self):
+        add_inputs(self.owner)
+        self.assert_same_queries("get", lambda: reverse("availability_list"))
+
+    def test_availability_list_post(self):
+        # Start from no Monday each time, so both requests create the day
+        self.assert_same_queries(
+            "post", lambda: reverse("availability_list"),
+            {"day": "mon", "start_time": "09:00", "end_time": "10:00"},
+            before=lambda: Availability.objects.filter(owner=self.owner).delete(),
+        )
+        self.assertEqual(
+            AvailabilitySlot.objects.filter(availability__owner=self.owner).count(), 1
+        )
+
+    def test_delete_availability_slot(self):
+        def url():
+            availability, _ = Availability.objects.get_or_create(owner=self.owner, day="mon")
+            slot = AvailabilitySlot.objects.create(
+                availability=availability, start_time=time(9), end_time=time(10)
+            )
+            return reverse("delete_availability_slot", args=[slot.id])
+        self.assert_same_queries("get", url)
+
+    def test_finalize_generate(self):
+        add_inputs(self.owner)
+        self.assert_same_queries(
+            "get", lambda: reverse("finalize_generate"), before=timetable_cache().clear
+        )
+        timetable = Timetable.objects.get(id=self.client.session["timetable_id"])
+        self.assertEqual(timetable.owner, self.owner)
+        units = {s["unit"] for sessions in timetable.days.values() for s in sessions}
+        self.assertEqual(units, {"Unit 0", "Unit 1", "Unit 2"})
+
+    def test_generate(self):
+        add_inputs(self.owner)
+        self.client.get(reverse("finalize_generate"))
+        self.assert_same_queries(
+            "get", lambda: reverse("generate"), before=timetable_cache().clear
+        )
+
+    def test_proceed_generate_new_only(self):
+        self.assert_same_queries(
+            "get", lambda: reverse("proceed_generate", args=["new_only"]),
+            before=lambda: add_inputs(self.owner),
+        )
+        self.assertFalse(Unit.objects.filter(owner=self.owner).exists())
+        self.assertEqual(Unit.objects.exclude(owner=self.owner).count(), 200)
+        self.assertEqual(AvailabilitySlot.objects.count(), 60)
+
+    def test_download_timetable(self):
+        add_inputs(self.owner)
+        self.client.get(reverse("finalize_generate"))
+        self.assert_same_queries("get", lambda: reverse("download_timetable"))
+
+
+@override_settings(TIMETABLE_JOB_RUNNER="sync")
+class ResultCacheTests(TestCase):
+    def setUp(self):
+        timetable_cache().clear()
+        self.client.get(reverse("unit_list"))
+        self.owner = self.client.session["owner"]
+        add_inputs(self.owner)
+
+    def test_identical_regeneration_reuses_row(self):
+        hits = cache_stats()["hits"]
+        self.client.get(reverse("finalize_generate"))
+        first_id = self.client.session["timetable_id"]
+        self.client.get(reverse("finalize_generate"))
+        self.assertEqual(self.client.session["timetable_id"], first_id)
+        self.assertEqual(Timetable.objects.filter(owner=self.owner).count(), 1)
+        self.assertEqual(cache_stats()["hits"], hits + 1)
+
+    def test_changed_inputs_miss(self):
+        self.client.get(reverse("finalize_generate"))
+        first_id = self.client.session["timetable_id"]
+        Unit.objects.create(owner=self.owner, name="New unit", difficulty=9)
+        self.client.get(reverse("finalize_generate"))
+        self.assertNotEqual(self.client.session["timetable_id"], first_id)
+
+
+@override_settings(TIMETABLE_JOB_RUNNER="sync")
+class ResultPageTests(TestCase):
+    def setUp(self):
+        timetable_cache().clear()
+        self.client.get(reverse("unit_list"))
+        add_inputs(self.client.session["owner"])
+        self.client.get(reverse("finalize_generate"))
+
+    def test_repeat_view_is_304_without_timetable_read(self):
+        response = self.client.get(reverse("generate"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("private", response["Cache-Control"])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("generate"), HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        self.assertEqual(response.status_code, 304)
+        # Only the database-backed session is read
+        self.assertFalse([q for q in queries if '"tapp_' in q["sql"]])
+
+    def test_etag_differs_per_day_and_timetable(self):
+        week = self.client.get(reverse("generate"))["ETag"]
+        self.assertNotEqual(self.client.get(reverse("generate") + "?day=mon")["ETag"], week)
+        Unit.objects.create(owner=self.client.session["owner"], name="New unit")
+        self.client.get(reverse("finalize_generate"))
+        self.assertNotEqual(self.client.get(reverse("generate"))["ETag"], week)
+
+    def test_unknown_day_is_the_week(self):
+        week = self.client.get(reverse("generate"))["ETag"]
+        response = self.client.get(reverse("generate") + "?day=junk1")
+        self.assertEqual(response["ETag"], week)
+        owner, timetable_id = self.client.session["owner"], self.client.session["timetable_id"]
+        self.assertIsNone(timetable_cache().get(result_table_key(owner, timetable_id, "junk1")))
+
+    def test_cached_table_skips_timetable_read(self):
+        self.client.get(reverse("generate"))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("generate"))
+        self.assertContains(response, "Unit 0")
+        self.assertFalse(any("tapp_timetable" in q["sql"] for q in queries))
+
+    def test_fresh_setup_forgets_validators(self):
+        self.client.get(reverse("proceed_generate", args=["new_only"]))
+        self.assertNotIn("timetable_created", self.client.session)
+        response = self.client.get(reverse("generate"))
+        self.assertFalse(response.has_header("ETag"))
+
+
+@override_settings(TIMETABLE_JOB_RUNNER="sync")
+class ResetTests(TestCase):
+    def setUp(self):
+        timetable_cache().clear()
+        self.client.get(reverse("unit_list"))
+        self.owner = self.client.session["owner"]
+        add_inputs(self.owner, units=50, days=("mon", "tue", "wed"))
+        add_inputs("session:someone-else")
+
+    def test_reset_deletes_in_one_query_per_table(self):
+        with CaptureQueriesContext(connection) as queries:
+            cleared = reset_inputs(self.owner)
+        self.assertEqual(cleared, 50 + 3 + 3)
+        self.assertEqual(len([q for q in queries if q["sql"].startswith("DELETE")]), 3)
+        self.assertFalse([q for q in queries if q["sql"].startswith("SELECT")])
+        self.assertFalse(Unit.objects.filter(owner=self.owner).exists())
+        self.assertFalse(AvailabilitySlot.objects.filter(availability__owner=self.owner).exists())
+        self.assertEqual(AvailabilitySlot.objects.count(), 2)
+
+    @override_settings(TIMETABLE_ARCHIVE_INPUTS=True)
+    def test_new_only_archives_inputs_with_timetable(self):
+        self.client.get(reverse("finalize_generate"))
+        timetable = Timetable.objects.get(id=self.client.session["timetable_id"])
+        self.client.get(reverse("proceed_generate", args=["new_only"]))
+
+        self.assertEqual(timetable.units.count(), 50)
+        self.assertEqual(AvailabilitySlot.objects.filter(availability__timetable=timetable).count(), 3)
+        self.assertEqual(load_inputs(self.owner), Inputs((), (), ()))
+        self.assertEqual(len(self.client.get(reverse("unit_list")).context["units"]), 0)
+
+        # The fresh setup doesn't reuse the archived days
+        self.client.post(
+            reverse("availability_list"), {"day": "mon", "start_time": "09:00", "end_time": "10:00"}
+        )
+        self.assertEqual(load_inputs(self.owner).days, ("mon",))
+        self.assertEqual(timetable.availability.count(), 3)
+
+
+@override_settings(TIMETABLE_JOB_RUNNER="sync")
+class IncrementalRescheduleTests(TestCase):
+    def setUp(self):
+        timetable_cache().clear()
+        self.client.get(reverse("unit_list"))
+        self.owner = self.client.session["owner"]
+        add_inputs(self.owner, units=3, days=("mon", "tue", "wed"))
+        self.client.get(reverse("finalize_generate"))
+        self.before = dict(Timetable.objects.get(id=self.client.session["timetable_id"]).days)
+
+    def regenerate(self):
+        self.client.get(reverse("finalize_generate"))
+        return dict(Timetable.objects.get(id=self.client.session["timetable_id"]).days)
+
+    def test_added_slot_leaves_other_days_alone(self):
+        self.client.post(
+            reverse("availability_list"),
+            {"day": "thu", "start_time": "18:00", "end_time": "20:00"},
+        )
+        after = self.regenerate()
+        for day in ("mon", "tue", "wed"):
+            self.assertEqual(after[day], self.before[day])
+        self.assertTrue(after["thu"])
+
+    def test_removed_unit_only_rewrites_its_days(self):
+        unit = Unit.objects.get(owner=self.owner, name="Unit 0")
+        self.client.get(reverse("delete_unit", args=[unit.id]))
+        after = self.regenerate()
+        for day, sessions in self.before.items():
+            if all(s["unit"] != "Unit 0" for s in sessions):
+                self.assertEqual(after[day], sessions)
+            self.assertTrue(all(s["unit"] != "Unit 0" for s in after[day]))
+
+    def test_cache_hit_never_reuses_a_repaired_timetable(self):
+        first = self.client.session["timetable_id"]
+        self.client.post(reverse("unit_list"), {"name": "Extra", "difficulty": 9})
+        self.regenerate()
+        unit = Unit.objects.get(owner=self.owner, name="Extra")
+        self.client.get(reverse("delete_unit", args=[unit.id]))
+        self.regenerate()  # repaired, from the same inputs as the first
+        repaired = Timetable.objects.get(id=self.client.session["timetable_id"])
+        self.assertEqual(repaired.input_hash, "")
+
+        after = self.regenerate()  # a plain run: served from the cache
+        self.assertEqual(self.client.session["timetable_id"], first)
+        self.assertEqual(after, self.before)
+
+
+@override_settings(TIMETABLE_JOB_RUNNER="worker")
+class GenerationJobTests(TestCase):
+    def setUp(self):
+        timetable_cache().clear()
+        self.client.get(reverse("unit_list"))
+        self.owner = self.client.session["owner"]
+        add_inputs(self.owner)
+
+    def test_finalize_enqueues_and_status_serves_result(self):
+        response = self.client.get(reverse("finalize_generate"))
+        job = GenerationJob.objects.get(owner=self.owner)
+        self.assertRedirects(response, reverse("job_detail", args=[job.id]))
+        self.assertEqual(job.status, GenerationJob.QUEUED)
+        self.assertFalse(Timetable.objects.filter(owner=self.owner).exists())
+
+        status = self.client.get(reverse("job_status", args=[job.id])).json()
+        self.assertEqual(status["status"], "queued")
+
+        self.assertTrue(run_job(job.id))
+        status = self.client.get(reverse("job_status", args=[job.id])).json()
+        self.assertEqual(status["status"], "done")
+        self.assertEqual(status["progress"], 100)
+        self.assertEqual(self.client.session["timetable_id"], status["timetable_id"])
+        self.assertIn("mon", status["timetable"])
+
+    def test_identical_inputs_are_deduplicated(self):
+        self.client.get(reverse("finalize_generate"))
+        self.client.get(reverse("finalize_generate"))
+        self.assertEqual(GenerationJob.objects.filter(owner=self.owner).count(), 1)
+
+    def make_stale(self, job):
+        GenerationJob.objects.filter(id=job.id).update(
+            updated_at=timezone.now() - timedelta(seconds=settings.TIMETABLE_JOB_TIMEOUT + 1)
+        )
+
+    def test_stale_job_is_replaced_not_reused(self):
+        self.client.get(reverse("finalize_generate"))
+        stale = GenerationJob.objects.get(owner=self.owner)
+        GenerationJob.objects.filter(id=stale.id).update(status=GenerationJob.RUNNING)
+        self.make_stale(stale)
+
+        response = self.client.get(reverse("finalize_generate"))
+        fresh = GenerationJob.objects.filter(owner=self.owner).latest("id")
+        self.assertNotEqual(fresh.id, stale.id)
+        self.assertRedirects(response, reverse("job_detail", args=[fresh.id]))
+        self.assertEqual(fresh.status, GenerationJob.QUEUED)
+        stale.refresh_from_db()
+        self.assertEqual((stale.status, stale.error), (GenerationJob.FAILED, ABANDONED))
+
+    def test_polling_a_stale_job_reports_failure(self):
+        self.client.get(reverse("finalize_generate"))
+        job = GenerationJob.objects.get(owner=self.owner)
+        self.assertEqual(self.client.get(reverse("job_status", args=[job.id])).json()["status"], "queued")
+        self.make_stale(job)
+        status = self.client.get(reverse("job_status", args=[job.id])).json()
+        self.assertEqual((status["status"], status["error"]), ("failed", ABANDONED))
+        self.assertFalse(run_job(job.id))
+
+    def test_slots_shorter_than_a_block_fail_the_job_clearly(self):
+        Availability.objects.filter(owner=self.owner).delete()
+        self.client.post(
+            reverse("availability_list"), {"day": "mon", "start_time": "10:00", "end_time": "10:20"}
+        )
+        self.client.get(reverse("finalize_generate"))
+        job = GenerationJob.objects.get(owner=self.owner)
+        self.assertTrue(run_job(job.id))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (GenerationJob.FAILED, nothing_to_schedule()))
+
+    def test_other_owners_cannot_poll(self):
+        job = GenerationJob.objects.create(owner="session:someone-else")
+        response = self.client.get(reverse("job_status", args=[job.id]))
+        self.assertEqual(response.status_code, 404)
+
+
+class CalendarExportTests(TestCase):
+    data = {
+        "mon": [{"unit": "Maths", "start": "09:00", "end": "10:30"}],
+        "wed": [{"unit": "Physics, lab", "start": "14:00", "end": "15:00"}],
+    }
+
+    def test_reminders_use_each_sessions_weekday(self):
+        # 2026-10-14 is a Wednesday
+        reminders = generate_reminders(self.data, reminder_offset=15, start=date(2026, 10, 14))
+        self.assertEqual(
+            [(r["unit"], r["reminder_time"]) for r in reminders],
+            [("Physics, lab", "2026-10-14 13:45"), ("Maths", "2026-10-19 08:45")],
+        )
+
+    def test_reminders_span_several_weeks(self):
+        reminders = generate_reminders(self.data, start=date(2026, 10, 12), days=21)
+        self.assertEqual(len(reminders), 6)
+        self.assertEqual(reminders[-1]["reminder_time"], "2026-10-28 13:45")
+
+    def test_ics_has_one_recurring_event_per_session(self):
+        ics = "".join(iter_ics(self.data, date(2026, 10, 14), until=date(2027, 1, 31)))
+        self.assertEqual(ics.count("BEGIN:VEVENT"), 2)
+        self.assertEqual(ics.count("RRULE:FREQ=WEEKLY;UNTIL=20270131T235959"), 2)
+        self.assertIn("DTSTART:20261014T140000", ics)
+        self.assertIn("DTSTART:20261019T090000", ics)
+        self.assertIn("SUMMARY:Physics\\, lab", ics)
+        self.assertTrue(all(len(line.encode()) <= 75 for line in ics.split("\r\n")))
+
+    def test_download_ics_view(self):
+        self.client.get(reverse("unit_list"))
+        owner = self.client.session["owner"]
+        timetable = Timetable.objects.create(owner=owner, data=self.data)
+        session = self.client.session
+        session["timetable_id"] = timetable.id
+        session.save()
+
+        response = self.client.get(reverse("download_ics"), {"start": "2026-10-14", "weeks": 2})
+        body = b"".join(response.streaming_content).decode()
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        self.assertIn("UNTIL=20261027T235959", body)
+
+
+class PackedStorageTests(TestCase):
+    data = {
+        "mon": [
+            {"unit": "Maths", "start": "09:00", "end": "10:30"},
+            {"unit": "Économie", "start": "10:30", "end": "12:00"},
+        ],
+        "wed": [{"unit": "Maths", "start": "14:00", "end": "24:00"}],
+        "fri": [],
+    }
+
+    def test_round_trip(self):
+        self.assertEqual(dict(PackedDays(pack(self.data))), self.data)
+        self.assertEqual(dict(PackedDays(pack({}))), {})
+
+    def test_days_decode_lazily(self):
+        days = PackedDays(pack(self.data))
+        self.assertEqual(list(days), ["mon", "wed", "fri"])
+        self.assertEqual(days["wed"], self.data["wed"])
+        self.assertEqual(set(days._decoded), {"wed"})
+
+    def test_json_rows_convert_both_ways(self):
+        legacy = Timetable.objects.create(owner="session:a", data=self.data)
+        self.assertEqual(dict(legacy.days), self.data)
+
+        call_command("pack_timetables", stdout=StringIO())
+        legacy.refresh_from_db()
+        self.assertIsNone(legacy.data)
+        self.assertEqual(dict(legacy.days), self.data)
+
+        call_command("pack_timetables", "--unpack", stdout=StringIO())
+        legacy.refresh_from_db()
+        self.assertIsNone(legacy.packed)
+        self.assertEqual(legacy.data, self.data)
+
+
+class BulkImportTests(TestCase):
+    def setUp(self):
+        self.client.get(reverse("unit_list"))
+        self.owner = self.client.session["owner"]
+
+    def post_json(self, payload):
+        return self.client.post(
+            reverse("import_inputs"), json.dumps(payload), content_type="application/json"
+        )
+
+    def test_json_import_uses_bulk_inserts(self):
+        payload = {
+            "units": [{"name": f"Unit {i}", "difficulty": 1 + i % 10} for i in range(500)],
+            "availability": [
+                {"day": day, "start": f"{h:02d}:00", "end": f"{h + 1:02d}:00"}
+                for day in ("mon", "tue", "wed") for h in range(8, 20)
+            ],
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.post_json(payload)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {"units": 500, "slots": 36})
+        self.assertLess(len(ctx), 15)
+        self.assertEqual(Unit.objects.filter(owner=self.owner).count(), 500)
+        self.assertEqual(Availability.objects.filter(owner=self.owner).count(), 3)
+
+    def test_overlaps_reject_the_whole_import(self):
+        add_inputs(self.owner, units=0, days=("mon",))  # 09:00-12:00
+        response = self.post_json({
+            "units": [{"name": "Maths", "difficulty": 5}],
+            "availability": [
+                {"day": "tue", "start": "09:00", "end": "11:00"},
+                {"day": "tue", "start": "10:00", "end": "12:00"},
+                {"day": "mon", "start": "11:00", "end": "13:00"},
+            ],
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"], [
+            "Slot 3: overlaps an existing slot on mon.",
+            "Slot 2: overlaps slot 1 on tue.",
+        ])
+        self.assertFalse(Unit.objects.filter(owner=self.owner).exists())
+
+    def test_malformed_rows_are_reported_not_500(self):
+        response = self.post_json({"units": ["Maths", {"name": "History"}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["errors"], ["Unit 1: expected an object with a name and a difficulty."]
+        )
+        response = self.post_json({"units": "Maths", "availability": {"day": "mon"}})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"], [
+            "'units' must be a list of objects.", "'availability' must be a list of objects.",
+        ])
+
+    def test_explicit_zero_difficulty_is_rejected(self):
+        response = self.post_json({"units": [
+            {"name": "Zero", "difficulty": 0},
+            {"name": "Blank", "difficulty": ""},
+            {"name": "Missing"},
+        ]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["errors"], ["Unit 1 (Zero): difficulty must be between 1 and 10."]
+        )
+
+    def test_non_utf8_input_is_reported_not_500(self):
+        response = self.client.post(
+            reverse("import_inputs"), b'{"units": [{"name": "Caf\xe9"}]}', content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["errors"], ["File is not UTF-8 text: invalid continuation byte at byte 24."]
+        )
+        upload = SimpleUploadedFile("inputs.csv", b"type,name\nunit,Caf\xe9\n")
+        response = self.client.post(reverse("import_inputs"), {"file": upload}, follow=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "File is not UTF-8 text")
+        self.assertFalse(Unit.objects.filter(owner=self.owner).exists())
+
+    def test_csv_upload_and_export_round_trip(self):
+        upload = SimpleUploadedFile(
+            "inputs.csv",
+            b"type,name,difficulty,day,start,end\n"
+            b"unit,Maths,7,,,\n"
+            b"slot,,,wed,14:00,16:00\n",
+        )
+        self.client.post(reverse("import_inputs"), {"file": upload})
+        self.assertEqual(self.client.get(reverse("export_inputs")).json(), {
+            "units": [{"name": "Maths", "difficulty": 7}],
+            "availability": [{"day": "wed", "start": "14:00", "end": "16:00"}],
+        })
+
+
+@override_settings(TIMETABLE_JOB_RUNNER="sync")
+class IntervalIndexTests(TestCase):
+    def setUp(self):
+        self.client.get(reverse("unit_list"))
+        self.owner = self.client.session["owner"]
+
+    def add_slot(self, day, start, end):
+        return self.client.post(
+            reverse("availability_list"), {"day": day, "start_time": start, "end_time": end}
+        )
+
+    def test_index_merges_overlapping_and_touching(self):
+        index = IntervalIndex([(540, 660), (600, 720), (540, 660), (720, 780), (900, 960)])
+        self.assertEqual(list(index), [(540, 780), (900, 960)])
+        self.assertEqual(index.free(480, 1020), [(480, 540), (780, 900), (960, 1020)])
+        self.assertEqual(index.busy(600, 930), [(600, 780), (900, 930)])
+        self.assertTrue(index.covers(600, 700))
+        self.assertFalse(index.covers(700, 800))
+
+    def test_saving_overlapping_slots_keeps_one_row(self):
+        self.add_slot("mon", "09:00", "11:00")
+        self.add_slot("mon", "13:00", "14:00")
+        self.add_slot("mon", "10:00", "13:00")
+        self.add_slot("mon", "09:30", "10:30")  # already covered
+        slots = AvailabilitySlot.objects.filter(availability__owner=self.owner)
+        self.assertEqual(
+            list(slots.values_list("start_time", "end_time")), [(time(9), time(14))]
+        )
+
+    def test_generator_does_not_double_count_overlaps(self):
+        add_inputs(self.owner, units=2, days=("mon",))
+        availability = Availability.objects.get(owner=self.owner, day="mon")
+        AvailabilitySlot.objects.create(
+            availability=availability, start_time=time(10), end_time=time(11)
+        )
+        self.client.get(reverse("finalize_generate"))
+        timetable = Timetable.objects.get(id=self.client.session["timetable_id"])
+        sessions = timetable.days["mon"]
+        self.assertEqual((sessions[0]["start"], sessions[-1]["end"]), ("09:00", "12:00"))
+        self.assertTrue(all(a["end"] <= b["start"] for a, b in zip(sessions, sessions[1:])))
+
+    def test_free_busy(self):
+        add_inputs(self.owner, units=1, days=("mon",))
+        self.add_slot("mon", "14:00", "15:00")
+        response = self.client.get(
+            reverse("free_busy"), {"day": "mon", "start": "08:00", "end": "14:30"}
+        )
+        self.assertEqual(response.json(), {
+            "day": "mon",
+            "available": [["09:00", "12:00"], ["14:00", "14:30"]],
+            "booked": [],
+            "free": [["09:00", "12:00"], ["14:00", "14:30"]],
+        })
+
+
+@override_settings(TIMETABLE_JOB_RUNNER="sync", DEBUG=True)
+@modify_settings(MIDDLEWARE={"prepend": "tapp.middleware.ProfilingMiddleware"})
+class ProfilingTests(TestCase):
+    def setUp(self):
+        profiling.configure(True)
+        profiling.reset()
+        self.addCleanup(profiling.configure, False)
+        self.addCleanup(profiling.reset)
+        timetable_cache().clear()
+        self.client.get(reverse("unit_list"))
+        add_inputs(self.client.session["owner"])
+
+    def test_views_and_scheduler_phases_are_recorded(self):
+        response = self.client.get(reverse("finalize_generate"))
+        self.assertIn("db;dur=", response["Server-Timing"])
+
+        metrics = self.client.get(reverse("metrics")).json()["metrics"]
+        for name in (
+            "view.finalize_generate.ms", "view.finalize_generate.queries",
+            "scheduler.load", "scheduler.allocate", "scheduler.assign", "scheduler.serialize",
+        ):
+            self.assertEqual(metrics[name]["count"], 1, name)
+        self.assertGreater(metrics["view.finalize_generate.queries"]["max"], 0)
+
+    def test_disabled_records_nothing(self):
+        profiling.configure(False)
+        profiling.reset()  # setUp's request was recorded while enabled
+        self.client.get(reverse("finalize_generate"))
+        self.assertEqual(profiling.snapshot(), {})
+
+
+@override_settings(TIMETABLE_JOB_RUNNER="sync")
+class GenerateQueryCountTests(TestCase):
+    """The generate path reads its inputs once, in a fixed number of queries."""
+
+    def setUp(self):
+        self.client.get(reverse("unit_list"))
+        self.owner = self.client.session["owner"]
+
+    def finalize_queries(self):
+        timetable_cache().clear()
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("finalize_generate"))
+        return len(ctx)
+
+    def test_inputs_load_in_three_queries(self):
+        add_inputs(self.owner, units=50, days=("mon", "tue", "wed", "thu", "fri"))
+        Availability.objects.create(owner=self.owner, day="sat")  # a day without slots
+        StudySession.objects.bulk_create(
+            StudySession(owner=self.owner, unit=f"Unit {i % 50}") for i in range(500)
+        )
+        with self.assertNumQueries(3):
+            inputs = load_inputs(self.owner)
+        self.assertEqual(len(inputs.units), 50)
+        self.assertEqual(inputs.days, ("mon", "tue", "wed", "thu", "fri", "sat"))
+        self.assertEqual(len(inputs.slots), 5)
+
+    def test_finalize_query_count_does_not_grow_with_data(self):
+        add_inputs(self.owner, units=2, days=("mon",))
+        small = self.finalize_queries()
+
+        add_inputs(self.owner, units=300, days=("tue", "wed", "thu", "fri", "sat", "sun"))
+        for availability in Availability.objects.filter(owner=self.owner):
+            for hour in range(13, 21):
+                AvailabilitySlot.objects.create(
+                    availability=availability, start_time=time(hour), end_time=time(hour, 30)
+                )
+        self.assertEqual(self.finalize_queries(), small)
+
+    def test_finalize_reads_units_and_slots_once(self):
+        add_inputs(self.owner)
+        timetable_cache().clear()
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("finalize_generate"))
+        unit_reads = [q for q in ctx if q["sql"].startswith("SELECT") and '"tapp_unit"' in q["sql"]]
+        slot_reads = [
+            q for q in ctx
+            if q["sql"].startswith("SELECT") and '"tapp_availabilityslot"' in q["sql"]
+        ]
+        self.assertEqual((len(unit_reads), len(slot_reads)), (1, 1))
+
+
+class ResourceSchedulingTests(TestCase):
+    def student(self, n):
+        # Everyone is free Monday 09:00-11:00
+        return n, Inputs(
+            units=(UnitSpec(f"Unit {n}", 5),),
+            slots=(SlotSpec("mon", 9 * 60, 11 * 60),),
+            days=("mon",),
+        )
+
+    def test_rooms_never_exceed_capacity(self):
+        pool = ResourcePool({"A": 2, "B": 1}, granularity=30)
+        results = list(schedule_cohort(map(self.student, range(5)), pool, 30))
+
+        self.assertEqual([schedule is None for _, schedule, _ in results], [False] * 3 + [True] * 2)
+        seats = [(b.resource, b.start, b.end) for _, _, bookings in results for b in bookings]
+        self.assertEqual(seats.count(("A", 540, 660)), 2)
+        self.assertEqual(seats.count(("B", 540, 660)), 1)
+
+    def test_reserved_time_is_skipped(self):
+        pool = ResourcePool({"A": 1}, granularity=30)
+        pool.reserve("A", 9 * 60, 10 * 60)
+        [(_, schedule, bookings)] = schedule_cohort([self.student(0)], pool, 30)
+        self.assertEqual([(b.start, b.end) for b in bookings], [(600, 660)])
+
+    def test_generate_cohort_command(self):
+        Resource.objects.create(name="Room 1", capacity=2)
+        path = self.write_jsonl([
+            {"id": str(n), "units": [{"name": "Maths", "difficulty": 5}],
+             "availability": [{"day": "tue", "start": "14:00", "end": "15:00"}]}
+            for n in range(3)
+        ])
+        call_command("generate_cohort", path, "--granularity", "30", stdout=StringIO())
+        self.assertEqual(Timetable.objects.filter(owner__startswith="cohort:").count(), 2)
+        self.assertEqual(ResourceBooking.objects.count(), 2)
+
+    def write_jsonl(self, records):
+        f = tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False)
+        self.addCleanup(os.remove, f.name)
+        with f:
+            f.write("\n".join(json.dumps(r) for r in records))
+        return f.name
+
+
+class HorizonTests(TestCase):
+    START, END = date(2026, 1, 5), date(2026, 4, 19)  # 15 weeks, Monday to Sunday
+
+    def setUp(self):
+        self.inputs = Inputs(
+            units=(UnitSpec("Maths", 5), UnitSpec("History", 3)),
+            slots=tuple(
+                SlotSpec(day, i * 1440 + 9 * 60, i * 1440 + 12 * 60)
+                for i, day in enumerate(DAYS[:5])
+            ),
+            days=DAYS[:5],
+        )
+        self.base, _ = schedule_inputs(self.inputs, 30)
+
+    def weeks(self, exceptions=(), start=START, end=END):
+        return list(iter_weeks(self.inputs, self.base, start, end, exceptions, granularity=30))
+
+    def test_unchanged_term_needs_no_overlays(self):
+        weeks = self.weeks()
+        self.assertEqual(len(weeks), 15)
+        self.assertEqual(weeks[-1].monday, date(2026, 4, 13))
+        self.assertFalse(any(week.overlay for week in weeks))
+
+    def test_only_touched_days_are_overlaid(self):
+        weeks = self.weeks([Blackout(date(2026, 2, 3)), Blackout(date(2026, 3, 3))])
+        changed = [week for week in weeks if week.overlay]
+        self.assertEqual([week.index for week in changed], [4, 8])
+        self.assertEqual(changed[0].overlay["tue"], [])
+        self.assertIs(changed[0].overlay, changed[1].overlay)  # same exceptions, one repair
+        self.assertNotIn("thu", changed[0].overlay)
+
+    def test_exam_morning_and_reweight(self):
+        weeks = self.weeks([
+            Blackout(date(2026, 3, 11), 9 * 60, 10 * 60),
+            Reweight(date(2026, 3, 30), "History", 10),
+        ])
+        exam = weeks[9].overlay["wed"]
+        self.assertTrue(all(s.start >= 2 * 1440 + 10 * 60 for s in exam))
+        self.assertFalse(weeks[11].overlay)
+        self.assertTrue(weeks[12].overlay and weeks[14].overlay)  # from then on
+
+    def test_days_outside_the_range_are_off(self):
+        weeks = self.weeks(start=date(2026, 1, 7), end=date(2026, 1, 13))
+        self.assertEqual(len(weeks), 2)
+        self.assertEqual(weeks[0].overlay["mon"], [])
+        self.assertEqual([weeks[1].overlay[day] for day in ("wed", "thu", "fri")], [[], [], []])
+
+    def test_save_horizon_stores_differing_weeks(self):
+        add_inputs("user:1", units=2, days=("mon", "tue"))
+        timetable = save_horizon(
+            "user:1", self.START, self.END, [Blackout(date(2026, 2, 2))], granularity=30
+        )
+        self.assertEqual(timetable.week_count, 15)
+        self.assertEqual(list(timetable.weeks.values_list("week", flat=True)), [4])
+
+        weeks = list(timetable.iter_weeks())
+        self.assertEqual(weeks[4][0], date(2026, 2, 2))
+        self.assertEqual(weeks[4][1]["mon"], [])
+        self.assertEqual(weeks[4][1]["tue"], timetable.days["tue"])  # Monday's time is lost, not moved
+        self.assertEqual(dict(weeks[5][1]), dict(timetable.days))
+
+    def test_blackout_shortens_sessions_to_whole_blocks(self):
+        weeks = self.weeks([Blackout(date(2026, 1, 7), 9 * 60 + 45, 10 * 60)])
+        overlay = weeks[0].overlay
+        self.assertEqual(list(overlay), ["wed"])
+        minutes = [(s.start % 1440, s.end % 1440) for s in overlay["wed"]]
+        self.assertEqual(minutes[0][0], 9 * 60)
+        self.assertTrue(all(end <= 9 * 60 + 30 or start >= 10 * 60 for start, end in minutes))
+
+
+class StudyHistoryTests(TestCase):
+    def setUp(self):
+        self.client.get(reverse("unit_list"))
+        self.owner = self.client.session["owner"]
+
+    def test_decay_table(self):
+        for row in DECAY[1:]:
+            self.assertEqual(list(row), sorted(row))  # forgetting only grows with time
+        self.assertEqual(decay_factor(0, 0), 1.0)
+        self.assertEqual(decay_factor(10_000, 1), decay_factor(365, 1))
+        self.assertLess(decay_factor(3, 5), decay_factor(3, 1))  # reviews slow forgetting
+
+    def test_weights_without_history_are_difficulties(self):
+        units = (UnitSpec("b", 5), UnitSpec("a", 4, days_since=3, reviews=2))
+        self.assertEqual(unit_weights(units), {"a": round(4 * decay_factor(3, 2), 3), "b": 5})
+
+    def test_recently_studied_unit_gets_less_time(self):
+        Unit.objects.create(owner=self.owner, name="Fresh", difficulty=5)
+        Unit.objects.create(owner=self.owner, name="Stale", difficulty=5)
+        unit = Unit.objects.get(name="Fresh")
+        self.client.post(reverse("record_study", args=[unit.id]), {"minutes": 45})
+        session = StudySession.objects.get(owner=self.owner)
+        self.assertEqual((session.unit, session.minutes), ("Fresh", 45))
+
+        inputs = load_inputs(self.owner)
+        self.assertEqual(inputs.units[0], UnitSpec("Fresh", 5, 0, 1))
+        weights = unit_weights(inputs.units)
+        self.assertLess(weights["Fresh"], weights["Stale"])
+
+    def test_record_study_needs_post_and_own_unit(self):
+        unit = Unit.objects.create(owner="session:someone-else", name="Theirs")
+        self.assertEqual(self.client.get(reverse("record_study", args=[unit.id])).status_code, 405)
+        self.assertEqual(self.client.post(reverse("record_study", args=[unit.id])).status_code, 404)
+        self.assertFalse(StudySession.objects.exists())
+
+
+@override_settings(TIMETABLE_JOB_RUNNER="sync")
+class ApiTests(TestCase):
+    def setUp(self):
+        timetable_cache().clear()
+        self.client.get(reverse("unit_list"))
+        self.owner = self.client.session["owner"]
+        add_inputs(self.owner, units=7, days=("mon", "tue", "wed"))
+        add_inputs("session:someone-else")
+
+    def test_cursor_pagination(self):
+        names, url = [], reverse("api_units") + "?limit=3"
+        while url:
+            page = self.client.get(url).json()
+            names += [unit["name"] for unit in page["results"]]
+            url = page["next"] and reverse("api_units") + f"?limit=3&cursor={page['next']}"
+        self.assertEqual(names, [f"Unit {i}" for i in range(7)])
+        self.assertEqual(self.client.get(reverse("api_units") + "?cursor=%%%").status_code, 400)
+
+    def test_fields_and_day_filter(self):
+        response = self.client.get(reverse("api_slots") + "?day=tue&fields=day,start")
+        self.assertEqual(response.json()["results"], [{"day": "tue", "start": "09:00"}])
+        response = self.client.get(reverse("api_units") + "?fields=name,owner")
+        self.assertEqual(response.status_code, 400)
+
+    def test_timetable_day_filter(self):
+        self.client.get(reverse("finalize_generate"))
+        timetable_id = self.client.session["timetable_id"]
+        url = reverse("api_timetable", args=[timetable_id])
+        days = self.client.get(url + "?day=mon&fields=days").json()
+        self.assertEqual(list(days), ["days"])
+        self.assertEqual(list(days["days"]), ["mon"])
+        listed = self.client.get(reverse("api_timetables")).json()["results"]
+        self.assertEqual([t["id"] for t in listed], [timetable_id])
+
+        reminders = self.client.get(
+            reverse("api_timetable_reminders", args=[timetable_id]) + "?start=2026-01-05&day=tue"
+        ).json()["results"]
+        self.assertTrue(reminders)
+        self.assertEqual({r["day"] for r in reminders}, {"tue"})
+
+    def test_reminders_reject_out_of_range_dates(self):
+        self.client.get(reverse("finalize_generate"))
+        url = reverse("api_timetable_reminders", args=[self.client.session["timetable_id"]])
+        for query in ("?start=9999-12-30&days=30", "?start=0001-01-02"):
+            with self.subTest(query=query):
+                response = self.client.get(url + query)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()["error"], "start is out of range.")
+        response = self.client.get(url + "?start=2026-01-05&offset=99999999999999")
+        self.assertEqual(response.status_code, 200)
+        reminder = min(response.json()["results"], key=lambda r: r["reminder_time"])
+        self.assertLess(reminder["reminder_time"], "2025-12-30")  # a week before 2026-01-05
+
+    def test_conditional_get(self):
+        self.client.get(reverse("finalize_generate"))
+        url = reverse("api_timetable", args=[self.client.session["timetable_id"]])
+        response = self.client.get(url)
+        self.assertIn("private", response["Cache-Control"])
+        repeat = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual((repeat.status_code, repeat.content), (304, b""))
+        self.assertNotEqual(self.client.get(url + "?day=mon")["ETag"], response["ETag"])
+
+        units = self.client.get(reverse("api_units"))
+        self.assertEqual(
+            self.client.get(reverse("api_units"), HTTP_IF_NONE_MATCH=units["ETag"]).status_code, 304
+        )
+        Unit.objects.create(owner=self.owner, name="New unit")
+        self.assertEqual(
+            self.client.get(reverse("api_units"), HTTP_IF_NONE_MATCH=units["ETag"]).status_code, 200
+        )
+
+    def test_other_owners_timetable_is_404(self):
+        theirs = Timetable.objects.create(owner="session:someone-else", data={})
+        self.assertEqual(self.client.get(reverse("api_timetable", args=[theirs.id])).status_code, 404)
+
+
+class LeanStartupTests(TestCase):
+    def test_pdf_module_leaves_reportlab_unloaded(self):
+        result = subprocess.run(
+            [sys.executable, "-c", "import sys, tapp.pdf; print('reportlab' in sys.modules)"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "False")
+
+    @override_settings(ROOT_URLCONF="timetable.urls_lean")
+    def test_lean_urls_serve_the_api_only(self):
+        self.assertEqual(self.client.get("/api/units/").status_code, 200)
+        self.assertEqual(self.client.get("/units/").status_code, 404)
+
+    @override_settings(ROOT_URLCONF="timetable.urls_lean", MIDDLEWARE=settings_lean.MIDDLEWARE)
+    def test_logged_in_user_keeps_their_owner_on_lean_workers(self):
+        user = User.objects.create_user("ada", password="secret")
+        self.client.force_login(user)
+        Unit.objects.create(owner=f"user:{user.pk}", name="Maths")
+        results = self.client.get("/api/units/").json()["results"]
+        self.assertEqual([unit["name"] for unit in results], ["Maths"])
+
+
+class CapacityTests(TestCase):
+    def setUp(self):
+        self.client.get(reverse("unit_list"))
+        self.owner = self.client.session["owner"]
+
+    def add_slot(self, day, start, end):
+        self.client.post(
+            reverse("availability_list"), {"day": day, "start_time": start, "end_time": end}
+        )
+
+    def totals(self, day):
+        return Availability.objects.values_list("capacity_minutes", "slot_count").get(
+            owner=self.owner, day=day, timetable=None
+        )
+
+    def test_slot_writes_keep_the_day_totals(self):
+        self.add_slot("mon", "09:00", "10:00")
+        self.add_slot("mon", "11:00", "12:30")
+        self.assertEqual(self.totals("mon"), (150, 2))
+
+        self.add_slot("mon", "10:00", "11:00")  # joins both into 09:00-12:30
+        self.assertEqual(self.totals("mon"), (210, 1))
+
+        slot = AvailabilitySlot.objects.get(availability__owner=self.owner)
+        self.client.get(reverse("delete_availability_slot", args=[slot.id]))
+        self.assertEqual(self.totals("mon"), (0, 0))
+
+    def test_import_updates_the_totals(self):
+        self.add_slot("tue", "08:00", "09:00")
+        self.client.post(
+            reverse("import_inputs"),
+            json.dumps({"availability": [
+                {"day": "tue", "start": "10:00", "end": "11:30"},
+                {"day": "wed", "start": "14:00", "end": "16:00"},
+            ]}),
+            content_type="application/json",
+        )
+        self.assertEqual(self.totals("tue"), (150, 2))
+        self.assertEqual(self.totals("wed"), (120, 1))
+
+    def test_rebuild_corrects_drifted_totals(self):
+        add_inputs(self.owner, units=0, days=("mon", "tue"))
+        Availability.objects.filter(owner=self.owner, day="mon").update(
+            capacity_minutes=5, slot_count=9
+        )
+        out = StringIO()
+        call_command("rebuild_capacity", owner=self.owner, stdout=out)
+        self.assertIn("corrected 1", out.getvalue())
+        self.assertEqual(self.totals("mon"), (180, 1))
+        self.assertEqual(self.totals("tue"), (180, 1))
+
+    @override_settings(TIMETABLE_JOB_RUNNER="sync")
+    def test_capacity_without_a_whole_block_is_an_error_page(self):
+        Unit.objects.create(owner=self.owner, name="Maths")
+        self.add_slot("mon", "10:00", "10:20")  # 20 minutes, under one 30-minute block
+        response = self.client.get(reverse("finalize_generate"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "error.html")
+        self.assertContains(response, "Nothing to schedule")
+        self.assertFalse(Timetable.objects.filter(owner=self.owner).exists())
+
+    def test_finalize_without_capacity_skips_loading_inputs(self):
+        add_inputs(self.owner, units=5, days=())
+        Availability.objects.create(owner=self.owner, day="mon")  # no slots
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("finalize_generate"))
+        self.assertTemplateUsed(response, "error.html")
+        self.assertFalse([
+            q for q in ctx if '"tapp_unit"' in q["sql"] or '"tapp_availabilityslot"' in q["sql"]
+        ])
+
+
+class InputsTests(TestCase):
+    def test_load_inputs_adapts_the_owners_working_rows(self):
+        add_inputs("user:1", units=2, days=("tue", "mon"))
+        Availability.objects.create(owner="user:1", day="sun")  # no slots
+        archived = Timetable.objects.create(owner="user:1")
+        Unit.objects.create(owner="user:1", name="Old", timetable=archived)
+        Availability.objects.create(owner="user:1", day="sat", timetable=archived)
+        add_inputs("user:2", units=5, days=("wed",))
+        StudySession.objects.create(
+            owner="user:1", unit="Unit 1", completed_at=timezone.now() - timedelta(days=3)
+        )
+
+        inputs = load_inputs("user:1")
+        self.assertEqual(inputs.units, (UnitSpec("Unit 0", 1), UnitSpec("Unit 1", 2, 3, 1)))
+        self.assertEqual(inputs.days, ("tue", "mon", "sun"))
+        self.assertEqual(inputs.slots, (
+            SlotSpec("tue", 1440 + 9 * 60, 1440 + 12 * 60),
+            SlotSpec("mon", 9 * 60, 12 * 60),
+        ))
+
+    def test_inputs_survive_a_json_round_trip(self):
+        inputs = Inputs(
+            units=(UnitSpec("Maths", 7, 2, 4),),
+            slots=(SlotSpec("wed", 2 * 1440 + 600, 2 * 1440 + 660),),
+            days=("wed", "sun"),
+        )
+        restored = Inputs.from_json(json.loads(json.dumps(inputs.to_json())))
+        self.assertEqual(restored, inputs)
+        self.assertIsInstance(restored.units[0], UnitSpec)
+        self.assertEqual(Session("Maths", 6 * 1440 + 60, 6 * 1440 + 120).day, "sun")
+
+
+class AdminRegenerateTests(TestCase):
+    def setUp(self):
+        timetable_cache().clear()
+        admin = User.objects.create_superuser("admin", password="secret")
+        self.client.force_login(admin)
+        add_inputs("user:1", units=2, days=("mon",))
+        self.old = Timetable.objects.create(owner="user:1", data={"mon": []})
+        self.room = Resource.objects.create(name="Room 1")
+        ResourceBooking.objects.create(
+            resource=self.room, timetable=self.old, unit="Unit 0", start=540, end=600
+        )
+
+    def regenerate(self, *timetables):
+        return self.client.post(
+            reverse("admin:tapp_timetable_changelist"),
+            {"action": "regenerate", "_selected_action": [t.id for t in timetables]},
+            follow=True,
+        )
+
+    def test_creates_a_new_timetable_and_leaves_the_old_one(self):
+        self.regenerate(self.old)
+        new = Timetable.objects.filter(owner="user:1").exclude(id=self.old.id).get()
+        self.assertEqual({s["unit"] for s in new.days["mon"]}, {"Unit 0", "Unit 1"})
+        self.old.refresh_from_db()
+        self.assertEqual(dict(self.old.days), {"mon": []})
+        self.assertEqual(self.old.bookings.count(), 1)
+
+    def test_term_plans_are_skipped(self):
+        plan = Timetable.objects.create(
+            owner="user:2", data={}, starts_on=date(2026, 1, 5), week_count=4
+        )
+        add_inputs("user:2")
+        response = self.regenerate(plan)
+        self.assertContains(response, "Skipped 1 term plan")
+        self.assertEqual(Timetable.objects.filter(owner="user:2").count(), 1)
+
+
+class BatchGenerateTests(TestCase):
+    def write_jsonl(self, lines):
+        directory = tempfile.TemporaryDirectory()  # also holds the checkpoint
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "sets.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines))
+        return path
+
+    def record(self, n, start="09:00"):
+        return {
+            "id": str(n), "units": [{"name": "Maths", "difficulty": 5}],
+            "availability": [{"day": "mon", "start": start, "end": "11:00"}, {"day": "sun"}],
+        }
+
+    def run_command(self, path, *args):
+        out, err = StringIO(), StringIO()
+        call_command(
+            "generate_timetables", path, "--workers", "1", "--chunk-size", "2", *args,
+            stdout=out, stderr=err,
+        )
+        return out.getvalue(), err.getvalue()
+
+    def test_bad_records_are_reported_and_skipped(self):
+        path = self.write_jsonl([self.record(1), self.record(2, start="9am"), "{oops", self.record(4)])
+        out, err = self.run_command(path)
+        self.assertIn("Input set '2': invalid time '9am' on mon", err)
+        self.assertIn("Input set '3': not JSON", err)
+        self.assertIn("Created 2 timetables, skipped 0 empty and 2 invalid", out)
+        timetable = Timetable.objects.get(owner="batch:1")
+        self.assertEqual(timetable.days["sun"], [])  # a day without slots is kept
+
+    def test_resume_skips_processed_sets(self):
+        path = self.write_jsonl([self.record(n) for n in range(3)])
+        self.run_command(path)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\n" + json.dumps(self.record(3)))
+        out, _ = self.run_command(path, "--resume")
+        self.assertIn("Resuming after 3 input sets.", out)
+        self.assertEqual(
+            sorted(Timetable.objects.values_list("owner", flat=True)),
+            ["batch:0", "batch:1", "batch:2", "batch:3"],
+        )
+
+    def test_worker_module_imports_without_django_setup(self):
+        # spawn/forkserver workers unpickle generate_one without running django.setup()
+        result = subprocess.run(
+            [sys.executable, "-c", "import sys, tapp.batch; print('django.db' in sys.modules)"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            env={k: v for k, v in os.environ.items() if k != "DJANGO_SETTINGS_MODULE"},
+        )
+        self.assertEqual(result.stdout.strip(), "False")
+
+
+class AllocatorTests(TestCase):
+    def test_heap_and_scan_allocators_agree(self):
+        for seed in range(200):
+            slots, difficulties = random_week(seed)
+            allocations = allocate(difficulties, slots.total_blocks)
+            with self.subTest(seed=seed):
+                self.assertEqual(
+                    assign_sessions(slots, allocations, allocator="heap"),
+                    assign_sessions(slots, allocations, allocator="scan"),
+                )
+
+    def test_ties_go_to_the_first_unit(self):
+        slots = SlotTable(60)
+        slots.add_range("mon", 9 * 60, 13 * 60)
+        for allocator in ("heap", "scan"):
+            schedule = assign_sessions(slots, {"B": 2, "A": 2}, allocator=allocator)
+            self.assertEqual([s.unit for s in schedule["mon"]], ["B", "A"], allocator)
+
+
+class LocalSearchTests(TestCase):
+    def seeded(self, seed):
+        slots, difficulties = random_week(seed, granularity=30)
+        greedy = assign_sessions(slots, allocate(difficulties, slots.total_blocks))
+        return slots, difficulties, greedy
+
+    def test_result_never_scores_worse_than_the_seed(self):
+        for seed in range(20):
+            slots, difficulties, greedy = self.seeded(seed)
+            schedule, stats = optimize_schedule(
+                slots, difficulties, greedy, budget_ms=1000, seed=seed, max_iterations=300
+            )
+            with self.subTest(seed=seed):
+                self.assertLessEqual(stats["score"], stats["initial_score"])
+                # The reported score is the returned schedule's
+                rescored = LocalSearch(slots, difficulties, schedule).score
+                self.assertAlmostEqual(rescored, stats["score"], places=1)
+
+    def test_balance_is_tracked_incrementally(self):
+        slots, difficulties, greedy = self.seeded(4)
+        search = LocalSearch(slots, difficulties, greedy, seed=4)
+        search.run(budget_ms=10_000, max_iterations=500)
+        self.assertAlmostEqual(search.imbalance, sum(
+            abs(search.assigned[u] - search.targets[u]) for u in search.units
+        ))
+
+    def test_iteration_limit_is_respected(self):
+        slots, difficulties, greedy = self.seeded(1)
+        _, stats = optimize_schedule(
+            slots, difficulties, greedy, budget_ms=10_000, seed=1, max_iterations=50
+        )
+        self.assertEqual(stats["iterations"], 50)
+
+    def test_time_budget_is_respected(self):
+        slots, difficulties, greedy = self.seeded(2)
+        _, stats = optimize_schedule(slots, difficulties, greedy, budget_ms=50, seed=2)
+        self.assertGreater(stats["iterations"], 0)
+        self.assertGreaterEqual(stats["elapsed_ms"], 50)  # no iteration limit: runs to the end
+        self.assertLess(stats["elapsed_ms"], 150)  # a move is far shorter than the margin
+
+    def test_zero_budget_returns_the_seed(self):
+        slots, difficulties, greedy = self.seeded(3)
+        schedule, stats = optimize_schedule(slots, difficulties, greedy, budget_ms=0)
+        self.assertEqual(stats["iterations"], 0)
+        self.assertEqual(schedule, greedy)
+
+
+class GranularityTests(TestCase):
+    def test_blocks_follow_the_granularity(self):
+        for granularity, blocks in ((15, 6), (30, 3), (60, 1)):
+            slots = SlotTable(granularity)
+            self.assertTrue(slots.add_range("mon", 9 * 60, 10 * 60 + 30))  # 90 minutes
+            self.assertEqual(slots.total_blocks, blocks, granularity)
+
+    def test_partial_blocks_are_dropped(self):
+        slots = SlotTable(30)
+        self.assertFalse(slots.add_range("tue", 1440 + 9 * 60, 1440 + 9 * 60 + 20))
+        self.assertTrue(slots.add_range("tue", 1440 + 14 * 60, 1440 + 14 * 60 + 50))
+        self.assertEqual(list(slots.starts), [1440 + 14 * 60])  # the 20-minute slot is left out
+        self.assertEqual(slots.total_blocks, 1)
+
+        schedule = assign_sessions(slots, {"Maths": 5})
+        self.assertEqual(schedule["tue"], [Session("Maths", 1440 + 14 * 60, 1440 + 14 * 60 + 30)])
+
+    def test_sessions_stay_on_the_block_grid(self):
+        inputs = Inputs(
+            units=(UnitSpec("Maths", 7), UnitSpec("History", 3)),
+            slots=(SlotSpec("wed", 2 * 1440 + 9 * 60 + 15, 2 * 1440 + 11 * 60 + 5),),
+            days=("wed",),
+        )
+        schedule, _ = schedule_inputs(inputs, 15)
+        start = 2 * 1440 + 9 * 60 + 15
+        self.assertEqual(schedule["wed"][0].start, start)
+        for session in schedule["wed"]:
+            self.assertEqual((session.start - start) % 15, 0)
+            self.assertEqual((session.end - start) % 15, 0)
+        self.assertLessEqual(schedule["wed"][-1].end, start + 105)  # 110 minutes -> 7 blocks
+
+    def test_unsupported_granularity_is_rejected(self):
+        with self.assertRaises(ValueError):
+            SlotTable(45)
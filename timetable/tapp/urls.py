@@ -1,4 +1,4 @@
-from django.urls import path
+from django.urls import include, path
 from . import views
 
 urlpatterns = [
@@ -7,18 +7,34 @@ urlpatterns = [
     # --- Units ---
     path("units/", views.unit_list, name="unit_list"),
     path("units/delete/<int:unit_id>/", views.delete_unit, name="delete_unit"),
+    path("units/studied/<int:unit_id>/", views.record_study, name="record_study"),
 
     # --- Availability ---
     path("availability/", views.availability_list, name="availability_list"),
     path("availability/delete/<int:slot_id>/", views.delete_availability_slot, name="delete_availability_slot"),
+    path("availability/free-busy/", views.free_busy, name="free_busy"),
+
+    # --- Bulk import / export ---
+    path("inputs/import/", views.import_inputs, name="import_inputs"),
+    path("inputs/export/", views.export_inputs, name="export_inputs"),
 
     # --- Timetable generation ---
     path("generate/", views.generate, name="generate"),
     path("generate/proceed/<str:option>/", views.proceed_generate, name="proceed_generate"),
     path("generate/finalize/", views.finalize_generate, name="finalize_generate"),
     path("proceed/<str:option>/", views.proceed_generate, name="proceed_generate"),
+    path("jobs/<int:job_id>/", views.job_detail, name="job_detail"),
+    path("jobs/<int:job_id>/status/", views.job_status, name="job_status"),
 
     #-- download timetable --
     path("download/", views.download_timetable, name="download_timetable"),
+    path("download/ics/", views.download_ics, name="download_ics"),
+
+    # --- JSON API ---
+    path("api/", include("tapp.api_urls")),
+
+    #-- debug --
+    path("debug/cache/", views.cache_stats_view, name="cache_stats"),
+    path("debug/metrics/", views.metrics_view, name="metrics"),
 
 ]
@@ -1,11 +1,182 @@
+import logging
 import random
-from datetime import datetime, timedelta
-from .models import Unit, Availability, AvailabilitySlot
+import uuid
+from itertools import islice
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import connection, transaction
+from django.utils import timezone
+from .adapters import load_inputs
+from .horizon import iter_weeks, monday_of, week_count
+from .ical import reminders
+from .models import Availability, AvailabilitySlot, Timetable, TimetableWeek, Unit
+from .profiling import timed
+from .scheduler import (
+    SlotTable, build_schedule, deserialize, fingerprint, serialize, unit_weights,
+)
 
+logger = logging.getLogger(__name__)
 
-def generate_timetable():
+ENGINES = ("greedy", "search")
+
+
+def get_owner(request):
+    """
+    Scope key for the current visitor's units, availability and timetables:
+    the user id when logged in, otherwise a random id kept in the session.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+    if "owner" not in request.session:
+        request.session["owner"] = f"session:{uuid.uuid4().hex}"
+    return request.session["owner"]
+
+
+async def aget_owner(request):
+    """Async variant of get_owner() for async views."""
+    user = await request.auser()
+    if user.is_authenticated:
+        return f"user:{user.pk}"
+    owner = await request.session.aget("owner")
+    if owner is None:
+        owner = f"session:{uuid.uuid4().hex}"
+        await request.session.aset("owner", owner)
+    return owner
+
+
+def record_change(request, op, **fields):
+    """
+    Remember an input edit (see scheduler.SLOT_CHANGES/UNIT_CHANGES) so the
+    next generation can repair the current timetable instead of rebuilding it.
+    """
+    if "timetable_id" not in request.session:
+        return
+    changes = request.session.get("pending_changes", [])
+    changes.append({"op": op, **fields})
+    request.session["pending_changes"] = changes
+
+
+def remember_timetable(session, timetable):
+    """
+    Make `timetable` the session's current one. Its creation time is kept
+    alongside for the result pages' Last-Modified.
+    """
+    if session.get("timetable_id") != timetable.id:
+        session["timetable_id"] = timetable.id
+    created = timetable.created_at.timestamp()
+    if session.get("timetable_created") != created:
+        session["timetable_created"] = created
+
+
+def forget_timetable(session):
+    session.pop("timetable_id", None)
+    session.pop("timetable_created", None)
+    session.pop("pending_changes", None)  # edits relative to that timetable
+
+
+def result_table_key(owner, timetable_id, day=None):
+    """Cache key of a rendered result table (the whole week or one ?day=)."""
+    return f"result:{owner}:{timetable_id}:{day or 'week'}"
+
+
+def result_version_key(owner, timetable_id):
+    """Cache key of a timetable's content hash, which its result pages' ETags include."""
+    return f"result-version:{owner}:{timetable_id}"
+
+
+# ---------------------- Reset ----------------------
+@transaction.atomic
+def reset_inputs(owner, archive=None):
+    """
+    Clear the owner's working units and availability (the rows with no
+    timetable) in one transaction, so a concurrent request sees all of them
+    or none. Rows are removed with one DELETE per table, never loaded into
+    Python; slots go first since plain DELETEs skip the ORM's cascade.
+
+    With `archive` (a Timetable) the rows are kept and attached to it
+    instead, two UPDATEs, and are deleted with it later. Returns the number
+    of rows cleared or archived.
+    """
+    units = Unit.objects.filter(owner=owner, timetable=None)
+    availability = Availability.objects.filter(owner=owner, timetable=None)
+    if archive is not None:
+        return units.update(timetable=archive) + availability.update(timetable=archive)
+
+    # QuerySet.delete() would load every slot to send post_delete, whose
+    # receivers (signals.py) only adjust the capacity totals on the very
+    # Availability rows deleted next in this transaction, so slots and
+    # availability are deleted with plain SQL and nothing is lost.
+    qn = connection.ops.quote_name
+    days_table = qn(Availability._meta.db_table)
+    working = f"{qn('owner')} = %s AND {qn('timetable_id')} IS NULL"
+    cleared = 0
+    with connection.cursor() as cursor:
+        for sql in (
+            f"DELETE FROM {qn(AvailabilitySlot._meta.db_table)} WHERE {qn('availability_id')}"
+            f" IN (SELECT {qn('id')} FROM {days_table} WHERE {working})",
+            f"DELETE FROM {days_table} WHERE {working}",
+        ):
+            cursor.execute(sql, [owner])
+            cleared += cursor.rowcount
+    deleted, _ = units.delete()  # no receivers or dependents: a single DELETE
+    return cleared + deleted
+
+
+# ---------------------- Result cache ----------------------
+def timetable_cache():
+    """Cache holding generated Timetable.data keyed by input fingerprint."""
+    return caches[settings.TIMETABLE_CACHE_ALIAS]
+
+
+def _count(name):
+    # Counters live in the default cache so LRU culling of results never
+    # resets them.
+    key = f"timetable-cache:{name}"
+    cache.add(key, 0, timeout=None)
+    cache.incr(key)
+
+
+def cache_stats():
+    hits = cache.get("timetable-cache:hits", 0)
+    misses = cache.get("timetable-cache:misses", 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 3) if total else None,
+        "backend": settings.TIMETABLE_CACHE_BACKEND,
+        "max_entries": settings.TIMETABLE_CACHE_SIZE,
+    }
+
+
+# ---------------------- Generation ----------------------
+def generate_timetable(owner="", **options):
     """
-    Generate a timetable from Unit + AvailabilitySlot.
+    Generate a timetable from the Unit + AvailabilitySlot rows of `owner`.
+    See generate_from_inputs() for the options.
+    """
+    return generate_from_inputs(load_inputs(owner), **options)
+
+
+def generate_from_inputs(inputs, allocator="heap", engine="greedy", budget_ms=200,
+                         stats=None, granularity=None, use_cache=True,
+                         previous=None, changes=None, progress=None):
+    """
+    Generate a timetable from an Inputs snapshot (see adapters.load_inputs).
+    `allocator` picks the engine from scheduler.ALLOCATORS ("heap" or "scan");
+    both produce the same timetable.
+    engine="search" then improves the greedy result with a local search for
+    up to `budget_ms` milliseconds. If a dict is passed as `stats`, it is
+    filled with the search score and iteration count, the `input_hash`
+    fingerprint, whether the result came from the cache and whether it was
+    `repaired` from `previous`.
+    Time is scheduled in blocks of `granularity` minutes (15, 30 or 60,
+    default settings.TIMETABLE_GRANULARITY_MINUTES).
+    Given the `previous` Timetable.data and the `changes` made since (see
+    record_change), the greedy engine repairs that timetable in place of a
+    full run; the repaired result depends on history, so it bypasses the cache.
+    `progress`, if given, is called with a percentage as phases complete.
     Returns a dict like:
     {
         "mon": [
@@ -16,114 +187,145 @@ def generate_timetable():
     }
     """
 
-    units = Unit.objects.all()
-    availabilities = Availability.objects.prefetch_related("slots")
-
-    if not units or not availabilities:
+    if not inputs.units or not inputs.days:
         return None
 
     # --- Normalize difficulty weights ---
-    total_difficulty = sum(u.difficulty for u in units)
-    if total_difficulty == 0:
+    difficulties = unit_weights(inputs.units)
+    if sum(difficulties.values()) == 0:
         return None
 
-    # --- Count total available hours ---
-    total_hours = 0
-    slots_by_day = {}
-    for a in availabilities:
-        slots_by_day[a.day] = []
-        for slot in a.slots.all():
-            if slot.start_time and slot.end_time:
-                diff = (
-                    datetime.combine(datetime.today(), slot.end_time)
-                    - datetime.combine(datetime.today(), slot.start_time)
-                ).seconds // 3600
-                if diff > 0:
-                    total_hours += diff
-                    slots_by_day[a.day].append(
-                        {
-                            "start": slot.start_time,
-                            "end": slot.end_time,
-                            "hours": diff,
-                        }
-                    )
-
-    if total_hours == 0:
+    # --- Count total available blocks ---
+    slots = SlotTable.from_inputs(inputs, granularity or settings.TIMETABLE_GRANULARITY_MINUTES)
+
+    total_blocks = slots.total_blocks
+    if total_blocks == 0:
         return None
 
-    # --- Allocate weekly hours per unit (respect difficulty) ---
-    allocations = {
-        u.name: max(1, int((u.difficulty / total_difficulty) * total_hours))
-        for u in units
-    }
+    # --- Serve identical inputs from the cache ---
+    incremental = previous is not None and changes is not None and engine == "greedy"
+    params = {"engine": engine}
+    if engine == "search":
+        params["budget_ms"] = budget_ms
+    input_hash = fingerprint(difficulties, slots, **params)
+    if stats is not None:
+        stats["input_hash"] = input_hash
+        stats["repaired"] = incremental
+    if use_cache and not incremental:
+        cached = timetable_cache().get(input_hash)
+        if cached is not None:
+            _count("hits")
+            if stats is not None:
+                stats["cache"] = "hit"
+            return cached
+        _count("misses")
+        if stats is not None:
+            stats["cache"] = "miss"
 
-    # --- Timetable structure ---
-    timetable = {day: [] for day in slots_by_day.keys()}
+    if progress:
+        progress(20)
 
-    # --- Assign sessions into slots ---
-    # We iterate day by day, slot by slot, and fill units
-    for day, slots in slots_by_day.items():
-        for slot in slots:
-            start_time = datetime.combine(datetime.today(), slot["start"])
-            end_time = datetime.combine(datetime.today(), slot["end"])
-            available_hours = slot["hours"]
+    # --- Allocate, assign and (optionally) search ---
+    schedule, search_stats = build_schedule(
+        difficulties, slots, allocator=allocator, engine=engine, budget_ms=budget_ms,
+        previous=deserialize(previous) if incremental else None,
+        changes=changes if incremental else None,
+    )
+    if search_stats:
+        logger.info(
+            "timetable search: score %s -> %s in %s iterations (%s ms)",
+            search_stats["initial_score"], search_stats["score"],
+            search_stats["iterations"], search_stats["elapsed_ms"],
+        )
+        if stats is not None:
+            stats.update(search_stats)
 
-            # While slot has hours and there are units needing time
-            while available_hours > 0 and any(v > 0 for v in allocations.values()):
-                # Pick a unit that still has hours left
-                # Sort by remaining hours (so harder units get priority)
-                unit = max(allocations, key=lambda k: allocations[k])
+    if progress:
+        progress(80)
+
+    with timed("scheduler.serialize"):
+        timetable = serialize(schedule)
+    if use_cache and not incremental:
+        timetable_cache().set(input_hash, timetable)
+    return timetable
+
+
+def nothing_to_schedule(granularity=None):
+    """What to tell the user when generate_from_inputs() returns None."""
+    minutes = granularity or settings.TIMETABLE_GRANULARITY_MINUTES
+    return (
+        f"Nothing to schedule: add units and at least one availability slot of "
+        f"{minutes} minutes or more."
+    )
 
-                if allocations[unit] <= 0:
-                    break
 
-                # Allocate the smaller of remaining hours and slot capacity
-                slot_hours = min(allocations[unit], available_hours)
+def save_timetable(owner, data, stats):
+    """
+    Store a generated timetable for `owner`. On a cache hit the row generated
+    from the same inputs last time is reused instead of inserting a new one.
+    A repaired timetable depends on history, not just on its inputs, so it
+    is stored without an input_hash and never reused that way.
+    """
+    if stats.get("cache") == "hit":
+        timetable = (
+            Timetable.objects.filter(owner=owner, input_hash=stats["input_hash"])
+            .order_by("-created_at")
+            .first()
+        )
+        if timetable is not None:
+            return timetable
+    input_hash = "" if stats.get("repaired") else stats.get("input_hash", "")
+    timetable = Timetable(owner=owner, input_hash=input_hash)
+    timetable.set_days(data)
+    timetable.save()
+    return timetable
 
-                unit_end = start_time + timedelta(hours=slot_hours)
 
-                timetable[day].append(
-                    {
-                        "unit": unit,
-                        "start": start_time.strftime("%H:%M"),
-                        "end": unit_end.strftime("%H:%M"),
-                    }
-                )
+@transaction.atomic
+def save_horizon(owner, start, end, exceptions=(), engine="greedy", budget_ms=200,
+                 granularity=None, batch_size=100):
+    """
+    Generate and store a term plan for `owner` from `start` to `end` (dates)
+    with horizon.Blackout/Reweight `exceptions`. The scheduler runs once for
+    the base week; weeks are then produced one at a time and only those
+    that differ get a TimetableWeek row, inserted `batch_size` at a time.
+    Returns the Timetable, or None when there is nothing to schedule.
+    """
+    granularity = granularity or settings.TIMETABLE_GRANULARITY_MINUTES
+    inputs = load_inputs(owner)
+    data = generate_from_inputs(inputs, engine=engine, budget_ms=budget_ms, granularity=granularity)
+    if data is None:
+        return None
 
-                # Deduct
-                allocations[unit] -= slot_hours
-                available_hours -= slot_hours
-                start_time = unit_end
+    timetable = Timetable(
+        owner=owner, starts_on=monday_of(start), week_count=week_count(start, end)
+    )
+    timetable.set_days(data)
+    timetable.save()
 
+    weeks = iter_weeks(
+        inputs, deserialize(data), start, end, exceptions,
+        granularity=granularity, engine=engine, budget_ms=budget_ms,
+    )
+    overlays = (
+        _week_row(timetable, week.index, serialize(week.overlay))
+        for week in weeks if week.overlay
+    )
+    while batch := list(islice(overlays, batch_size)):
+        TimetableWeek.objects.bulk_create(batch)
     return timetable
 
 
-def generate_reminders(timetable, reminder_offset=15):
-    """
-    Generate reminders for each study session.
-    Reminder times are X minutes before session start.
-    """
-    reminders = []
-    for day, sessions in timetable.items():
-        for session in sessions:
-            unit = session["unit"]
-            start = session["start"]  # "HH:MM"
-
-            # Convert back into datetime for reminder
-            now = datetime.now()
-            session_start = now.replace(
-                hour=int(start.split(":")[0]),
-                minute=int(start.split(":")[1]),
-                second=0,
-                microsecond=0,
-            )
-            reminder_time = session_start - timedelta(minutes=reminder_offset)
-
-            reminders.append(
-                {
-                    "unit": unit,
-                    "day": day,
-                    "reminder_time": reminder_time.strftime("%Y-%m-%d %H:%M"),
-                }
-            )
-    return reminders
+def _week_row(timetable, week, data):
+    row = TimetableWeek(timetable=timetable, week=week)
+    row.set_days(data)
+    return row
+
+
+def generate_reminders(timetable, reminder_offset=15, start=None, days=7):
+    """
+    Reminders for every session occurring in the `days` days from `start`
+    (default: today), `reminder_offset` minutes before each session starts.
+    See ical.reminders().
+    """
+    return reminders(timetable, start or timezone.localdate(), days, reminder_offset)
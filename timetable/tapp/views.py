@@ -1,11 +1,32 @@
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
 from django.contrib import messages
-from django.http import HttpResponse
-from .models import Unit, Availability, AvailabilitySlot, Timetable
-from .utils import generate_timetable
-from datetime import datetime
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from django.db.models import Sum
+from django.http import HttpResponse, Http404, JsonResponse, StreamingHttpResponse
+from . import profiling
+from .adapters import request_inputs
+from .ical import iter_ics
+from .importer import ImportErrors, export_records, import_records, read_records, write_csv
+from .intervals import IntervalIndex
+from .jobs import ABANDONED, ACTIVE, enqueue_generation, stale_jobs
+from .models import (
+    Unit, Availability, AvailabilitySlot, Timetable, GenerationJob, StudySession,
+    format_minutes,
+)
+from .pdf import LAYOUTS, iter_pdf
+from .specs import DAYS
+from .utils import (
+    ENGINES, aget_owner, cache_stats, forget_timetable, generate_from_inputs, get_owner,
+    nothing_to_schedule, record_change, remember_timetable, reset_inputs, result_table_key, result_version_key,
+    save_timetable,
+    timetable_cache,
+)
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from django.utils import timezone
 
 
 # ---------------------- Home ----------------------
@@ -31,29 +52,46 @@ def home(request):
 
 # ---------------------- Units ----------------------
 def unit_list(request):
+    owner = get_owner(request)
     if request.method == "POST":
         name = request.POST.get("name")
         difficulty = int(request.POST.get("difficulty", 5))
         if name and 1 <= difficulty <= 10:
-            Unit.objects.create(name=name, difficulty=difficulty)
+            Unit.objects.create(owner=owner, name=name, difficulty=difficulty)
+            record_change(request, "unit_added", unit=name)
             messages.success(request, f"✅ Unit '{name}' added successfully!")
             return redirect("unit_list")
         else:
             messages.error(request, "⚠️ Invalid unit details. Please try again.")
 
-    units = Unit.objects.all()
+    units = Unit.objects.filter(owner=owner, timetable=None)
     return render(request, "unit_list.html", {"units": units})
 
 
 def delete_unit(request, unit_id):
-    unit = get_object_or_404(Unit, id=unit_id)
+    unit = get_object_or_404(Unit, id=unit_id, owner=get_owner(request), timetable=None)
     unit.delete()
+    record_change(request, "unit_removed", unit=unit.name)
     messages.success(request, f"🗑️ Unit '{unit.name}' deleted successfully.")
     return redirect("unit_list")
 
 
+@require_POST
+def record_study(request, unit_id):
+    """Log a completed study session, so the unit's weight decays from now."""
+    unit = get_object_or_404(Unit, id=unit_id, owner=get_owner(request), timetable=None)
+    try:
+        minutes = max(0, min(int(request.POST.get("minutes", 0)), 24 * 60))
+    except ValueError:
+        minutes = 0
+    StudySession.objects.create(owner=unit.owner, unit=unit.name, minutes=minutes)
+    messages.success(request, f"📚 Logged a study session for '{unit.name}'.")
+    return redirect("unit_list")
+
+
 # ---------------------- Availability ----------------------
 def availability_list(request):
+    owner = get_owner(request)
     if request.method == "POST":
         day = request.POST.get("day")
         start_time_str = request.POST.get("start_time")
@@ -67,48 +105,269 @@ def availability_list(request):
                 if start_time >= end_time:
                     messages.error(request, "⚠️ End time must be later than start time.")
                 else:
-                    availability, _ = Availability.objects.get_or_create(day=day)
-                    AvailabilitySlot.objects.create(
-                        availability=availability,
-                        start_time=start_time,
-                        end_time=end_time,
-                    )
-                    messages.success(
-                        request,
-                        f"✅ Added availability for {availability.get_day_display()} {start_time}–{end_time}."
+                    availability, _ = Availability.objects.get_or_create(
+                        owner=owner, day=day, timetable=None
                     )
+                    _add_slot(request, availability, start_time, end_time)
                     return redirect("availability_list")
             except ValueError:
                 messages.error(request, "⚠️ Invalid time format. Please use HH:MM (24-hour).")
         else:
             messages.error(request, "⚠️ Please provide a valid day, start time, and end time.")
 
-    availability = Availability.objects.prefetch_related("slots").all()
-    return render(request, "availability_list.html", {"availability": availability})
+    availability = list(
+        Availability.objects.filter(owner=owner, timetable=None).prefetch_related("slots")
+    )
+    week_capacity = format_minutes(sum(a.capacity_minutes for a in availability))
+    return render(
+        request,
+        "availability_list.html",
+        {"availability": availability, "week_capacity": week_capacity},
+    )
+
+
+def _add_slot(request, availability, start_time, end_time):
+    """
+    Store a slot so the day's slots stay disjoint: a slot that overlaps or
+    touches existing ones is merged with them into a single row.
+    """
+    existing = [
+        slot for slot in availability.slots.all() if slot.start_time and slot.end_time
+    ]
+    index = IntervalIndex((slot.start_time, slot.end_time) for slot in existing)
+    day = availability.get_day_display()
+    if index.covers(start_time, end_time):
+        messages.info(request, f"ℹ️ {day} {start_time}–{end_time} is already available.")
+        return
+
+    start_time, end_time = index.add(start_time, end_time)
+    absorbed = [
+        slot for slot in existing
+        if start_time <= slot.start_time and slot.end_time <= end_time
+    ]
+    if absorbed:
+        kept = absorbed[0]
+        kept.start_time, kept.end_time = start_time, end_time
+        kept.save(update_fields=["start_time", "end_time"])
+        AvailabilitySlot.objects.filter(id__in=[slot.id for slot in absorbed[1:]]).delete()
+        message = f"✅ Merged into availability for {day} {start_time}–{end_time}."
+    else:
+        AvailabilitySlot.objects.create(
+            availability=availability, start_time=start_time, end_time=end_time
+        )
+        message = f"✅ Added availability for {day} {start_time}–{end_time}."
+    record_change(request, "slot_added", day=availability.day)
+    messages.success(request, message)
+
+
+def free_busy(request):
+    """
+    Free/busy for one day and time range, e.g. ?day=mon&start=08:00&end=18:00:
+    the available time, the part booked by the current timetable, and what
+    is still free.
+    """
+    owner = get_owner(request)
+    day = request.GET.get("day")
+    try:
+        start = _day_minutes(request.GET.get("start", "00:00"))
+        end = _day_minutes(request.GET.get("end", "24:00"))
+    except ValueError:
+        return JsonResponse({"error": "start and end must be HH:MM."}, status=400)
+    if day not in dict(Availability.DAY_CHOICES) or start >= end:
+        return JsonResponse({"error": "Give a valid day and a non-empty range."}, status=400)
+
+    available = IntervalIndex(
+        (_day_minutes(a), _day_minutes(b))
+        for a, b in AvailabilitySlot.objects.filter(
+            availability__owner=owner, availability__timetable=None, availability__day=day,
+            start_time__isnull=False, end_time__isnull=False,
+        ).values_list("start_time", "end_time")
+        if a < b
+    )
+    booked = IntervalIndex()
+    timetable_id = request.session.get("timetable_id")
+    timetable = Timetable.objects.filter(id=timetable_id, owner=owner).first() if timetable_id else None
+    if timetable is not None:
+        for session in timetable.days.get(day, []):
+            booked.add(_day_minutes(session["start"]), _day_minutes(session["end"]))
+
+    available_now = available.busy(start, end)
+    return JsonResponse({
+        "day": day,
+        "available": _hhmm_ranges(available_now),
+        "booked": _hhmm_ranges(booked.busy(start, end)),
+        "free": _hhmm_ranges(gap for a, b in available_now for gap in booked.free(a, b)),
+    })
+
+
+def _day_minutes(value):
+    """Minutes since midnight for a datetime.time or an "HH:MM" string."""
+    if isinstance(value, str):
+        hours, _, minutes = value.partition(":")
+        value = int(hours) * 60 + int(minutes)
+        if not 0 <= value <= 24 * 60:
+            raise ValueError(value)
+        return value
+    return value.hour * 60 + value.minute
+
+
+def _hhmm_ranges(ranges):
+    return [[f"{a // 60:02d}:{a % 60:02d}", f"{b // 60:02d}:{b % 60:02d}"] for a, b in ranges]
 
 
 def delete_availability_slot(request, slot_id):
-    slot = get_object_or_404(AvailabilitySlot, id=slot_id)
+    slot = get_object_or_404(
+        AvailabilitySlot.objects.select_related("availability"),
+        id=slot_id, availability__owner=get_owner(request), availability__timetable=None,
+    )
     messages.success(
         request,
         f"🗑️ Removed availability slot for {slot.availability.get_day_display()} {slot.start_time}-{slot.end_time}."
     )
     slot.delete()
+    record_change(request, "slot_removed", day=slot.availability.day)
     return redirect("availability_list")
 
 
+# ---------------------- Bulk import / export ----------------------
+def import_inputs(request):
+    """
+    Add many units and slots at once: a CSV or JSON file uploaded as
+    "file", or a JSON body (API clients get a JSON response).
+    """
+    if request.method != "POST":
+        return redirect("unit_list")
+
+    owner = get_owner(request)
+    is_api = request.content_type == "application/json"
+    if is_api:
+        data, fmt = request.body, "json"
+    elif "file" in request.FILES:
+        upload = request.FILES["file"]
+        data = upload.read()
+        fmt = "csv" if upload.name.lower().endswith(".csv") else "json"
+    else:
+        messages.error(request, "⚠️ Please choose a CSV or JSON file to import.")
+        return redirect("unit_list")
+
+    try:
+        units, slots, days = import_records(owner, read_records(data, fmt))
+    except ImportErrors as exc:
+        if is_api:
+            return JsonResponse({"errors": exc.errors}, status=400)
+        for error in exc.errors[:10]:
+            messages.error(request, f"⚠️ {error}")
+        if len(exc.errors) > 10:
+            messages.error(request, f"⚠️ ...and {len(exc.errors) - 10} more.")
+        return redirect("unit_list")
+
+    if units:
+        record_change(request, "unit_added", count=units)
+    for day in days:
+        record_change(request, "slot_added", day=day)
+
+    if is_api:
+        return JsonResponse({"units": units, "slots": slots}, status=201)
+    messages.success(request, f"✅ Imported {units} unit(s) and {slots} availability slot(s).")
+    return redirect("unit_list")
+
+
+def export_inputs(request):
+    """The current units and slots as JSON, or CSV with ?format=csv."""
+    records = export_records(get_owner(request))
+    if request.GET.get("format") == "csv":
+        response = HttpResponse(content_type="text/csv")
+        response["Content-Disposition"] = 'attachment; filename="timetable-inputs.csv"'
+        write_csv(records, response)
+        return response
+    return JsonResponse(records)
+
+
 # ---------------------- Generate Timetable ----------------------
+RESULT_FRAGMENT_TIMEOUT = 24 * 60 * 60
+
+
+def _result_day(request):
+    """?day= if it names a day, else None (the whole week), so junk never reaches a cache key."""
+    day = request.GET.get("day")
+    return day if day in DAYS else None
+
+
+def _result_table(owner, timetable_id, day=None, days=None):
+    """
+    The rendered timetable table, cached per timetable (and ?day=) since a
+    generated timetable never changes. On a hit neither the row is read nor
+    the template rendered. `days` skips the read when the caller has them.
+    Returns None if the timetable is not the owner's.
+    """
+    key = result_table_key(owner, timetable_id, day)
+    html = timetable_cache().get(key)
+    if html is None:
+        if days is None:
+            timetable = Timetable.objects.filter(id=timetable_id, owner=owner).first()
+            if timetable is None:
+                return None
+            days = timetable.days
+        if day in days:  # ?day=mon renders (and decodes) just that day
+            days = {day: days[day]}
+        html = render_to_string("result_table.html", {"timetable": days})
+        timetable_cache().set(key, html, RESULT_FRAGMENT_TIMEOUT)
+    return mark_safe(html)
+
+
+def _result_version(owner, timetable_id):
+    """
+    Content hash of a timetable (Timetable.days_hash), cached next to its
+    rendered tables so a repeat view reads no timetable row.
+    """
+    key = result_version_key(owner, timetable_id)
+    version = timetable_cache().get(key)
+    if version is None:
+        timetable = (
+            Timetable.objects.filter(id=timetable_id, owner=owner).only("data", "packed").first()
+        )
+        if timetable is None:
+            return None
+        version = timetable.days_hash()
+        timetable_cache().set(key, version, RESULT_FRAGMENT_TIMEOUT)
+    return version
+
+
+def _result_etag(request, option="cancel", **kwargs):
+    """
+    ETag of a result page: the session's timetable id and the hash of its
+    content, so a timetable regenerated in place isn't answered with a 304.
+    """
+    timetable_id = request.session.get("timetable_id")
+    if option != "cancel" or timetable_id is None:
+        return None
+    version = _result_version(get_owner(request), timetable_id)
+    if version is None:
+        return None
+    day = _result_day(request) or "week"
+    return f'"timetable-{timetable_id}-{version[:16]}-{day}"'
+
+
+def _result_last_modified(request, option="cancel", **kwargs):
+    created = request.session.get("timetable_created")
+    if option != "cancel" or created is None:
+        return None
+    return datetime.fromtimestamp(created, tz=dt_timezone.utc)
+
+
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_result_etag, last_modified_func=_result_last_modified)
 def generate(request):
     timetable_id = request.session.get("timetable_id")
 
     if timetable_id:
-        timetable = Timetable.objects.filter(id=timetable_id).first()
-        if timetable:
+        table = _result_table(get_owner(request), timetable_id, _result_day(request))
+        if table is not None:
             messages.info(request, "ℹ️ Showing your previously generated timetable.")
             return render(
                 request,
                 "result.html",
-                {"timetable": timetable.data, "timetable_id": timetable.id},
+                {"result_table": table, "timetable_id": timetable_id},
             )
         else:
             messages.warning(request, "⚠️ No timetable found in session. Please create a new one.")
@@ -116,6 +375,8 @@ def generate(request):
     return redirect("unit_list")
 
 
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_result_etag, last_modified_func=_result_last_modified)
 def proceed_generate(request, option):
     """
     Handles user choice when they already have a timetable.
@@ -123,46 +384,54 @@ def proceed_generate(request, option):
     option = new_only → Clear everything, go to fresh setup
     option = download_new → Download current timetable, then reset and go to fresh setup
     """
+    owner = get_owner(request)
     timetable_id = request.session.get("timetable_id")
-    timetable = Timetable.objects.filter(id=timetable_id).first() if timetable_id else None
 
     if option == "cancel":
-        if timetable:
+        table = _result_table(owner, timetable_id) if timetable_id else None
+        if table is not None:
             messages.info(request, "ℹ️ Using your existing timetable.")
             return render(
                 request,
                 "result.html",
-                {"timetable": timetable.data, "timetable_id": timetable.id},
+                {"result_table": table, "timetable_id": timetable_id},
             )
         messages.warning(request, "⚠️ No timetable to cancel. Redirecting home.")
         return redirect("home")
 
+    timetable = (
+        Timetable.objects.filter(id=timetable_id, owner=owner).first() if timetable_id else None
+    )
+    # Only the current owner's working inputs are reset; with
+    # TIMETABLE_ARCHIVE_INPUTS they stay attached to the timetable they made
+    archive = timetable if settings.TIMETABLE_ARCHIVE_INPUTS else None
+
     if option == "download_new" and timetable:
         # Download old one first
         response = _build_pdf_response(timetable)
         # Clear data AFTER sending the PDF
-        Unit.objects.all().delete()
-        Availability.objects.all().delete()
-        AvailabilitySlot.objects.all().delete()
-        request.session.pop("timetable_id", None)
+        reset_inputs(owner, archive)
+        forget_timetable(request.session)
         return response
 
     if option == "new_only" or (option == "download_new" and not timetable):
         # Clear everything for fresh setup
-        Unit.objects.all().delete()
-        Availability.objects.all().delete()
-        AvailabilitySlot.objects.all().delete()
-        request.session.pop("timetable_id", None)
+        reset_inputs(owner, archive)
+        forget_timetable(request.session)
 
         messages.success(request, "🆕 Starting a fresh timetable setup.")
         return redirect("unit_list")
 
 
 def finalize_generate(request):
-    units = Unit.objects.all()
-    availability = Availability.objects.prefetch_related("slots").all()
-
-    if not units or not availability:
+    owner = get_owner(request)
+    # One aggregate over the stored day totals, before loading any inputs
+    capacity = Availability.objects.filter(owner=owner, timetable=None).aggregate(
+        minutes=Sum("capacity_minutes")
+    )["minutes"]
+    inputs = request_inputs(request, owner) if capacity else None
+
+    if inputs is None or not inputs.units or not inputs.days:
         messages.error(request, "⚠️ Please add both units and availability before generating.")
         return render(
             request,
@@ -170,61 +439,190 @@ def finalize_generate(request):
             {"message": "Please add units and availability first."},
         )
 
-    timetable_data = generate_timetable()
-    timetable = Timetable.objects.create(data=timetable_data)
-    request.session["timetable_id"] = timetable.id
+    # ?engine=search&budget_ms=500 runs the optimizer; the budget is capped
+    # so a single request can never hold a worker for long.
+    engine = request.GET.get("engine", settings.TIMETABLE_ENGINE)
+    if engine not in ENGINES:
+        engine = "greedy"
+    try:
+        budget_ms = int(request.GET.get("budget_ms", settings.TIMETABLE_SEARCH_BUDGET_MS))
+    except ValueError:
+        budget_ms = settings.TIMETABLE_SEARCH_BUDGET_MS
+    budget_ms = max(0, min(budget_ms, settings.TIMETABLE_SEARCH_MAX_BUDGET_MS))
+
+    # Small edits since the last timetable: repair it rather than reshuffle the week
+    previous = None
+    changes = request.session.pop("pending_changes", None)
+    if changes and request.session.get("timetable_id"):
+        previous = Timetable.objects.filter(
+            id=request.session["timetable_id"], owner=owner
+        ).first()
+
+    # Queue the work unless configured to generate inside the request
+    if settings.TIMETABLE_JOB_RUNNER != "sync":
+        job, _ = enqueue_generation(
+            owner, engine=engine, budget_ms=budget_ms, previous=previous, changes=changes,
+            inputs=inputs,
+        )
+        return redirect("job_detail", job_id=job.id)
+
+    stats = {}
+    timetable_data = generate_from_inputs(
+        inputs, engine=engine, budget_ms=budget_ms, stats=stats,
+        previous=previous.days if previous else None,
+        changes=changes if previous else None,
+    )
+    if timetable_data is None:  # e.g. every slot is shorter than one block
+        messages.error(request, "⚠️ Nothing could be scheduled.")
+        return render(request, "error.html", {"message": nothing_to_schedule()})
+    timetable = save_timetable(owner, timetable_data, stats)
+    remember_timetable(request.session, timetable)
 
     messages.success(request, "✅ Timetable generated successfully!")
+    if "score" in stats:
+        messages.info(
+            request,
+            f"ℹ️ Optimized: score {stats['initial_score']} → {stats['score']} "
+            f"after {stats['iterations']} iterations.",
+        )
     return render(
         request,
         "result.html",
-        {"timetable": timetable_data, "timetable_id": timetable.id},
+        {
+            "result_table": _result_table(owner, timetable.id, days=timetable_data),
+            "timetable_id": timetable.id,
+        },
     )
 
 
-# ---------------------- Download Timetable ----------------------
-def _build_pdf_response(timetable):
-    """Helper to generate timetable PDF response."""
-    response = HttpResponse(content_type="application/pdf")
-    response['Content-Disposition'] = 'attachment; filename="timetable.pdf"'
+# ---------------------- Generation jobs ----------------------
+def job_detail(request, job_id):
+    job = get_object_or_404(GenerationJob, id=job_id, owner=get_owner(request))
+    return render(request, "job.html", {"job": job})
 
-    p = canvas.Canvas(response, pagesize=letter)
-    width, height = letter
 
-    p.setFont("Helvetica-Bold", 16)
-    p.drawString(200, height - 50, "Your Timetable")
+async def job_status(request, job_id):
+    """
+    Polled by job.html. Async so that, under ASGI, waiting clients do not
+    hold a worker thread between polls.
+    """
+    owner = await aget_owner(request)
+    job = await (
+        GenerationJob.objects.select_related("timetable")
+        .filter(id=job_id, owner=owner)
+        .afirst()
+    )
+    if job is None:
+        raise Http404
+    if job.status in ACTIVE:
+        # Report a job whose runner went away as failed, so polling stops
+        stale = stale_jobs(GenerationJob.objects.filter(id=job.id))
+        if await stale.aupdate(
+            status=GenerationJob.FAILED, error=ABANDONED, updated_at=timezone.now()
+        ):
+            job.status, job.error = GenerationJob.FAILED, ABANDONED
+
+    payload = {
+        "id": job.id,
+        "status": job.status,
+        "progress": job.progress,
+        "error": job.error,
+        "timetable_id": job.timetable_id,
+    }
+    if job.status == GenerationJob.DONE and job.timetable is not None:
+        payload["timetable"] = dict(job.timetable.days)
+        if await request.session.aget("timetable_id") != job.timetable_id:
+            await request.session.aset("timetable_id", job.timetable_id)
+            await request.session.aset("timetable_created", job.timetable.created_at.timestamp())
+    return JsonResponse(payload)
 
-    p.setFont("Helvetica", 12)
-    y = height - 100
 
-    # Loop through sessions in timetable.data
-    for day, sessions in timetable.data.items():
-        p.setFont("Helvetica-Bold", 13)
-        p.drawString(100, y, day)
-        y -= 20
+# ---------------------- Download Timetable ----------------------
+def _build_pdf_response(timetable, layout="list"):
+    """
+    Helper to generate timetable PDF response.
+    PDFs are cached by the content hash of the timetable, so repeat
+    downloads are served straight from the cache; otherwise the PDF is
+    streamed in chunks as it is read back from the renderer.
+    """
+    if layout not in LAYOUTS:
+        layout = "list"
+    key = f"pdf:{layout}:{timetable.days_hash()}"
+    filename = "timetable-week.pdf" if layout == "grid" else "timetable.pdf"
+
+    cached = timetable_cache().get(key)
+    if cached is not None:
+        response = HttpResponse(cached, content_type="application/pdf")
+    else:
+        response = StreamingHttpResponse(
+            _cache_chunks(key, iter_pdf(timetable.days, layout)),
+            content_type="application/pdf",
+        )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
 
-        p.setFont("Helvetica", 11)
-        for session in sessions:
-            text = f"{session['unit']} ({session['start']} - {session['end']})"
-            p.drawString(120, y, text)
-            y -= 15
 
-            if y < 50:  # new page if space runs out
-                p.showPage()
-                y = height - 50
+def _cache_chunks(key, chunks):
+    """Pass chunks through, caching the whole PDF once it has been sent."""
+    parts, size = [], 0
+    for chunk in chunks:
+        size += len(chunk)
+        if size <= settings.TIMETABLE_PDF_CACHE_MAX_BYTES:
+            parts.append(chunk)
+        yield chunk
+    if size <= settings.TIMETABLE_PDF_CACHE_MAX_BYTES:
+        timetable_cache().set(key, b"".join(parts))
 
-        y -= 10  # space between days
 
-    p.showPage()
-    p.save()
-    return response
+def download_timetable(request):
+    timetable_id = request.session.get("timetable_id")
+    timetable = Timetable.objects.filter(id=timetable_id, owner=get_owner(request)).first()
 
+    if not timetable:
+        return HttpResponse("No timetable found.", status=404)
 
-def download_timetable(request):
+    return _build_pdf_response(timetable, request.GET.get("layout", "list"))
+
+
+def download_ics(request):
+    """
+    Stream the timetable as an iCalendar file: one weekly recurring event
+    per session from ?start= (default today) for ?weeks= weeks.
+    """
     timetable_id = request.session.get("timetable_id")
-    timetable = Timetable.objects.filter(id=timetable_id).first()
+    timetable = Timetable.objects.filter(id=timetable_id, owner=get_owner(request)).first()
 
     if not timetable:
         return HttpResponse("No timetable found.", status=404)
 
-    return _build_pdf_response(timetable)
+    try:
+        start = request.GET.get("start")
+        start = date.fromisoformat(start) if start else timezone.localdate()
+        weeks = max(1, int(request.GET.get("weeks", settings.TIMETABLE_ICS_WEEKS)))
+    except ValueError:
+        return HttpResponse("Invalid start or weeks.", status=400)
+
+    response = StreamingHttpResponse(
+        iter_ics(
+            timetable.days,
+            start,
+            until=start + timedelta(weeks=weeks, days=-1),
+            uid_prefix=f"timetable-{timetable.id}",
+        ),
+        content_type="text/calendar; charset=utf-8",
+    )
+    response["Content-Disposition"] = 'attachment; filename="timetable.ics"'
+    return response
+
+
+# ---------------------- Debug ----------------------
+def cache_stats_view(request):
+    if not settings.DEBUG:
+        raise Http404
+    return JsonResponse(cache_stats())
+
+
+def metrics_view(request):
+    if not settings.DEBUG:
+        raise Http404
+    return JsonResponse({"enabled": profiling.enabled(), "metrics": profiling.snapshot()})
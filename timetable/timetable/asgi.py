@@ -3,6 +3,10 @@ ASGI config for timetable project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Under ASGI the async views in tapp (e.g. the generation job status
+endpoint polled by clients) run on the event loop instead of holding a
+worker thread per request.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -52,6 +52,13 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Opt-in timing of views, scheduler phases and PDF rendering (see
+# tapp/profiling.py); summaries are served at /debug/metrics/ when DEBUG is on.
+TIMETABLE_PROFILING = config('TIMETABLE_PROFILING', default=False, cast=bool)
+TIMETABLE_PROFILING_WINDOW = config('TIMETABLE_PROFILING_WINDOW', default=1000, cast=int)
+if TIMETABLE_PROFILING:
+    MIDDLEWARE.insert(0, 'tapp.middleware.ProfilingMiddleware')
+
 ROOT_URLCONF = 'timetable.urls'
 
 TEMPLATES = [
@@ -127,3 +134,69 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Timetable generation
+# "greedy" or "search"; search runs a local-search optimizer for up to
+# TIMETABLE_SEARCH_BUDGET_MS (callers may ask for more, up to the max).
+
+TIMETABLE_ENGINE = config('TIMETABLE_ENGINE', default='greedy')
+TIMETABLE_SEARCH_BUDGET_MS = config('TIMETABLE_SEARCH_BUDGET_MS', default=200, cast=int)
+TIMETABLE_SEARCH_MAX_BUDGET_MS = config('TIMETABLE_SEARCH_MAX_BUDGET_MS', default=2000, cast=int)
+
+# Where finalize_generate runs the scheduler: "thread" (in-process pool),
+# "worker" (`manage.py run_generation_worker`) or "sync" (inside the request).
+TIMETABLE_JOB_RUNNER = config('TIMETABLE_JOB_RUNNER', default='thread')
+TIMETABLE_JOB_THREADS = config('TIMETABLE_JOB_THREADS', default=2, cast=int)
+# Seconds a queued or running job may go without progress before it counts
+# as abandoned (e.g. its process restarted) and identical inputs queue anew.
+TIMETABLE_JOB_TIMEOUT = config('TIMETABLE_JOB_TIMEOUT', default=300, cast=int)
+
+# Length in minutes of the smallest schedulable block: 15, 30 or 60.
+TIMETABLE_GRANULARITY_MINUTES = config('TIMETABLE_GRANULARITY_MINUTES', default=30, cast=int)
+
+# Format new timetables are stored in: "packed" (compact binary, see
+# tapp/packing.py) or "json". Existing rows are read in either format;
+# `manage.py pack_timetables` converts them.
+TIMETABLE_STORAGE = config('TIMETABLE_STORAGE', default='packed')
+
+# Length of the recurring calendar export (.ics), e.g. one semester.
+TIMETABLE_ICS_WEEKS = config('TIMETABLE_ICS_WEEKS', default=15, cast=int)
+
+# Starting a fresh setup deletes the previous units and availability; when
+# on, they're kept instead, attached to the timetable generated from them.
+TIMETABLE_ARCHIVE_INPUTS = config('TIMETABLE_ARCHIVE_INPUTS', default=False, cast=bool)
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Generated timetables are cached by a hash of their inputs. "locmem" evicts
+# least-recently-used entries past TIMETABLE_CACHE_SIZE; "file" shares the
+# cache between worker processes and culls a fraction of entries when full.
+
+TIMETABLE_CACHE_ALIAS = 'timetables'
+TIMETABLE_CACHE_BACKEND = config('TIMETABLE_CACHE_BACKEND', default='locmem')
+TIMETABLE_CACHE_SIZE = config('TIMETABLE_CACHE_SIZE', default=500, cast=int)
+
+# Rendered PDFs share the timetables cache; larger ones are never cached.
+TIMETABLE_PDF_CACHE_MAX_BYTES = config('TIMETABLE_PDF_CACHE_MAX_BYTES', default=5 * 1024 * 1024, cast=int)
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    TIMETABLE_CACHE_ALIAS: {
+        'BACKEND': (
+            'django.core.cache.backends.filebased.FileBasedCache'
+            if TIMETABLE_CACHE_BACKEND == 'file'
+            else 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': (
+            config('TIMETABLE_CACHE_DIR', default=str(BASE_DIR / '.cache' / 'timetables'))
+            if TIMETABLE_CACHE_BACKEND == 'file'
+            else 'timetables'
+        ),
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': TIMETABLE_CACHE_SIZE},
+    },
+}
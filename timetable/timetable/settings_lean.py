@@ -0,0 +1,37 @@
+"""
+Lean settings for API-only workers:
+
+    DJANGO_SETTINGS_MODULE=timetable.settings_lean gunicorn timetable.wsgi
+
+Everything in settings.py, minus what the JSON API (tapp/api.py) doesn't
+use: no admin, messages or static files apps, their middleware and
+template context processors, and only the API's URLs, so a worker
+imports and sets up far less before serving its first request. Sessions
+and authentication stay, so utils.get_owner resolves the same owner
+(user:<id> when logged in) from the shared cookie as on the full site.
+Run migrations with the full settings.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import TIMETABLE_PROFILING
+
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'tapp',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+]
+if TIMETABLE_PROFILING:
+    MIDDLEWARE.insert(0, 'tapp.middleware.ProfilingMiddleware')
+
+ROOT_URLCONF = 'timetable.urls_lean'
+
+TEMPLATES = []
+
+AUTH_PASSWORD_VALIDATORS = []
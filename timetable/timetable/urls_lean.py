@@ -0,0 +1,9 @@
+"""
+URL configuration of the lean profile (timetable/settings_lean.py): the
+JSON API only, at the same paths as on the full site.
+"""
+from django.urls import include, path
+
+urlpatterns = [
+    path('api/', include('tapp.api_urls')),
+]